@@ -0,0 +1,306 @@
+#!/usr/bin/env python
+"""Benchmark how building and rendering interface trees scales with the
+size of the package.
+
+Synthetic packages of several sizes are generated in a temporary
+directory and each phase is timed (best of a few repeats) and then
+run again under tracemalloc to get its peak memory:
+
+- discovery :: finding all the modules statically
+- parse :: parsing the source files into syntax trees
+- extract :: extracting the definitions from the syntax trees
+- build :: assembling the compact InterfaceTree
+- networkx :: converting it to a NetworkX DiGraph
+- render :: writing the org mode listing
+
+The results are written as JSON, together with the git commit, so
+runs on different commits can be compared with --compare.
+
+    python benchmarks/bench_scaling.py -o bench.json
+    python benchmarks/bench_scaling.py --compare bench.json
+
+"""
+
+import sys
+import os
+import os.path as osp
+import io
+import json
+import time
+import platform
+import subprocess
+import tempfile
+import tracemalloc
+
+import click
+
+# run against the working tree, not an installed version
+sys.path.insert(0, osp.dirname(osp.dirname(osp.abspath(__file__))))
+
+from pymatuning.listings import (
+    discover_modules,
+    load_file_ast,
+    extract_definitions,
+    build_interface_tree,
+)
+from pymatuning.renderers.orgmode import write_listing
+
+# (subpackages, modules per package, classes per module, methods per class)
+SIZES = {
+    'small' : (2, 5, 3, 5),
+    'medium' : (5, 20, 5, 10),
+    'large' : (10, 50, 8, 15),
+}
+
+METHOD_TEMPLATE = '''
+    def method_{j}(self, a, b=None):
+        """Method {j}."""
+        result = [a for _ in range(10)]
+        if b is not None:
+            result.append(b)
+        return result
+'''
+
+CLASS_TEMPLATE = '''
+class Class{i}(object):
+    """Class {i}."""
+
+    attribute_{i} = {i}
+
+    def __init__(self, value):
+        self._value = value
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+
+    @classmethod
+    def make(cls):
+        return cls({i})
+
+    @staticmethod
+    def helper(x):
+        return x * {i}
+{methods}'''
+
+MODULE_TEMPLATE = '''"""Synthetic module {name}."""
+import os
+
+CONSTANT_A = 1
+CONSTANT_B = 'b'
+
+def function_a(x, y):
+    total = 0
+    for i in range(x):
+        total += i * y
+    return total
+
+def function_b(*args, **kwargs):
+    return len(args) + len(kwargs)
+{classes}'''
+
+def generate_package(root_dir, name, n_subpackages, n_modules, n_classes, n_methods):
+    """Write a synthetic package to the directory, with `n_subpackages`
+    subpackages that each have `n_modules` modules, as does the top
+    level package. Returns the number of modules written."""
+
+    methods = ''.join(METHOD_TEMPLATE.format(j=j) for j in range(n_methods))
+    classes = ''.join(CLASS_TEMPLATE.format(i=i, methods=methods)
+                      for i in range(n_classes))
+
+    def write_package(pkg_dir, pkg_name):
+
+        os.makedirs(pkg_dir)
+        with open(osp.join(pkg_dir, '__init__.py'), 'w') as wf:
+            wf.write(MODULE_TEMPLATE.format(name=pkg_name, classes=''))
+
+        for mod_idx in range(n_modules):
+            mod_name = "module_{}".format(mod_idx)
+            with open(osp.join(pkg_dir, mod_name + '.py'), 'w') as wf:
+                wf.write(MODULE_TEMPLATE.format(name=pkg_name + '.' + mod_name,
+                                                classes=classes))
+
+        return n_modules + 1
+
+    n_written = write_package(osp.join(root_dir, name), name)
+    for sub_idx in range(n_subpackages):
+        sub_name = "subpackage_{}".format(sub_idx)
+        n_written += write_package(osp.join(root_dir, name, sub_name),
+                                   name + '.' + sub_name)
+
+    return n_written
+
+def run_phases(package_name):
+    """Run each phase once, returning the results of each so the next
+    phase can use them, and the wall and CPU time of each phase."""
+
+    timings = {}
+    state = {}
+
+    def phase(name, func):
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        state[name] = func()
+        timings[name] = {'wall' : time.perf_counter() - wall_start,
+                         'cpu' : time.process_time() - cpu_start}
+
+    phase('discovery', lambda: discover_modules(package_name))
+    phase('parse', lambda: [load_file_ast(filepath)
+                            for _, filepath, _ in state['discovery']])
+    phase('extract', lambda: [extract_definitions(st) for st in state['parse']])
+    phase('build', lambda: build_interface_tree(state['discovery'], state['extract']))
+    phase('networkx', lambda: state['build'].to_networkx())
+
+    def render():
+        stream = io.StringIO()
+        write_listing(state['build'], stream)
+        return stream.tell()
+
+    phase('render', render)
+
+    return state, timings
+
+def phase_peaks(package_name):
+    """Peak traced memory in bytes of each phase."""
+
+    peaks = {}
+
+    tracemalloc.start()
+    try:
+        state = {}
+        for name, func in (
+                ('discovery', lambda: discover_modules(package_name)),
+                ('parse', lambda: [load_file_ast(filepath)
+                                   for _, filepath, _ in state['discovery']]),
+                ('extract', lambda: [extract_definitions(st) for st in state['parse']]),
+                ('build', lambda: build_interface_tree(state['discovery'],
+                                                       state['extract'])),
+                ('networkx', lambda: state['build'].to_networkx()),
+                ('render', lambda: write_listing(state['build'], io.StringIO())),):
+
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            state[name] = func()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks[name] = peak - base
+
+            # the syntax trees are not needed after extraction, as in
+            # the real pipeline
+            if name == 'extract':
+                del state['parse']
+    finally:
+        tracemalloc.stop()
+
+    return peaks
+
+def bench_size(size_name, size, repeat, memory):
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+
+        package_name = "synthpkg_{}".format(size_name)
+        n_modules = generate_package(tmp_dir, package_name, *size)
+
+        sys.path.insert(0, tmp_dir)
+        try:
+            best = None
+            for _ in range(repeat):
+                state, timings = run_phases(package_name)
+                if best is None:
+                    best = timings
+                else:
+                    best = {name : {key : min(best[name][key], timings[name][key])
+                                    for key in timings[name]}
+                            for name in timings}
+
+            n_nodes = len(state['build'])
+
+            if memory:
+                for name, peak in phase_peaks(package_name).items():
+                    best[name]['peak_bytes'] = peak
+        finally:
+            sys.path.remove(tmp_dir)
+
+    n_subpackages, n_modules_per, n_classes, n_methods = size
+    return {'size' : size_name,
+            'subpackages' : n_subpackages,
+            'modules_per_package' : n_modules_per,
+            'classes_per_module' : n_classes,
+            'methods_per_class' : n_methods,
+            'n_modules' : n_modules,
+            'n_nodes' : n_nodes,
+            'phases' : best}
+
+def git_commit():
+
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=osp.dirname(osp.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_results(results, baseline=None):
+
+    baseline_results = {}
+    if baseline is not None:
+        baseline_results = {result['size'] : result for result in baseline['results']}
+
+    for result in results:
+
+        click.echo("{size}: {n_modules} modules, {n_nodes} nodes".format(**result))
+
+        for name, phase in result['phases'].items():
+
+            line = "  {:<10} {:9.4f} s".format(name, phase['wall'])
+            if 'peak_bytes' in phase:
+                line += " {:10.2f} MiB".format(phase['peak_bytes'] / 2**20)
+
+            old = baseline_results.get(result['size'])
+            if old is not None and name in old['phases'] and old['phases'][name]['wall'] > 0:
+                line += "  x{:.2f} vs baseline".format(
+                    phase['wall'] / old['phases'][name]['wall'])
+
+            click.echo(line)
+
+@click.command()
+@click.option('--size', 'sizes', multiple=True, type=click.Choice(list(SIZES.keys())),
+              help="Sizes to run, defaults to all of them.")
+@click.option('--repeat', type=click.IntRange(min=1), default=3, show_default=True,
+              help="Number of timed runs, the fastest is kept.")
+@click.option('--memory/--no-memory', default=True,
+              help="Also measure the peak memory of each phase.")
+@click.option('--output', '-o', type=click.File('w'), default=None,
+              help="File to write the results to as JSON.")
+@click.option('--compare', type=click.File('r'), default=None,
+              help="Results of an earlier run to compare the timings to.")
+def main(sizes, repeat, memory, output, compare):
+
+    if not sizes:
+        sizes = list(SIZES.keys())
+
+    results = [bench_size(size_name, SIZES[size_name], repeat, memory)
+               for size_name in sizes]
+
+    report = {'commit' : git_commit(),
+              'python' : platform.python_version(),
+              'platform' : platform.platform(),
+              'timestamp' : time.time(),
+              'results' : results}
+
+    baseline = None
+    if compare is not None:
+        baseline = json.load(compare)
+
+    print_results(results, baseline=baseline)
+
+    if output is not None:
+        json.dump(report, output, indent=2)
+
+if __name__ == "__main__":
+
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python
+"""Benchmark how long the command line takes to start, and check it
+against a budget.
+
+The import of `pymatuning.cli` is timed in a fresh interpreter with
+`python -X importtime` (best of a few repeats), which is what every
+run pays before click has even parsed its arguments, and the slowest
+imports under it are listed. The wall time of `--help` is measured as
+well.
+
+Exits with status 1 if the import takes longer than the budget, or if
+any of the heavy modules that only some commands need is imported at
+startup, so it can be run as a check, e.g. in CI:
+
+    python benchmarks/bench_startup.py --budget-ms 150
+    python benchmarks/bench_startup.py -o startup.json
+
+"""
+
+import sys
+import os
+import os.path as osp
+import json
+import time
+import platform
+import subprocess
+
+import click
+
+ROOT_DIR = osp.dirname(osp.dirname(osp.abspath(__file__)))
+
+# modules that must only be imported by the commands that use them
+FORBIDDEN_MODULES = (
+    'networkx',
+    'multiprocessing',
+    'concurrent.futures.process',
+    'sqlite3',
+    'ctypes',
+    'zipfile',
+    'tarfile',
+    'tracemalloc',
+)
+
+DEFAULT_BUDGET_MS = 150
+
+def _env():
+
+    # run against the working tree, not an installed version
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join([ROOT_DIR] + [path for path in
+                                         env.get('PYTHONPATH', '').split(os.pathsep) if path])
+
+    # let the bytecode be written, an installed package has it
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    return env
+
+def parse_importtime(output):
+    """Parse the output of `-X importtime` into a list of (module, depth,
+    self microseconds, cumulative microseconds)."""
+
+    imports = []
+    for line in output.splitlines():
+
+        if not line.startswith('import time:'):
+            continue
+
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+
+        imports.append((name.strip(), depth, int(fields[0]), int(fields[1])))
+
+    return imports
+
+def time_import(module):
+
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                          env=_env(), cwd=ROOT_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+    return parse_importtime(proc.stderr)
+
+def forbidden_imports(imports):
+    """The names of the imports, as parsed by `parse_importtime`, that
+    are or are in one of the FORBIDDEN_MODULES."""
+
+    return sorted({name for name, _, _, _ in imports
+                   if any(name == forbidden or name.startswith(forbidden + '.')
+                          for forbidden in FORBIDDEN_MODULES)})
+
+def time_help():
+
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'pymatuning.cli', '--help'],
+                   env=_env(), cwd=ROOT_DIR,
+                   stdout=subprocess.DEVNULL, check=True)
+
+    return time.perf_counter() - start
+
+def bench_startup(repeat, top):
+
+    # the first run writes the bytecode of anything that changed
+    time_import('pymatuning.cli')
+
+    best = None
+    for _ in range(repeat):
+
+        imports = time_import('pymatuning.cli')
+        total = next(cumulative for name, depth, _, cumulative in imports
+                     if name == 'pymatuning.cli' and depth == 0)
+
+        if best is None or total < best[0]:
+            best = (total, imports)
+
+    total, imports = best
+
+    forbidden = forbidden_imports(imports)
+
+    slowest = sorted(imports, key=lambda record: record[2], reverse=True)[:top]
+
+    help_wall = min(time_help() for _ in range(repeat))
+
+    return {'import_ms' : total / 1000,
+            'help_ms' : help_wall * 1000,
+            'n_modules' : len(imports),
+            'forbidden' : forbidden,
+            'slowest' : [{'module' : name, 'self_ms' : self_us / 1000,
+                          'cumulative_ms' : cumulative / 1000}
+                         for name, _, self_us, cumulative in slowest]}
+
+@click.command()
+@click.option('--repeat', type=click.IntRange(min=1), default=5, show_default=True,
+              help="Number of timed runs, the fastest is kept.")
+@click.option('--top', type=click.IntRange(min=0), default=15, show_default=True,
+              help="Number of the slowest imports to list.")
+@click.option('--budget-ms', type=click.FloatRange(min=0), default=DEFAULT_BUDGET_MS,
+              show_default=True,
+              help="Milliseconds importing pymatuning.cli may take at most.")
+@click.option('--output', '-o', type=click.File('w'), default=None,
+              help="File to write the results to as JSON.")
+def main(repeat, top, budget_ms, output):
+
+    result = bench_startup(repeat, top)
+
+    click.echo("import pymatuning.cli {:8.1f} ms ({} modules)".format(
+        result['import_ms'], result['n_modules']))
+    click.echo("pymatuning --help     {:8.1f} ms".format(result['help_ms']))
+
+    click.echo("slowest imports (self, cumulative):")
+    for record in result['slowest']:
+        click.echo("  {module:<40} {self_ms:7.2f} ms {cumulative_ms:8.2f} ms".format(**record))
+
+    if output is not None:
+        json.dump({'python' : platform.python_version(),
+                   'platform' : platform.platform(),
+                   'timestamp' : time.time(),
+                   'budget_ms' : budget_ms,
+                   'result' : result}, output, indent=2)
+
+    failed = False
+
+    if result['import_ms'] > budget_ms:
+        click.echo("Importing pymatuning.cli took {:.1f} ms, over the budget of {:.1f} ms".format(
+            result['import_ms'], budget_ms), err=True)
+        failed = True
+
+    if len(result['forbidden']) > 0:
+        click.echo("Imported at startup: {}".format(", ".join(result['forbidden'])), err=True)
+        failed = True
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+
+    main()
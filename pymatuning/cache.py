@@ -0,0 +1,280 @@
+import os
+import os.path as osp
+import json
+import hashlib
+import time
+
+DEFAULT_CACHE_DIR = osp.join(os.environ.get('XDG_CACHE_HOME',
+                                            osp.expanduser(osp.join('~', '.cache'))),
+                             'pymatuning')
+
+# the total size of the entries in bytes we let the cache grow to
+# before evicting the least recently used ones
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+# files modified less than this many seconds before their entry was
+# written could be modified again without changing their modification
+# time, so for these we always check the content hash
+RACY_SECONDS = 2
+
+# change this whenever the format of the definitions changes so that
+# old entries are not used
+CACHE_VERSION = 4
+
+ENTRY_EXT = '.json'
+
+def source_digest(source):
+    """Content hash of the bytes of a source file."""
+    return hashlib.blake2b(source, digest_size=16).hexdigest()
+
+def is_racy(mtime_ns):
+    """Whether a file with this modification time, None for files that
+    are not on the filesystem, could still be modified without it
+    changing, see RACY_SECONDS."""
+    return mtime_ns is not None and time.time() - mtime_ns / 1e9 < RACY_SECONDS
+
+class DefinitionCache:
+    """Persistent cache of the definitions of source files.
+
+    There is one entry per source file, keyed by its absolute path. An
+    entry is used as long as the modification time and size of the
+    file are the same as when it was stored. If they changed the file
+    is read and the entry is still used if its content hash is the
+    same.
+
+    Entries are stored as small JSON files in the cache directory,
+    when the total size of them goes over `max_size` the least
+    recently used ones are evicted. The entries used in this process
+    are also kept in memory so that sharing one cache between many
+    packages doesn't read them again. If the cache directory is None
+    the entries are only kept in memory.
+
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_size=DEFAULT_MAX_SIZE):
+
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        # the (mtime, size, digest) of files that missed, to be used
+        # for the entry when the definitions are stored
+        self._pending = {}
+
+        # number of bytes written in this session, used to only do
+        # the eviction scan when the cache actually grew
+        self._written = 0
+
+        # the entries used in this process by file path
+        self._memory = {}
+
+    def _entry_path(self, filepath):
+
+        if self.cache_dir is None:
+            return None
+
+        key = hashlib.sha1(osp.abspath(filepath).encode('utf-8')).hexdigest()
+
+        # spread the entries over subdirectories so we don't get
+        # huge directory listings
+        return osp.join(self.cache_dir, key[:2], key[2:] + ENTRY_EXT)
+
+    def _read_entry(self, entry_path):
+
+        if self.cache_dir is None:
+            return None
+
+        try:
+            with open(entry_path, 'r') as rf:
+                entry = json.load(rf)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('version') != CACHE_VERSION:
+            return None
+
+        return entry
+
+    def _write_entry(self, entry_path, entry):
+
+        if self.cache_dir is None:
+            return
+
+        # tempfile takes a while to import and runs that hit the
+        # cache never need it
+        import tempfile
+
+        os.makedirs(osp.dirname(entry_path), exist_ok=True)
+
+        # write to a temporary file and move it in place so that
+        # concurrent runs never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=osp.dirname(entry_path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as wf:
+                json.dump(entry, wf, separators=(',', ':'))
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+
+        self._written += osp.getsize(entry_path)
+
+    def lookup(self, filepath, source=None):
+        """Look up the definitions of a source file.
+
+        Returns a tuple (definitions, source). On a hit the definitions
+        are returned and the source is None, unless it had to be read
+        to check the content hash. On a miss the definitions are None
+        and the source bytes are returned so the caller does not have
+        to read the file again, the result should then be given to
+        `store`.
+
+        If the source is given, for files that are not on the
+        filesystem like the members of archives, the entry is only
+        used if the content hash is the same.
+
+        """
+
+        entry_path = self._entry_path(filepath)
+
+        entry = self._memory.get(filepath)
+        in_memory = entry is not None
+        if not in_memory:
+            entry = self._read_entry(entry_path)
+
+        if source is not None:
+            return self._lookup_source(filepath, source, entry_path, entry, in_memory)
+
+        st = os.stat(filepath)
+
+        if (entry is not None and
+            not entry['racy'] and
+            entry['mtime_ns'] == st.st_mtime_ns and
+            entry['size'] == st.st_size):
+
+            # mark the entry as recently used
+            if not in_memory:
+                self._memory[filepath] = entry
+                try:
+                    os.utime(entry_path)
+                except OSError:
+                    pass
+
+            return entry['definitions'], None
+
+        # the file was touched, so check whether the content changed
+        with open(filepath, 'rb') as rf:
+            source = rf.read()
+
+        digest = source_digest(source)
+
+        if entry is not None and entry['digest'] == digest:
+
+            # the content is the same so just update the stat info
+            entry['mtime_ns'] = st.st_mtime_ns
+            entry['size'] = st.st_size
+            entry['racy'] = is_racy(st.st_mtime_ns)
+            self._write_entry(entry_path, entry)
+            self._memory[filepath] = entry
+
+            return entry['definitions'], source
+
+        self._pending[filepath] = (st.st_mtime_ns, st.st_size, digest)
+
+        return None, source
+
+    def _lookup_source(self, filepath, source, entry_path, entry, in_memory):
+
+        digest = source_digest(source)
+
+        if entry is not None and entry['digest'] == digest:
+
+            # mark the entry as recently used
+            if not in_memory:
+                self._memory[filepath] = entry
+                try:
+                    os.utime(entry_path)
+                except OSError:
+                    pass
+
+            return entry['definitions'], source
+
+        self._pending[filepath] = (None, len(source), digest)
+
+        return None, source
+
+    def store(self, filepath, definitions):
+        """Store the definitions for a source file that missed in
+        `lookup`."""
+
+        mtime_ns, size, digest = self._pending.pop(filepath)
+
+        entry = {'version' : CACHE_VERSION,
+                 'path' : osp.abspath(filepath),
+                 'mtime_ns' : mtime_ns,
+                 'size' : size,
+                 'digest' : digest,
+                 'racy' : is_racy(mtime_ns),
+                 'definitions' : definitions}
+
+        self._write_entry(self._entry_path(filepath), entry)
+        self._memory[filepath] = entry
+
+    def _entries(self):
+
+        for subdir in os.scandir(self.cache_dir):
+            if not subdir.is_dir():
+                continue
+
+            for entry in os.scandir(subdir.path):
+                if entry.name.endswith(ENTRY_EXT):
+                    yield entry
+
+    def evict(self):
+        """Remove the least recently used entries until the cache is
+        under its maximum size.
+
+        Does nothing if no entries were written since the last
+        eviction.
+
+        """
+
+        if self._written == 0 or self.cache_dir is None or not osp.isdir(self.cache_dir):
+            return
+
+        self._written = 0
+
+        entries = []
+        total_size = 0
+        for entry in self._entries():
+            st = entry.stat()
+            entries.append((st.st_mtime, st.st_size, entry.path))
+            total_size += st.st_size
+
+        if total_size <= self.max_size:
+            return
+
+        # the oldest entries are the first to go
+        entries.sort()
+        for _, size, entry_path in entries:
+
+            if total_size <= self.max_size:
+                break
+
+            try:
+                os.remove(entry_path)
+            except OSError:
+                continue
+
+            total_size -= size
+
+    def clear(self):
+        """Remove all entries from the cache."""
+
+        self._memory = {}
+
+        if self.cache_dir is None or not osp.isdir(self.cache_dir):
+            return
+
+        for entry in list(self._entries()):
+            os.remove(entry.path)
@@ -1,40 +1,751 @@
 #!/usr/bin/env python
 import sys
+import os
+import os.path as osp
+import re
+import json
+import time
+from contextlib import contextmanager, ExitStack
 
 import click
 
-from pymatuning.listings import *
-from pymatuning.renderers.orgmode import listing
+from pymatuning.listings import (
+    ENGINES,
+    interface_tree,
+    diff_interface_trees,
+    is_module_path,
+    is_archive_path,
+    package_name,
+    import_module,
+    iter_modules,
+)
+from pymatuning.tree import KIND_NAMES, MODULE, MODULE_SEPARATOR
+from pymatuning.filters import TreeFilter
+from pymatuning.cache import DefinitionCache, DEFAULT_CACHE_DIR
+from pymatuning.sources import DEFAULT_IO_THREADS
+from pymatuning import renderers
+from pymatuning.renderers.orgmode import write_listing, update_listing
+from pymatuning.renderers.json import write_json, write_ndjson
+from pymatuning.name_styles import NAMING_STYLES, check_names
+from pymatuning.shards import parse_shard, write_partial, merge_partials
+from pymatuning.watch import WatchedTree, make_watcher, write_file, DEFAULT_POLL_INTERVAL
+from pymatuning.index import DefinitionIndex, DEFAULT_INDEX_PATH
+from pymatuning.lazy import is_address, split_address, address_tree
+from pymatuning.imports import package_imports, source_sizes
+from pymatuning import profiling
+
+# the options for parsing the modules shared by all the commands
+PARSE_OPTIONS = [
+    click.option('--cache-dir', type=click.Path(file_okay=False), default=DEFAULT_CACHE_DIR,
+                 show_default=True,
+                 help="Directory to cache the definitions of source files in."),
+    click.option('--no-cache', is_flag=True,
+                 help="Parse every source file instead of using the cache."),
+    click.option('--jobs', '-j', type=click.IntRange(min=0), default=1, show_default=True,
+                 help="Number of processes to parse modules with, 0 for one per CPU."),
+    click.option('--io-threads', type=click.IntRange(min=1), default=DEFAULT_IO_THREADS,
+                 show_default=True,
+                 help="Number of threads listing directories and reading files ahead "
+                 "of the parsing, 1 to do it only as needed."),
+    click.option('--engine', type=click.Choice(ENGINES), default='ast', show_default=True,
+                 help="Parse all of every module, or scan it for the lines with "
+                 "definitions and only parse those, which is faster."),
+]
+
+def parse_options(func):
+    for option in reversed(PARSE_OPTIONS):
+        func = option(func)
+    return func
+
+# the options for building the interface tree shared by the commands
+# that do
+TREE_OPTIONS = [
+    click.option('--static/--import', 'static', default=True,
+                 help="Find modules on the filesystem without importing them (default), "
+                 "or import every module of the package."),
+] + PARSE_OPTIONS + [
+    click.option('--include', multiple=True,
+                 help="Glob of the fully qualified names of the modules to list, "
+                 "with their submodules. Can be given more than once."),
+    click.option('--exclude', multiple=True,
+                 help="Glob of the fully qualified names of modules and definitions "
+                 "to leave out. Can be given more than once."),
+    click.option('--max-depth', type=click.IntRange(min=0), default=None,
+                 help="Deepest level of the tree to list, the package is at 0."),
+    click.option('--public-only', is_flag=True,
+                 help="Leave out private names and names not in the __all__ of "
+                 "their module."),
+    click.option('--exclude-kind', 'exclude_kinds', multiple=True,
+                 type=click.Choice([kind for kind in KIND_NAMES if kind != KIND_NAMES[MODULE]]),
+                 help="Kind of definition to leave out. Can be given more than once."),
+    click.option('--no-variables', is_flag=True,
+                 help="Leave out module variables and class attributes."),
+    click.option('--no-properties', is_flag=True,
+                 help="Leave out properties, getters, and setters."),
+    click.option('--undocumented', 'undocumented_only', is_flag=True,
+                 help="Leave out the functions, classes, and methods with a docstring, "
+                 "except for classes with members that are left in."),
+]
+
+def tree_options(func):
+    for option in reversed(TREE_OPTIONS):
+        func = option(func)
+    return func
+
+@contextmanager
+def tree_arguments(cache_dir, no_cache, jobs, io_threads, engine, **filter_options):
+    """Context manager giving the keyword arguments of `interface_tree`
+    from the values of the `TREE_OPTIONS` other than --static, the
+    filter options are those of `TreeFilter.from_options`.
+
+    Everything built with them shares one definition cache and one
+    pool of worker processes.
+
+    """
+
+    # without the disk cache we still share the definitions in memory
+    if no_cache:
+        cache = DefinitionCache(cache_dir=None)
+    else:
+        cache = DefinitionCache(cache_dir)
+
+    tree_filter = TreeFilter.from_options(**filter_options)
+
+    if jobs == 0:
+        jobs = os.cpu_count()
+
+    if jobs > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        executor = ProcessPoolExecutor(max_workers=jobs, initializer=profiling.init_worker)
+    else:
+        executor = None
+
+    try:
+        yield dict(cache=cache, jobs=jobs, executor=executor, tree_filter=tree_filter,
+                   engine=engine, io_threads=io_threads)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+@contextmanager
+def tree_builder(static, **tree_options):
+    """Context manager giving a function that builds the compact
+    interface tree for a module name from the values of the
+    `TREE_OPTIONS`, see `tree_arguments`."""
+
+    with tree_arguments(**tree_options) as tree_kwargs:
+
+        def build(modname, shard=None):
+
+            # a single definition is found without discovering or
+            # parsing the rest of its package
+            if is_address(modname):
+                return address_tree(modname, cache=tree_kwargs['cache'],
+                                    tree_filter=tree_kwargs['tree_filter'],
+                                    engine=tree_kwargs['engine'])
+
+            # in static mode we only pass the name along and nothing
+            # is imported
+            if static or is_module_path(modname):
+                package = modname
+            else:
+                package = import_module(modname)
+
+            return interface_tree(package, compact=True, shard=shard, **tree_kwargs)
+
+        yield build
+
+def build_tree(modname, **tree_options):
+    """Build the compact interface tree for a module name from the
+    values of the `TREE_OPTIONS`."""
+
+    with tree_builder(**tree_options) as build:
+        return build(modname)
+
+# the name at the start of a line of a requirements file
+REQUIREMENT_NAME_RGX = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+def read_module_list(stream):
+    """Read module names from a file with one per line, this can also be
+    a requirements file in which case the distribution names are
+    turned into module names."""
+
+    modnames = []
+    for line in stream:
+
+        line = line.split('#')[0].strip()
+
+        # skip blank lines and pip options
+        if not line or line.startswith('-'):
+            continue
+
+        match = REQUIREMENT_NAME_RGX.match(line)
+        if match is None:
+            continue
+
+        # distributions commonly use dashes where the module names
+        # have underscores
+        modnames.append(match.group(1).replace('-', '_'))
+
+    return modnames
+
+def expand_targets(targets, module_lists):
+    """Get all the packages to process from the command line targets,
+    which are module names or paths, and the module list files.
+
+    Directories that are not packages themselves stand for all of the
+    packages and modules in them.
+
+    """
+
+    modnames = []
+    for target in targets:
+
+        if (osp.isdir(target) and
+            not osp.exists(osp.join(target, '__init__.py'))):
+
+            for _, name, ispkg in iter_modules([target]):
+                if ispkg:
+                    modnames.append(osp.join(target, name))
+                else:
+                    modnames.append(osp.join(target, name + '.py'))
+
+        else:
+            modnames.append(target)
+
+    for module_list in module_lists:
+        modnames.extend(read_module_list(module_list))
+
+    return modnames
+
+# options for commands that can process many packages at once
+BATCH_OPTIONS = [
+    click.option('--from-file', '-r', 'module_lists', type=click.File('r'), multiple=True,
+                 help="File with a module name per line, or a requirements file, "
+                 "to process as well."),
+    click.option('--output-dir', type=click.Path(file_okay=False), default=None,
+                 help="Directory to write one file per package to, named after "
+                 "the package. Needed for more than one package."),
+]
+
+def batch_options(func):
+    for option in reversed(BATCH_OPTIONS):
+        func = option(func)
+    return func
+
+def run_batch(build, targets, module_lists, output, output_dir, ext, write):
+    """Build the tree of every package given and write it with
+    `write(i_tree, stream)`.
+
+    A single package is written to the output stream, with an output
+    directory each package is written to its own file there named
+    after the package. Packages that can't be processed are reported
+    and skipped, and the exit status is then 1.
+
+    """
+
+    modnames = expand_targets(targets, module_lists)
+
+    if len(modnames) == 0:
+        raise click.UsageError("No packages given.")
+
+    if output_dir is None:
+
+        if len(modnames) > 1:
+            raise click.UsageError("--output-dir is needed for more than one package.")
+
+        write(build(modnames[0]), output)
+        return
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    failed = []
+    for modname in modnames:
+
+        try:
+            i_tree = build(modname)
+        # a definition that is not in the module of an address is a
+        # LookupError
+        except (ImportError, SyntaxError, OSError, LookupError) as err:
+            click.echo("Skipping {}: {}".format(modname, err), err=True)
+            failed.append(modname)
+            continue
+
+        if is_address(modname):
+            module, definition_names = split_address(modname)
+            filename = MODULE_SEPARATOR.join([package_name(module)] + definition_names) + ext
+        else:
+            filename = package_name(modname) + ext
+        with open(osp.join(output_dir, filename), 'w') as wf:
+            write(i_tree, wf)
+
+    if len(failed) > 0:
+        sys.exit(1)
 
 @click.command()
 @click.option('--marker', type=click.Choice(['outline', 'checklist']), default="outline")
-@click.argument('modname')
-def orgmode(marker, modname):
+@tree_options
+@batch_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the listing to, defaults to stdout.")
+@click.option('--update', 'update_path', type=click.Path(dir_okay=False), default=None,
+              help="Existing listing to update in place, keeping the checkboxes and "
+              "notes of its nodes and striking through the removed ones.")
+@click.argument('modnames', nargs=-1)
+def orgmode(marker, module_lists, output_dir, output, update_path, modnames,
+            **tree_options):
+    """Write the org mode listing of each of the MODNAMES, which are
+    module names, paths to packages, or directories of packages.
 
-    package = import_module(modname)
+    A single definition is listed, with the modules and classes it is
+    in, by its address, e.g. pkg.sub.mod:ClassName. Only the modules on
+    the way to it are looked at, no matter the size of the package.
 
-    i_tree = interface_tree(package)
+    """
 
     if marker == 'outline':
         m = '-'
     elif marker == "checklist":
         m = '- [ ]'
 
-    org_listing = listing(i_tree, marker=m)
+    if update_path is not None:
+
+        modnames = expand_targets(modnames, module_lists)
+        if len(modnames) != 1:
+            raise click.UsageError("--update takes a single package.")
+
+        with tree_builder(**tree_options) as build:
+            counts = update_listing(build(modnames[0]), update_path, marker=m)
+
+        click.echo("{}: {} added, {} removed, {} restored{}".format(
+            update_path, counts['added'], counts['removed'], counts['restored'],
+            "" if counts['changed'] else ", unchanged"), err=True)
+        return
+
+    # the lines are written as they are generated
+    def write(i_tree, stream):
+        write_listing(i_tree, stream, marker=m)
+
+    with tree_builder(**tree_options) as build:
+        run_batch(build, modnames, module_lists, output, output_dir, '.org', write)
+
+@click.command(name='json')
+@click.option('--format', 'fmt', type=click.Choice(['nested', 'ndjson']), default="nested",
+              help="A single nested JSON document or one JSON record per node.")
+@tree_options
+@batch_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the JSON to, defaults to stdout.")
+@click.argument('modnames', nargs=-1)
+def json_(fmt, module_lists, output_dir, output, modnames, **tree_options):
+    """Write the interface tree of each of the MODNAMES as JSON, see
+    orgmode for the MODNAMES."""
+
+    if fmt == 'nested':
+        write, ext = write_json, '.json'
+    elif fmt == 'ndjson':
+        write, ext = write_ndjson, '.ndjson'
+
+    with tree_builder(**tree_options) as build:
+        run_batch(build, modnames, module_lists, output, output_dir, ext, write)
+
+@click.command()
+@click.option('--format', 'fmt', type=click.Choice(['text', 'json']), default="text",
+              help="Lines starting with '+' (added), '-' (removed), and '>' (moved), "
+              "or a JSON document.")
+@tree_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the differences to, defaults to stdout.")
+@click.argument('old')
+@click.argument('new')
+def diff(fmt, output, old, new, **tree_options):
+    """Show the definitions added, removed, and moved between the OLD
+    and NEW package, each given as a module name or a path to the
+    package directory."""
+
+    with tree_builder(**tree_options) as build:
+        old_tree = build(old)
+        new_tree = build(new)
+
+    differences = diff_interface_trees(old_tree, new_tree)
+
+    if fmt == 'json':
+        json.dump(differences, output, indent=2)
+        output.write('\n')
+        return
+
+    for fqname, kind in differences['added']:
+        output.write("+ {} ({})\n".format(fqname, kind))
+
+    for fqname, kind in differences['removed']:
+        output.write("- {} ({})\n".format(fqname, kind))
+
+    for old_fqname, new_fqname, kind in differences['moved']:
+        output.write("> {} -> {} ({})\n".format(old_fqname, new_fqname, kind))
+
+# bytes of the output files of render to buffer between writes
+RENDER_BUFFER_SIZE = 1024 * 1024
+
+def _outputs_option(ctx, param, value):
+    try:
+        return [renderers.parse_output_spec(spec) for spec in value]
+    except ValueError as err:
+        raise click.BadParameter(str(err))
+
+@click.command()
+@click.option('--format', 'outputs', multiple=True, required=True, callback=_outputs_option,
+              help="Format and file to write as FORMAT=PATH, where FORMAT is one of {} "
+              "and PATH can be - for stdout. Can be given more than once, every format "
+              "is written from the same walk of the tree.".format(
+                  ", ".join(renderers.SINK_FORMATS)))
+@tree_options
+@click.argument('modname')
+def render(outputs, modname, **tree_options):
+    """Build the interface tree of MODNAME once and write it in all of
+    the given formats, see orgmode for MODNAME."""
+
+    paths = [path for _, path in outputs]
+    if len(set(paths)) != len(paths):
+        raise click.UsageError("Every format needs its own file.")
+
+    i_tree = build_tree(modname, **tree_options)
+
+    with ExitStack() as stack:
+
+        sinks = []
+        for format_name, path in outputs:
+
+            if path == '-':
+                stream = sys.stdout
+            else:
+                stream = stack.enter_context(open(path, 'w', buffering=RENDER_BUFFER_SIZE))
+
+            sinks.append(renderers.make_sink(format_name, stream))
+
+        renderers.render(i_tree, sinks)
+
+def _shard_option(ctx, param, value):
+    try:
+        return parse_shard(value)
+    except ValueError as err:
+        raise click.BadParameter(str(err))
+
+@click.command()
+@click.option('--shard', required=True, callback=_shard_option,
+              help="The shard of the modules to parse as i/N, from 0/N to N-1/N.")
+@tree_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the partial tree to, defaults to stdout.")
+@click.argument('modname')
+def partial(shard, output, modname, **tree_options):
+    """Write the partial interface tree of one shard of the modules of
+    MODNAME, to be put together with the others by merge.
+
+    Every shard should be run with the same options and version of the
+    package."""
+
+    with tree_builder(**tree_options) as build:
+        write_partial(build(modname, shard=shard), output, shard)
+
+@click.command()
+@click.option('--format', 'fmt', type=click.Choice(['orgmode', 'checklist', 'json', 'ndjson']),
+              default="orgmode", help="The format to write the merged tree in.")
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the merged tree to, defaults to stdout.")
+@click.argument('partials', nargs=-1, required=True, type=click.File('r'))
+def merge(fmt, output, partials):
+    """Merge the PARTIALS trees written by partial for all of the shards
+    into the whole interface tree."""
+
+    try:
+        i_tree = merge_partials(partials)
+    except ValueError as err:
+        raise click.ClickException(str(err))
+
+    if fmt == 'orgmode':
+        write_listing(i_tree, output)
+    elif fmt == 'checklist':
+        write_listing(i_tree, output, marker='- [ ]')
+    elif fmt == 'json':
+        write_json(i_tree, output)
+    elif fmt == 'ndjson':
+        write_ndjson(i_tree, output)
+
+@click.command()
+@click.option('--format', 'fmt', type=click.Choice(['orgmode', 'checklist', 'json', 'ndjson']),
+              default="orgmode",
+              help="The format of the output, a checklist keeps its checked boxes, "
+              "see orgmode --update.")
+@click.option('--output', '-o', type=click.Path(dir_okay=False), required=True,
+              help="File to keep up to date.")
+@click.option('--poll', is_flag=True,
+              help="Poll the files for changes instead of using inotify, e.g. for "
+              "changes made from other machines on network filesystems.")
+@click.option('--interval', type=click.FloatRange(min=0), default=DEFAULT_POLL_INTERVAL,
+              show_default=True, help="Seconds between polls.")
+@tree_options
+@click.argument('modname')
+def watch(fmt, output, poll, interval, static, modname, **tree_options):
+    """Write the interface tree of MODNAME to a file and rewrite it
+    whenever the source files change, until interrupted. Only the
+    changed modules are parsed again."""
+
+    if not static or is_archive_path(modname):
+        raise click.UsageError("Only packages found statically on the filesystem "
+                               "can be watched.")
+
+    def write(i_tree):
+        if fmt == 'checklist':
+            update_listing(i_tree, output, marker='- [ ]')
+        elif fmt == 'orgmode':
+            write_file(output, lambda stream: write_listing(i_tree, stream))
+        elif fmt == 'json':
+            write_file(output, lambda stream: write_json(i_tree, stream))
+        elif fmt == 'ndjson':
+            write_file(output, lambda stream: write_ndjson(i_tree, stream))
+
+    with tree_arguments(**tree_options) as tree_kwargs:
+
+        watched = WatchedTree(modname, **tree_kwargs)
+        write(watched.tree)
+
+        watcher = make_watcher(poll=poll, interval=interval)
+        click.echo("Watching {} files of {} with {}".format(
+            len(watched.watched_paths()), modname, type(watcher).__name__), err=True)
+
+        try:
+            while True:
+
+                watcher.set_paths(watched.watched_paths())
+                changed = watcher.wait()
+
+                start = time.perf_counter()
+                if watched.update(changed):
+                    write(watched.tree)
+                    click.echo("Updated {} in {:.3f} s".format(
+                        output, time.perf_counter() - start), err=True)
+
+                for filepath, message in watched.errors:
+                    click.echo("Keeping the old definitions of {}: {}".format(
+                        filepath, message), err=True)
 
-    click.echo(org_listing)
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            watcher.close()
+
+@click.command()
+@click.option('--db', type=click.Path(dir_okay=False), default=DEFAULT_INDEX_PATH,
+              show_default=True, help="The SQLite index file.")
+@parse_options
+@click.option('--from-file', '-r', 'module_lists', type=click.File('r'), multiple=True,
+              help="File with a module name per line, or a requirements file, "
+              "to index as well.")
+@click.argument('modnames', nargs=-1)
+def index(db, module_lists, modnames, **parse_options):
+    """Add the modules and definitions of the MODNAMES to an index, or
+    update them, to query them with find. The MODNAMES are found
+    statically, see orgmode."""
+
+    modnames = expand_targets(modnames, module_lists)
+    if len(modnames) == 0:
+        raise click.UsageError("No packages given.")
+
+    with tree_arguments(**parse_options) as tree_kwargs, DefinitionIndex(db) as d_index:
+
+        del tree_kwargs['tree_filter']
+
+        for modname in modnames:
+            n_modules = d_index.add_package(modname, **tree_kwargs)
+            click.echo("Indexed {} modules of {}".format(n_modules, modname), err=True)
+
+@click.command()
+@click.option('--db', type=click.Path(dir_okay=False), default=DEFAULT_INDEX_PATH,
+              show_default=True, help="The SQLite index file.")
+@click.option('--prefix', is_flag=True, help="Find the names starting with NAME.")
+@click.option('--kind', 'kinds', multiple=True, type=click.Choice(KIND_NAMES),
+              help="Kind of definition to find. Can be given more than once.")
+@click.option('--package', default=None, help="Only find names in this package.")
+@click.option('--format', 'fmt', type=click.Choice(['text', 'ndjson']), default="text",
+              help="Lines with the name and kind, or a JSON record per name.")
+@click.option('--no-refresh', is_flag=True,
+              help="Don't check for changed files before querying.")
+@parse_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the names to, defaults to stdout.")
+@click.argument('name', required=False)
+def find(db, prefix, kinds, package, fmt, no_refresh, output, name, **parse_options):
+    """Find the modules and definitions called NAME, or of the given
+    kinds, in an index made with index. The modules that changed
+    since are indexed again first. Exits with status 1 if nothing is
+    found."""
 
+    if not osp.exists(db):
+        raise click.UsageError("No index at {}, make one with the index command.".format(db))
 
+    with DefinitionIndex(db) as d_index:
+
+        if not no_refresh:
+            with tree_arguments(**parse_options) as tree_kwargs:
+                d_index.refresh(cache=tree_kwargs['cache'], engine=tree_kwargs['engine'],
+                                io_threads=tree_kwargs['io_threads'])
+
+        n_found = 0
+        for fqname, kind, filepath in d_index.find(name=name, prefix=prefix, kinds=kinds,
+                                                   package=package):
+            n_found += 1
+
+            if fmt == 'text':
+                output.write("{} ({})\n".format(fqname, kind))
+            elif fmt == 'ndjson':
+                output.write(json.dumps({'fqname' : fqname,
+                                         'kind' : kind,
+                                         'filepath' : filepath}) + '\n')
+
+    if n_found == 0:
+        sys.exit(1)
+
+@click.command()
+@click.option('--format', 'fmt', type=click.Choice(['org', 'json']), default="org",
+              help="An org mode checklist of the modules, after the import cycles, or a "
+              "JSON document.")
+@click.option('--sort', type=click.Choice(['order', 'cost']), default="order",
+              help="List the modules after the modules they import, or by the size of "
+              "the sources they import, largest first.")
+@click.option('--check-cycles', is_flag=True,
+              help="Exit with status 1 if there are import cycles.")
+@parse_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the imports to, defaults to stdout.")
+@click.argument('modname')
+def deps(fmt, sort, check_cycles, output, modname, **parse_options):
+    """Show the imports between the modules of MODNAME, which is found
+    statically, see orgmode.
+
+    Each module is listed with the number of modules and the bytes of
+    their source files that importing it runs, itself included, and
+    the groups of modules that import each other are listed as
+    cycles.
+
+    """
+
+    with tree_arguments(**parse_options) as tree_kwargs:
+        mod_records, graph = package_imports(modname, **tree_kwargs)
+
+    costs = graph.transitive_costs(source_sizes(mod_records))
+    cycles = graph.cycles()
+
+    if sort == 'order':
+        modnames = graph.topological_order()
+    elif sort == 'cost':
+        modnames = sorted(graph.modnames,
+                          key=lambda modname: costs[graph.module_id(modname)][1],
+                          reverse=True)
+
+    if fmt == 'json':
+
+        modules = []
+        for modname in modnames:
+            n_modules, size = costs[graph.module_id(modname)]
+            modules.append({'module' : modname,
+                            'imports' : graph.imports(modname),
+                            'n_modules' : n_modules,
+                            'size' : size})
+
+        json.dump({'modules' : modules, 'cycles' : cycles}, output, indent=2)
+        output.write('\n')
+
+    elif fmt == 'org':
+
+        if len(cycles) > 0:
+            output.write("* Import cycles\n")
+            for cycle in cycles:
+                output.write("- {}\n".format(", ".join(cycle)))
+
+        output.write("* Modules\n")
+        for modname in modnames:
+            n_modules, size = costs[graph.module_id(modname)]
+            output.write("- [ ] {} ({} modules, {} bytes)\n".format(modname, n_modules, size))
+
+    if check_cycles and len(cycles) > 0:
+        sys.exit(1)
+
+@click.command(name='lint-names')
+@click.option('--style', type=click.Choice(list(NAMING_STYLES.keys())), default="snake_case",
+              show_default=True)
+@click.option('--format', 'fmt', type=click.Choice(['org', 'ndjson']), default="org",
+              help="An org mode checklist or one JSON record per violation.")
+@tree_options
+@click.option('--output', '-o', type=click.File('w'), default='-',
+              help="File to write the violations to, defaults to stdout.")
+@click.argument('modname')
+def lint_names(style, fmt, output, modname, **tree_options):
+    """Check the names of all modules and definitions against a naming
+    style. Exits with status 1 if any name does not match."""
+
+    i_tree = build_tree(modname, **tree_options)
+
+    n_violations = 0
+    for node, name_type in check_names(i_tree, style):
+
+        n_violations += 1
+
+        if fmt == 'org':
+            output.write("- [ ] {} ({})\n".format(i_tree.fqname(node), name_type))
+
+        elif fmt == 'ndjson':
+            record = {'fqname' : i_tree.fqname(node),
+                      'kind' : i_tree.kind_name(node),
+                      'name_type' : name_type,
+                      'style' : style}
+            output.write(json.dumps(record) + '\n')
+
+    if n_violations > 0:
+        sys.exit(1)
 
 @click.group()
-def cli():
-    pass
+@click.option('--profile', is_flag=True,
+              help="Print the time and memory of each phase and of the slowest "
+              "modules to stderr. Tracing the memory slows the run down.")
+@click.option('--profile-top', type=click.IntRange(min=0), default=20, show_default=True,
+              help="Number of the slowest modules to print with --profile.")
+@click.option('--trace', type=click.File('w'), default=None,
+              help="File to write a Chrome trace of the run to.")
+@click.pass_context
+def cli(ctx, profile, profile_top, trace):
 
-cli.add_command(orgmode)
+    if not (profile or trace):
+        return
 
-if __name__ == "__main__":
+    profiler = profiling.Profiler(trace_memory=profile)
+    profiling.activate(profiler)
 
-    cli()
+    # report after the command ran
+    def report():
+
+        profiling.deactivate()
 
+        if profile:
+            profiler.report(sys.stderr, top=profile_top)
 
+        if trace is not None:
+            profiler.write_chrome_trace(trace)
 
+    ctx.call_on_close(report)
+
+cli.add_command(orgmode)
+cli.add_command(json_)
+cli.add_command(render)
+cli.add_command(diff)
+cli.add_command(lint_names)
+cli.add_command(partial)
+cli.add_command(merge)
+cli.add_command(watch)
+cli.add_command(index)
+cli.add_command(find)
+cli.add_command(deps)
+
+if __name__ == "__main__":
+
+    cli()
@@ -0,0 +1,191 @@
+import re
+from fnmatch import translate
+
+from pymatuning.tree import (
+    MODULE_SEPARATOR,
+    KIND_CODES,
+    VARIABLE,
+    ATTRIBUTE,
+    GETTER,
+    SETTER,
+    PROPERTY,
+    HAS_DOCSTRING,
+    NO_INFO,
+)
+
+# kinds left out by the shorthand options
+VARIABLE_KINDS = (VARIABLE, ATTRIBUTE,)
+PROPERTY_KINDS = (GETTER, SETTER, PROPERTY,)
+
+def is_private(name):
+    """Names starting with an underscore are private, except for dunder
+    names like `__init__`."""
+
+    return name.startswith('_') and not (name.startswith('__') and name.endswith('__'))
+
+# the start of the wildcards of a glob
+_WILDCARD_RGX = re.compile(r"[*?[]")
+
+def _compile_globs(globs):
+    """Compile glob patterns into a single regex, or None if there are
+    none."""
+
+    if len(globs) == 0:
+        return None
+
+    return re.compile('|'.join('(?:{})'.format(translate(glob)) for glob in globs))
+
+class TreeFilter:
+    """Selects the part of the interface tree to build.
+
+    The filter is applied while the tree is built: modules that are
+    left out are never discovered any further or parsed and left out
+    definitions never become nodes.
+
+    - include :: globs of fully qualified module names, only these
+                 modules and their submodules are included. Their
+                 supermodules are still in the tree, but without their
+                 definitions.
+    - exclude :: globs of fully qualified names of modules and
+                 definitions that are left out with everything in them.
+    - max_depth :: the deepest level of the tree to keep, the root
+                   module is at depth 0.
+    - public_only :: leave out private names (see `is_private`) and
+                     module level definitions not in the `__all__` of
+                     the module, if it has one.
+    - exclude_kinds :: the kind codes of definitions to leave out, see
+                       `pymatuning.tree`.
+    - undocumented_only :: leave out the functions, classes, and
+                           methods that have a docstring, except for
+                           classes with members that are kept.
+
+    """
+
+    def __init__(self, include=(), exclude=(), max_depth=None, public_only=False,
+                 exclude_kinds=(), undocumented_only=False):
+
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.max_depth = max_depth
+        self.public_only = public_only
+        self.exclude_kinds = frozenset(exclude_kinds)
+        self.undocumented_only = undocumented_only
+
+        self._include_rgx = _compile_globs(self.include)
+        self._exclude_rgx = _compile_globs(self.exclude)
+
+        # the include globs split into the patterns for each level
+        # of the module names
+        self._include_parts = [glob.split(MODULE_SEPARATOR) for glob in self.include]
+
+    @classmethod
+    def from_options(cls, include=(), exclude=(), max_depth=None, public_only=False,
+                     exclude_kinds=(), no_variables=False, no_properties=False,
+                     undocumented_only=False):
+        """Make a filter from the values of the command line options, with
+        the kinds given by name. Returns None if nothing is filtered."""
+
+        kinds = set(KIND_CODES[kind] for kind in exclude_kinds)
+        if no_variables:
+            kinds.update(VARIABLE_KINDS)
+        if no_properties:
+            kinds.update(PROPERTY_KINDS)
+
+        if not (include or exclude or max_depth is not None or public_only or kinds or
+                undocumented_only):
+            return None
+
+        return cls(include=include, exclude=exclude, max_depth=max_depth,
+                   public_only=public_only, exclude_kinds=kinds,
+                   undocumented_only=undocumented_only)
+
+    def _excluded(self, fqname):
+        return self._exclude_rgx is not None and self._exclude_rgx.match(fqname) is not None
+
+    def is_included(self, mod_fqname):
+        """Whether the module itself matches the include globs."""
+        return self._include_rgx is None or self._include_rgx.match(mod_fqname) is not None
+
+    def _could_include(self, mod_fqname):
+        # whether an included module could be below this module, i.e.
+        # its name matches the leading parts of an include glob. The
+        # wildcards match dots as well, like in `is_included`, so a
+        # part with one could match the rest of the name and more, and
+        # only the literal text before it has to match.
+        parts = mod_fqname.split(MODULE_SEPARATOR)
+
+        for glob_parts in self._include_parts:
+            for part, glob_part in zip(parts, glob_parts):
+
+                wildcard = _WILDCARD_RGX.search(glob_part)
+                if wildcard is not None:
+                    if part.startswith(glob_part[:wildcard.start()]):
+                        return True
+                    break
+
+                if part != glob_part:
+                    break
+            else:
+                return True
+
+        return False
+
+    def walk_module(self, mod_fqname, depth, parent_selected):
+        """Whether a submodule at this depth is in the tree at all, and so
+        also whether its submodules are looked for. `parent_selected`
+        is whether the supermodule is included."""
+
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        if self.public_only and is_private(mod_fqname.split(MODULE_SEPARATOR)[-1]):
+            return False
+
+        if self._excluded(mod_fqname):
+            return False
+
+        return (parent_selected or
+                self.is_included(mod_fqname) or
+                self._could_include(mod_fqname))
+
+    def selected_modules(self, mod_fqnames):
+        """The set of the modules, given supermodules first, that are
+        included themselves or through one of their supermodules."""
+
+        selected = set()
+        for mod_fqname in mod_fqnames:
+
+            supermod_fqname = MODULE_SEPARATOR.join(mod_fqname.split(MODULE_SEPARATOR)[:-1])
+            if supermod_fqname in selected or self.is_included(mod_fqname):
+                selected.add(mod_fqname)
+
+        return selected
+
+    def keep_definition(self, fqname, name, kind, depth, all_names=None, info=NO_INFO,
+                        n_members=0):
+        """Whether to make a node for a definition. `all_names` is the
+        `__all__` of the module for module level definitions, `info`
+        the info of the definition (see
+        `pymatuning.tree.InterfaceTree.info`), and `n_members` the
+        number of the members of a class that are kept."""
+
+        if kind in self.exclude_kinds:
+            return False
+
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+
+        if self.public_only:
+            if all_names is not None:
+                if name not in all_names:
+                    return False
+            elif is_private(name):
+                return False
+
+        if self._excluded(fqname):
+            return False
+
+        if self.undocumented_only and info[1] & HAS_DOCSTRING and n_members == 0:
+            return False
+
+        return True
@@ -0,0 +1,385 @@
+import os
+from itertools import compress
+
+from pymatuning.listings import package_definitions
+from pymatuning.tree import MODULE_SEPARATOR
+from pymatuning import profiling
+
+def _absolute_module(module, level, mod_fqname, ispkg):
+    # the fully qualified name of the module of an import record in a
+    # module, or None for relative imports beyond the top package
+
+    if level == 0:
+        return module
+
+    # relative imports start from the package the module is in, or
+    # from the module itself for packages
+    parts = mod_fqname.split(MODULE_SEPARATOR)
+    if not ispkg:
+        parts.pop()
+
+    if level - 1 >= len(parts):
+        return None
+
+    parts = parts[:len(parts) - (level - 1)]
+    if module:
+        parts.append(module)
+
+    return MODULE_SEPARATOR.join(parts)
+
+def _package_module(name, modules):
+    # the deepest module of the package that a name is in, e.g. the
+    # module of `import pkg.mod.Class`, or None
+
+    while name not in modules:
+        name, sep, _ = name.rpartition(MODULE_SEPARATOR)
+        if not sep:
+            return None
+
+    return name
+
+def imported_modules(imports, mod_fqname, ispkg, modules):
+    """The names of the modules of a package that a module of it
+    imports, in the order of the import records of its definitions,
+    see `pymatuning.listings.DefinitionVisitor`.
+
+    Relative imports are resolved against the package. `from a import
+    b` imports the module a.b if there is one, and a either way. Only
+    the module named by an import is listed, not the packages it is in
+    that are imported before it, and neither are the packages the
+    module itself is in. Those are implied by the names of the modules
+    and counted in `ImportGraph.transitive_costs`, but a package that
+    imports its submodules is not in a cycle with them.
+
+    """
+
+    imported = {}
+    for module, level, names in imports:
+
+        module = _absolute_module(module, level, mod_fqname, ispkg)
+        if module is None:
+            continue
+
+        target = _package_module(module, modules)
+        if target is not None:
+            imported[target] = None
+
+        for name in names or ():
+            submodule = module + MODULE_SEPARATOR + name
+            if submodule in modules:
+                imported[submodule] = None
+
+    supermodule = mod_fqname
+    while supermodule:
+        imported.pop(supermodule, None)
+        supermodule = supermodule.rpartition(MODULE_SEPARATOR)[0]
+
+    return list(imported)
+
+# turns the digits of a binary number into bytes of 0 and 1
+_BINARY_DIGITS = bytes.maketrans(b'01', b'\x00\x01')
+
+def _bit_flags(bits):
+    # a byte of 0 or 1 for each bit of an integer from the lowest
+    return bin(bits)[:1:-1].encode('ascii').translate(_BINARY_DIGITS)
+
+def _strong_components(imports):
+    # the strongly connected components of a graph given as the lists of
+    # the successors of each node, each after the components its nodes
+    # lead to, with an iterative version of Tarjan's algorithm
+
+    n_modules = len(imports)
+
+    index = [-1] * n_modules
+    low = [0] * n_modules
+    on_stack = [False] * n_modules
+
+    stack = []
+    components = []
+    counter = 0
+
+    for root in range(n_modules):
+
+        if index[root] != -1:
+            continue
+
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+
+        # the modules being visited and how far we are in their
+        # imports
+        work = [(root, 0)]
+        while work:
+
+            module, pos = work[-1]
+            module_imports = imports[module]
+
+            if pos < len(module_imports):
+
+                work[-1] = (module, pos + 1)
+                imported = module_imports[pos]
+
+                if index[imported] == -1:
+                    index[imported] = low[imported] = counter
+                    counter += 1
+                    stack.append(imported)
+                    on_stack[imported] = True
+                    work.append((imported, 0))
+
+                elif on_stack[imported] and index[imported] < low[module]:
+                    low[module] = index[imported]
+
+                continue
+
+            work.pop()
+            if work:
+                importer = work[-1][0]
+                if low[module] < low[importer]:
+                    low[importer] = low[module]
+
+            if low[module] == index[module]:
+
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = False
+                    component.append(member)
+                    if member == module:
+                        break
+
+                components.append(sorted(component))
+
+    return components
+
+class ImportGraph:
+    """The imports between the modules of a package.
+
+    The modules are integer ids in the order they are given, which is
+    also the order of the results. Each has the list of the ids of the
+    modules it imports directly.
+
+    The strongly connected components are found once with an
+    iterative version of Tarjan's algorithm, and the modules each
+    module imports transitively are kept as integer bitsets, so
+    everything about them takes time linear in the number of imports
+    times the number of modules divided by the word size.
+
+    Importing a module first imports the packages it is in. These
+    imports are only counted in the transitive imports and not in the
+    components, where they would put every package that imports its
+    submodules in a cycle with them.
+
+    """
+
+    def __init__(self, modnames):
+
+        self.modnames = list(modnames)
+        self._ids = {modname : module for module, modname in enumerate(self.modnames)}
+
+        self._imports = [[] for _ in self.modnames]
+
+        # the id of the package each module is in, if it is in the graph
+        self._packages = []
+        for modname in self.modnames:
+            package = modname.rpartition(MODULE_SEPARATOR)[0]
+            self._packages.append(self._ids.get(package, -1))
+
+        self._components = None
+
+    def __len__(self):
+        return len(self.modnames)
+
+    def __contains__(self, modname):
+        return modname in self._ids
+
+    def module_id(self, modname):
+        return self._ids[modname]
+
+    def add_import(self, importer, imported):
+        """Add that the module `importer` imports the module `imported`,
+        by name."""
+
+        self._imports[self._ids[importer]].append(self._ids[imported])
+        self._components = None
+
+    def imports(self, modname):
+        """The names of the modules a module imports directly."""
+        return [self.modnames[imported] for imported in self._imports[self._ids[modname]]]
+
+    def edges(self):
+        """Generate the (importer, imported) names of every import."""
+
+        for importer, imports in enumerate(self._imports):
+            for imported in imports:
+                yield self.modnames[importer], self.modnames[imported]
+
+    def components(self):
+        """The strongly connected components as lists of module ids, the
+        components of the modules a module imports come before its
+        own."""
+
+        if self._components is None:
+            self._components = _strong_components(self._imports)
+
+        return self._components
+
+    def cycles(self):
+        """The groups of modules that import each other, directly or
+        not, as lists of names."""
+
+        return [[self.modnames[module] for module in component]
+                for component in self.components() if len(component) > 1]
+
+    def topological_order(self):
+        """The names of all of the modules, each after the modules it
+        imports, except for those in a cycle with it which are next to
+        it."""
+
+        return [self.modnames[module] for component in self.components()
+                for module in component]
+
+    def transitive_imports(self, packages=True):
+        """The modules each module imports directly or not, including
+        itself, as integer bitsets indexed by module id.
+
+        Unless `packages` is False this includes the packages the
+        imported modules are in, which are imported before them.
+
+        """
+
+        if packages:
+            imports = [module_imports + [package] if package != -1 else module_imports
+                       for module_imports, package in zip(self._imports, self._packages)]
+            components = _strong_components(imports)
+        else:
+            imports = self._imports
+            components = self.components()
+
+        component_of = [0] * len(imports)
+        for component_idx, component in enumerate(components):
+            for module in component:
+                component_of[module] = component_idx
+
+        # the modules imported by the modules of each component, the
+        # components they import come before it
+        reached = []
+        for component_idx, component in enumerate(components):
+
+            bits = 0
+            for module in component:
+                bits |= 1 << module
+
+            for module in component:
+                for imported in imports[module]:
+                    imported_component = component_of[imported]
+                    if imported_component != component_idx:
+                        bits |= reached[imported_component]
+
+            reached.append(bits)
+
+        return [reached[component_of[module]] for module in range(len(imports))]
+
+    def transitive_costs(self, weights=None):
+        """The (number of modules, sum of the weights) of the modules
+        importing each module runs, itself and the packages it is in
+        included, in the order of the module ids, see
+        `transitive_imports`.
+
+        The weights are numbers for each module id, e.g. the sizes of
+        their source files, without them the sums are 0.
+
+        """
+
+        costs = {}
+        result = []
+        for bits in self.transitive_imports():
+
+            # the modules of a cycle import the same modules
+            cost = costs.get(bits)
+            if cost is None:
+
+                n_modules = bin(bits).count('1')
+                if weights is None:
+                    total = 0
+                else:
+                    total = sum(compress(weights, _bit_flags(bits)))
+
+                cost = costs[bits] = (n_modules, total)
+
+            result.append(cost)
+
+        return result
+
+    def to_networkx(self):
+        """Convert to a NetworkX DiGraph with an edge from each module to
+        the modules it imports."""
+
+        import networkx as nx
+
+        graph = nx.DiGraph()
+        graph.add_nodes_from(self.modnames)
+        graph.add_edges_from(self.edges())
+
+        return graph
+
+def import_graph(mod_records, mod_defs):
+    """Build the ImportGraph of a package from the (fqname, filepath,
+    ispkg) module records of `pymatuning.listings.discover_modules`
+    and the definitions of each module, which are None for the modules
+    that were not parsed.
+
+    The imports are recorded when the definitions are extracted, so
+    this takes the definitions the interface tree is built from and
+    reads no files.
+
+    """
+
+    with profiling.phase('imports'):
+
+        graph = ImportGraph([mod_fqname for mod_fqname, _, _ in mod_records])
+
+        for (mod_fqname, _, ispkg), defs in zip(mod_records, mod_defs):
+
+            if defs is None:
+                continue
+
+            for imported in imported_modules(defs['imports'], mod_fqname, ispkg, graph):
+                graph.add_import(mod_fqname, imported)
+
+    return graph
+
+def package_imports(package, cache=None, jobs=1, executor=None, tree_filter=None,
+                    engine='ast', io_threads=1):
+    """Find the modules of a package and build the ImportGraph of their
+    imports, with the same arguments as
+    `pymatuning.listings.interface_tree`.
+
+    Returns the module records and the graph.
+
+    """
+
+    mod_records, _, mod_defs = package_definitions(
+        package, cache=cache, jobs=jobs, executor=executor, tree_filter=tree_filter,
+        engine=engine, io_threads=io_threads)
+
+    return mod_records, import_graph(mod_records, mod_defs)
+
+def source_sizes(mod_records):
+    """The sizes in bytes of the source files of the module records, 0
+    for files that are not on the filesystem like the members of
+    archives, or for namespace packages which have no file."""
+
+    sizes = []
+    for _, mod_filepath, _ in mod_records:
+        if mod_filepath is None:
+            sizes.append(0)
+            continue
+
+        try:
+            sizes.append(os.stat(mod_filepath).st_size)
+        except OSError:
+            sizes.append(0)
+
+    return sizes
@@ -0,0 +1,362 @@
+import os
+import os.path as osp
+
+from pymatuning.listings import (
+    discover_modules,
+    package_definitions,
+    add_module_definitions,
+    package_name,
+    is_module_path,
+)
+from pymatuning.sources import split_archive_path
+from pymatuning.cache import is_racy
+from pymatuning.tree import (
+    InterfaceTree,
+    KIND_NAMES,
+    MODULE,
+    MODULE_SEPARATOR,
+    CLASS_METHOD_SEPARATOR,
+)
+from pymatuning import profiling
+
+DEFAULT_INDEX_PATH = 'pymatuning.db'
+
+# change this whenever the schema changes, older indexes are rebuilt
+INDEX_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE kinds (code INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE packages (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, target TEXT NOT NULL);
+CREATE TABLE directories (package_id INTEGER NOT NULL, path TEXT NOT NULL, mtime_ns INTEGER);
+CREATE TABLE modules (id INTEGER PRIMARY KEY, package_id INTEGER NOT NULL,
+                      fqname TEXT NOT NULL, name TEXT NOT NULL, filepath TEXT NOT NULL,
+                      parsed INTEGER NOT NULL, mtime_ns INTEGER, size INTEGER,
+                      racy INTEGER NOT NULL);
+CREATE TABLE definitions (id INTEGER PRIMARY KEY, module_id INTEGER NOT NULL,
+                          parent_id INTEGER, name TEXT NOT NULL, kind INTEGER NOT NULL,
+                          fqname TEXT NOT NULL);
+CREATE INDEX directories_package ON directories (package_id);
+CREATE INDEX modules_package ON modules (package_id);
+CREATE INDEX modules_name ON modules (name);
+CREATE INDEX definitions_name ON definitions (name, kind);
+CREATE INDEX definitions_kind ON definitions (kind);
+CREATE INDEX definitions_module ON definitions (module_id);
+CREATE INDEX definitions_parent ON definitions (parent_id);
+"""
+
+# bigger than any character, for the upper bound of prefix queries
+_MAX_CHAR = '\U0010ffff'
+
+def _file_stat(filepath):
+    # the (mtime_ns, size) of a file, for the members of an archive
+    # those of the archive
+
+    # namespace packages have no file
+    if not filepath:
+        return None, None
+
+    split_path = split_archive_path(filepath)
+    if split_path is not None:
+        filepath = split_path[0]
+
+    try:
+        st = os.stat(filepath)
+    except OSError:
+        return None, None
+
+    return st.st_mtime_ns, st.st_size
+
+def _watched_dirs(mod_records):
+    # the paths whose modification time changes when modules are added
+    # or removed: the package directories, or the archive
+    paths = set()
+    for _, mod_filepath, ispkg in mod_records:
+
+        if mod_filepath is None:
+            continue
+
+        split_path = split_archive_path(mod_filepath)
+        if split_path is not None:
+            paths.add(split_path[0])
+        elif ispkg:
+            paths.add(osp.dirname(mod_filepath))
+
+    return paths
+
+class DefinitionIndex:
+    """SQLite index of the modules and definitions of packages, to query
+    them by name and kind without parsing anything.
+
+    There is a row for every module and for every definition, with the
+    definitions of classes pointing to the row of their class, and the
+    names are indexed. A package is indexed as a whole with
+    `add_package` and only the modules whose files changed since are
+    parsed again by `refresh`.
+
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+
+        # only imported when there is an index to use
+        import sqlite3
+
+        self.path = path
+        self._conn = sqlite3.connect(path)
+
+        try:
+            version = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'version'").fetchone()
+        except sqlite3.OperationalError:
+            version = None
+
+        if version is None or int(version[0]) != INDEX_VERSION:
+            self._create()
+
+    def _create(self):
+
+        conn = self._conn
+        with conn:
+
+            for table in ('meta', 'kinds', 'packages', 'directories', 'modules', 'definitions'):
+                conn.execute("DROP TABLE IF EXISTS {}".format(table))
+
+            conn.executescript(SCHEMA)
+            conn.execute("INSERT INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+            conn.executemany("INSERT INTO kinds VALUES (?, ?)", enumerate(KIND_NAMES))
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _insert_modules(self, package_id, mod_records, parsed, mod_defs):
+        # bulk insert the rows of modules and their definitions, in the
+        # transaction of the caller
+
+        conn = self._conn
+
+        module_id = conn.execute("SELECT coalesce(max(id), 0) FROM modules").fetchone()[0]
+        def_id = conn.execute("SELECT coalesce(max(id), 0) FROM definitions").fetchone()[0]
+
+        module_rows = []
+        def_rows = []
+        for (mod_fqname, mod_filepath, _), parse, defs in zip(mod_records, parsed, mod_defs):
+
+            module_id += 1
+            mtime_ns, size = _file_stat(mod_filepath)
+            module_rows.append((module_id, package_id, mod_fqname,
+                                mod_fqname.split(MODULE_SEPARATOR)[-1], mod_filepath or '',
+                                int(parse), mtime_ns, size, int(is_racy(mtime_ns))))
+
+            if defs is None:
+                continue
+
+            # the same nodes as in the interface tree
+            i_tree = InterfaceTree()
+            module_node = i_tree.add_node(mod_fqname, MODULE)
+            add_module_definitions(i_tree, module_node, defs)
+
+            # the row id and fqname of each node
+            rows = {module_node : (None, mod_fqname)}
+            for node, depth in i_tree.walk():
+
+                if node == module_node:
+                    continue
+
+                parent_id, parent_fqname = rows[i_tree.parent(node)]
+                sep = MODULE_SEPARATOR if depth == 1 else CLASS_METHOD_SEPARATOR
+                fqname = parent_fqname + sep + i_tree.name(node)
+
+                def_id += 1
+                rows[node] = (def_id, fqname)
+                def_rows.append((def_id, module_id, parent_id, i_tree.name(node),
+                                 i_tree.kind(node), fqname))
+
+        conn.executemany("INSERT INTO modules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", module_rows)
+        conn.executemany("INSERT INTO definitions VALUES (?, ?, ?, ?, ?, ?)", def_rows)
+
+    def _delete_modules(self, module_ids):
+
+        module_ids = [(module_id,) for module_id in module_ids]
+        self._conn.executemany("DELETE FROM definitions WHERE module_id = ?", module_ids)
+        self._conn.executemany("DELETE FROM modules WHERE id = ?", module_ids)
+
+    def _set_dirs(self, package_id, mod_records):
+
+        self._conn.execute("DELETE FROM directories WHERE package_id = ?", (package_id,))
+        self._conn.executemany("INSERT INTO directories VALUES (?, ?, ?)",
+                               [(package_id, path, _file_stat(path)[0])
+                                for path in _watched_dirs(mod_records)])
+
+    def add_package(self, target, cache=None, jobs=1, executor=None, engine='ast',
+                    io_threads=1):
+        """Index a package found statically, given like to
+        `pymatuning.listings.discover_modules`, replacing what was
+        indexed for it before. The other arguments are those of
+        `pymatuning.listings.files_definitions`.
+
+        Returns the number of modules indexed.
+
+        """
+
+        # paths have to still work when refreshing from elsewhere
+        if is_module_path(target):
+            target = osp.abspath(target)
+
+        mod_records, parsed, mod_defs = package_definitions(
+            target, cache=cache, jobs=jobs, executor=executor, engine=engine,
+            io_threads=io_threads)
+
+        name = package_name(target)
+
+        with profiling.phase('index'), self._conn:
+
+            conn = self._conn
+
+            row = conn.execute("SELECT id FROM packages WHERE name = ?", (name,)).fetchone()
+            if row is not None:
+                package_id = row[0]
+                self._delete_modules([module_id for module_id, in conn.execute(
+                    "SELECT id FROM modules WHERE package_id = ?", (package_id,))])
+                conn.execute("UPDATE packages SET target = ? WHERE id = ?", (target, package_id))
+            else:
+                package_id = conn.execute("INSERT INTO packages (name, target) VALUES (?, ?)",
+                                          (name, target)).lastrowid
+
+            self._insert_modules(package_id, mod_records, parsed, mod_defs)
+            self._set_dirs(package_id, mod_records)
+
+        return len(mod_records)
+
+    def packages(self):
+        """The (name, target) of the indexed packages."""
+        return self._conn.execute("SELECT name, target FROM packages ORDER BY name").fetchall()
+
+    def refresh(self, cache=None, engine='ast', io_threads=1):
+        """Parse the modules whose files changed since they were indexed
+        again, and rediscover the modules of packages whose directories
+        changed. Returns the number of modules added, removed, or
+        parsed again."""
+
+        n_modules = 0
+        for package_id, target in self._conn.execute(
+                "SELECT id, target FROM packages").fetchall():
+            n_modules += self._refresh_package(package_id, target, cache, engine, io_threads)
+
+        return n_modules
+
+    def _refresh_package(self, package_id, target, cache, engine, io_threads):
+
+        conn = self._conn
+
+        # (id, fqname, filepath, parsed, mtime_ns, size, racy)
+        rows = conn.execute("SELECT id, fqname, filepath, parsed, mtime_ns, size, racy "
+                            "FROM modules WHERE package_id = ?", (package_id,)).fetchall()
+
+        structural = any(_file_stat(path)[0] != mtime_ns for path, mtime_ns in conn.execute(
+            "SELECT path, mtime_ns FROM directories WHERE package_id = ?", (package_id,)))
+
+        if structural:
+            mod_records = discover_modules(target, io_threads=io_threads)
+        else:
+            mod_records = [(fqname, filepath, None) for _, fqname, filepath, _, _, _, _ in rows]
+
+        # the rows by the (fqname, filepath) of the module
+        indexed = {(row[1], row[2]) : row for row in rows}
+
+        # the modules to parse, which are the new ones and the ones
+        # whose files changed, and the rows to delete, which are of the
+        # changed ones and the ones that are gone
+        records = []
+        stale_ids = set(row[0] for row in rows)
+        n_added = 0
+        for mod_record in mod_records:
+
+            row = indexed.get(mod_record[:2])
+            if row is None:
+                n_added += 1
+            else:
+                _, _, filepath, parse, mtime_ns, size, racy = row
+                if not (parse and (racy or _file_stat(filepath) != (mtime_ns, size))):
+                    stale_ids.discard(row[0])
+                    continue
+
+            records.append(mod_record)
+
+        if len(records) == 0 and len(stale_ids) == 0:
+            return 0
+
+        _, parsed, mod_defs = package_definitions(target, cache=cache, engine=engine,
+                                                  io_threads=io_threads, mod_records=records)
+
+        with profiling.phase('index'), conn:
+
+            self._delete_modules(stale_ids)
+            self._insert_modules(package_id, records, parsed, mod_defs)
+
+            if structural:
+                self._set_dirs(package_id, mod_records)
+
+        return len(stale_ids) + n_added
+
+    def find(self, name=None, prefix=False, kinds=(), package=None):
+        """Generate the (fqname, kind name, filepath) of the modules and
+        definitions with a name, or a name starting with it if
+        `prefix` is True, of any of the kinds given by name, in the
+        package given by name. Anything left out matches everything.
+
+        """
+
+        clauses = []
+        params = []
+
+        if name is not None:
+            if prefix:
+                clauses.append("{table}.name >= ? AND {table}.name < ?")
+                params.extend((name, name + _MAX_CHAR))
+            else:
+                clauses.append("{table}.name = ?")
+                params.append(name)
+
+        if package is not None:
+            clauses.append("packages.name = ?")
+            params.append(package)
+
+        kind_codes = [KIND_NAMES.index(kind) for kind in kinds]
+        def_codes = [code for code in kind_codes if code != MODULE]
+
+        queries = []
+        query_params = []
+
+        if len(kind_codes) == 0 or MODULE in kind_codes:
+            queries.append(
+                "SELECT modules.fqname, 0, modules.filepath FROM modules "
+                "JOIN packages ON modules.package_id = packages.id" +
+                "".join((" WHERE " if idx == 0 else " AND ") + clause
+                        for idx, clause in enumerate(clauses)).format(table='modules'))
+            query_params.extend(params)
+
+        if len(kind_codes) == 0 or len(def_codes) > 0:
+
+            def_clauses = list(clauses)
+            if len(def_codes) > 0:
+                def_clauses.append("definitions.kind IN ({})".format(
+                    ", ".join('?' for _ in def_codes)))
+
+            queries.append(
+                "SELECT definitions.fqname, definitions.kind, modules.filepath "
+                "FROM definitions JOIN modules ON definitions.module_id = modules.id "
+                "JOIN packages ON modules.package_id = packages.id" +
+                "".join((" WHERE " if idx == 0 else " AND ") + clause
+                        for idx, clause in enumerate(def_clauses)).format(table='definitions'))
+            query_params.extend(params + def_codes)
+
+        query = " UNION ALL ".join(queries) + " ORDER BY 1"
+
+        for fqname, kind, filepath in self._conn.execute(query, query_params):
+            yield fqname, KIND_NAMES[kind], filepath
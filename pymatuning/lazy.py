@@ -0,0 +1,299 @@
+import re
+
+from pymatuning.listings import (
+    find_module_spec,
+    path_module_spec,
+    is_module_path,
+    file_definitions,
+    add_module_definitions,
+    _walk_submodule,
+    _submodule_selected,
+)
+from pymatuning.sources import DirectorySource, is_archive_path, is_source_file
+from pymatuning.tree import (
+    InterfaceTree,
+    NO_NODE,
+    MODULE,
+    MODULE_SEPARATOR,
+    CLASS_METHOD_SEPARATOR,
+)
+from pymatuning import profiling
+
+# separates the module from the definition in it in an address, e.g.
+# 'pkg.sub.mod:Class.method'
+ADDRESS_SEPARATOR = ':'
+
+# the names of the definitions after the separator
+_DEFINITION_PATH_RGX = re.compile(r"\w+(?:\.\w+)*$")
+
+def is_address(target):
+    """Whether a target is the address of a definition in a module, the
+    module name or path and the dotted path of the definition in it
+    separated by a colon, e.g. 'pkg.sub.mod:Class.method'."""
+
+    if not isinstance(target, str):
+        return False
+
+    module, sep, definition = target.rpartition(ADDRESS_SEPARATOR)
+
+    # e.g. not the drive of a windows path
+    return bool(sep) and bool(module) and _DEFINITION_PATH_RGX.match(definition) is not None
+
+def split_address(address):
+    """Split the address of a definition into the module name or path
+    and the names of the definition and the classes it is in."""
+
+    module, _, definition = address.rpartition(ADDRESS_SEPARATOR)
+    return module, definition.split(CLASS_METHOD_SEPARATOR)
+
+class LazyInterfaceTree(InterfaceTree):
+    """An InterfaceTree of a package found statically on the filesystem
+    that is only discovered and parsed as far as it is looked at.
+
+    At first only the root module is in the tree. The submodules and
+    definitions of a module are added the first time its children are
+    asked for, with `children`, `successors`, or `walk` and everything
+    built on them like the renderers, and are then kept. Only `find`
+    looks at the submodules of a module without parsing it. The members
+    of a class come from the same parse as its module so they are added
+    along with it.
+
+    The info of a module, see `InterfaceTree.info`, is only known
+    once its children are.
+
+    The package is a module name or a path to a package directory or
+    module file, and the keyword arguments are those of
+    `pymatuning.listings.interface_tree`. The cache is not evicted,
+    that is left to whoever made it.
+
+    """
+
+    def __init__(self, package, cache=None, tree_filter=None, engine='ast'):
+
+        super().__init__()
+
+        self.cache = cache
+        self.tree_filter = tree_filter
+        self.engine = engine
+
+        if is_archive_path(package):
+            raise ValueError("Packages in archives can't be expanded lazily: {}".format(package))
+        elif is_module_path(package):
+            spec = path_module_spec(package)
+        else:
+            spec = find_module_spec(package)
+
+        self._source = DirectorySource()
+        self._root_depth = spec.name.count(MODULE_SEPARATOR)
+
+        # the package directories of the modules whose submodules were
+        # not listed yet and whether the filter selects them, and the
+        # files of the ones that were not parsed yet
+        self._unlisted = {}
+        self._unparsed = {}
+
+        self._add_module(spec.name, spec.origin, spec.submodule_search_locations,
+                         NO_NODE,
+                         tree_filter is None or tree_filter.is_included(spec.name))
+
+    def _add_module(self, mod_fqname, origin, package_keys, parent, selected):
+
+        node = self.add_node(mod_fqname, MODULE, parent)
+
+        if package_keys is not None:
+            self._unlisted[node] = (package_keys, selected)
+
+        # supermodules of the included modules are only in the tree
+        # for its structure, see `pymatuning.listings.parsed_modules`
+        if selected and is_source_file(origin):
+            self._unparsed[node] = origin
+
+        profiler = profiling.active_profiler()
+        if profiler is not None:
+            profiler.label_modules([(mod_fqname, origin, package_keys is not None)])
+
+        return node
+
+    def _depth(self, node):
+        return self.name(node).count(MODULE_SEPARATOR) - self._root_depth
+
+    def _list_submodules(self, node):
+
+        package_keys, selected = self._unlisted.pop(node)
+
+        mod_fqname = self.name(node)
+        depth = self._depth(node)
+
+        for submod_basename, submod_origin, submod_key in self._source.iter_modules(package_keys):
+
+            submod_fqname = "{}.{}".format(mod_fqname, submod_basename)
+
+            if not _walk_submodule(self.tree_filter, submod_fqname, depth + 1, selected):
+                continue
+
+            self._add_module(submod_fqname, submod_origin,
+                             None if submod_key is None else [submod_key], node,
+                             _submodule_selected(self.tree_filter, submod_fqname, selected))
+
+    def _parse_module(self, node):
+
+        defs = file_definitions(self._unparsed.pop(node), cache=self.cache, engine=self.engine)
+
+        # the definitions come after the submodules, like in the whole
+        # tree
+        add_module_definitions(self, node, defs, tree_filter=self.tree_filter,
+                               depth=self._depth(node))
+
+    def expand(self, node):
+        """Add the children of a node if they are not in the tree yet."""
+
+        if node in self._unlisted:
+            self._list_submodules(node)
+
+        if node in self._unparsed:
+            self._parse_module(node)
+
+    def is_expanded(self, node):
+        """Whether all of the children of the node are in the tree."""
+        return node not in self._unlisted and node not in self._unparsed
+
+    def expand_all(self):
+        """Expand every node, e.g. before going through the nodes by id
+        up to the length of the tree."""
+
+        for _ in self.walk():
+            pass
+
+    def children(self, node):
+
+        self.expand(node)
+        return super().children(node)
+
+    successors = children
+
+    def walk(self, node=0):
+        """Generate (node, depth) pairs for the subtree of the node in
+        depth first order, expanding every node before it is
+        generated."""
+
+        expand = self.expand
+        first_children = self._first_children
+        next_siblings = self._next_siblings
+        parents = self._parents
+
+        top = node
+        depth = 0
+        while True:
+
+            expand(node)
+            yield node, depth
+
+            child = first_children[node]
+            if child != NO_NODE:
+                node = child
+                depth += 1
+                continue
+
+            while node != top and next_siblings[node] == NO_NODE:
+                node = parents[node]
+                depth -= 1
+
+            if node == top:
+                return
+
+            node = next_siblings[node]
+
+    def _child(self, node, label, modules):
+        # the first child module or definition with the short name, the
+        # first definition of a name is the one in the tree
+
+        for child in InterfaceTree.children(self, node):
+            if (self.kind(child) == MODULE) == modules and self.label(child) == label:
+                return child
+
+        return None
+
+    def find(self, mod_fqname, definition_names=()):
+        """The node of a module of the package, or of a definition in it
+        given by the names of the classes it is in and its own.
+
+        Only the modules on the way to it are discovered, and only the
+        module itself is parsed.
+
+        Raises ModuleNotFoundError for modules and LookupError for
+        definitions that are not in the tree.
+
+        """
+
+        node = self.root
+        root_name = self.name(node)
+
+        if mod_fqname != root_name:
+
+            if not mod_fqname.startswith(root_name + MODULE_SEPARATOR):
+                raise ModuleNotFoundError("{} is not in {}".format(mod_fqname, root_name),
+                                          name=mod_fqname)
+
+            for submod_basename in mod_fqname[len(root_name) + 1:].split(MODULE_SEPARATOR):
+
+                if node in self._unlisted:
+                    self._list_submodules(node)
+
+                node = self._child(node, submod_basename, True)
+                if node is None:
+                    raise ModuleNotFoundError("No module named {}".format(mod_fqname),
+                                              name=mod_fqname)
+
+        for depth, name in enumerate(definition_names):
+
+            self.expand(node)
+
+            child = self._child(node, name, False)
+            if child is None:
+                raise LookupError("No definition {} in {}".format(
+                    CLASS_METHOD_SEPARATOR.join(definition_names[:depth + 1]), mod_fqname))
+
+            node = child
+
+        return node
+
+def lazy_interface_tree(package, cache=None, tree_filter=None, engine='ast'):
+    """Make the interface tree of a package that is only discovered and
+    parsed as far as it is looked at, see `LazyInterfaceTree`."""
+
+    return LazyInterfaceTree(package, cache=cache, tree_filter=tree_filter, engine=engine)
+
+def address_tree(address, cache=None, tree_filter=None, engine='ast'):
+    """Build the interface tree of a single module or definition given
+    by its address, see `is_address`, e.g. 'pkg.sub.mod:Class'.
+
+    The tree has the whole subtree of the definition and only the
+    modules and classes it is in above it. For a module name the tree
+    starts from its top level package, for a path from the module at
+    the path.
+
+    Only the modules on the way to the definition are discovered and
+    only the one it is in is parsed, so this takes about as long no
+    matter the size of the package.
+
+    """
+
+    module, definition_names = split_address(address)
+
+    if is_module_path(module):
+        package = module
+        mod_fqname = path_module_spec(module).name
+    else:
+        package = module.split(MODULE_SEPARATOR)[0]
+        mod_fqname = module
+
+    tree = LazyInterfaceTree(package, cache=cache, tree_filter=tree_filter, engine=engine)
+
+    with profiling.phase('build'):
+        branch = tree.branch(tree.find(mod_fqname, definition_names))
+
+    # keep the cache within its size bounds
+    if cache is not None:
+        cache.evict()
+
+    return branch
@@ -1,16 +1,51 @@
 from pkgutil import iter_modules, walk_packages
+import hashlib
 from importlib import import_module
+from importlib.machinery import PathFinder
 import importlib.util as imp
 import ast
 import itertools as it
 import os.path as osp
 import os
-
-
-import networkx as nx
-
-MODULE_SEPARATOR = '.'
-CLASS_METHOD_SEPARATOR = '.'
+import time
+import weakref
+
+from pymatuning import profiling
+from pymatuning.scanner import skeleton_source, ScanError
+from pymatuning.shards import shard_of
+from pymatuning.sources import (
+    DirectorySource,
+    open_archive,
+    archive_module,
+    split_archive_path,
+    is_archive_path,
+    is_source_file,
+    iter_file_sources,
+    prefetch_map,
+)
+
+from pymatuning.tree import (
+    InterfaceTree,
+    as_interface_tree,
+    NO_NODE,
+    MODULE_SEPARATOR,
+    CLASS_METHOD_SEPARATOR,
+    MODULE,
+    VARIABLE,
+    FUNCTION,
+    CLASS,
+    ATTRIBUTE,
+    METHOD,
+    CLASSMETHOD,
+    STATICMETHOD,
+    GETTER,
+    SETTER,
+    PROPERTY,
+    HAS_DOCSTRING,
+    IS_ASYNC,
+    RETURNS_ANNOTATED,
+    NO_INFO,
+)
 
 AST_FUNCTION_CLASS = ast.FunctionDef
 AST_CLASS_CLASS = ast.ClassDef
@@ -109,15 +144,89 @@ def package_struct(package):
     return {mod_basename(root_modname) : submod_list}
 
 
-def list_all_submodules(package):
-    """ List all the modules in this package with their fully qualified names."""
+def find_module_spec(modname):
+    """Find the module spec for a fully qualified module name without
+    importing it or any of its parent packages."""
+
+    # top level modules can be found directly on sys.path, this does
+    # not execute anything
+    if MODULE_SEPARATOR not in modname:
+        spec = imp.find_spec(modname)
+
+        # frozen modules, e.g. `os`, are read from the same source file
+        # as when they are imported from sys.path
+        if spec is not None and spec.origin == 'frozen':
+            spec = PathFinder.find_spec(modname) or spec
+
+    # for submodules importlib.util.find_spec would import the parent
+    # packages so instead we search the locations of the parent spec
+    else:
+        parent_spec = find_module_spec(mod_rootname(modname))
+
+        if parent_spec.submodule_search_locations is None:
+            raise ModuleNotFoundError("{} is not a package".format(parent_spec.name),
+                                      name=modname)
+
+        spec = PathFinder.find_spec(modname, parent_spec.submodule_search_locations)
+
+    if spec is None:
+        raise ModuleNotFoundError("No module named {}".format(modname),
+                                  name=modname)
+
+    return spec
+
+def is_module_path(package):
+    """Whether a package given as a string is the path to a package
+    directory, module file, or archive rather than a module name."""
+
+    return isinstance(package, str) and (os.sep in package or
+                                         package.endswith('.py') or
+                                         is_archive_path(package))
+
+def path_module_spec(path):
+    """Make the module spec for a package directory or a module file,
+    the module name is the base name of the path."""
+
+    path = osp.normpath(path)
+    modname = osp.splitext(osp.basename(path))[0]
+
+    if osp.isdir(path):
+        spec = imp.spec_from_file_location(modname, osp.join(path, "__init__.py"),
+                                           submodule_search_locations=[path])
+    elif osp.isfile(path):
+        spec = imp.spec_from_file_location(modname, path)
+    else:
+        spec = None
+
+    if spec is None:
+        raise ModuleNotFoundError("No module at {}".format(path), name=modname)
+
+    return spec
+
+def module_filepath(module):
+    """Get the source file path for a module object or for a fully
+    qualified module name, without importing the latter."""
+
+    if isinstance(module, str):
+        return find_module_spec(module).origin
+    else:
+        return module.__file__
+
+def _walk_submodule(tree_filter, submod_fqname, depth, selected):
+    # whether to look at a submodule at all according to the filter
+    return tree_filter is None or tree_filter.walk_module(submod_fqname, depth, selected)
+
+def _submodule_selected(tree_filter, submod_fqname, selected):
+    return selected or tree_filter is None or tree_filter.is_included(submod_fqname)
+
+def _discover_imported_modules(package, tree_filter=None, depth=0, selected=True):
 
     root_modname = package.__name__
 
     # if the module is not a package do nothing, we check this by the
     # presence of the __path__ attribute which only packages have
     if not hasattr(package, "__path__"):
-        return [root_modname]
+        return [(root_modname, package.__file__, False)]
 
     submod_list = []
 
@@ -125,107 +234,757 @@ def list_all_submodules(package):
 
         submod_fqname = "{}.{}".format(root_modname, submod_basename)
 
-        submod = import_module(submod_fqname)
+        # modules the filter leaves out are not even imported
+        if not _walk_submodule(tree_filter, submod_fqname, depth + 1, selected):
+            continue
+
+        with profiling.module_phase('import', submod_fqname):
+            submod = import_module(submod_fqname)
 
         # if this module is a package, we recursively search for more
-        # modules and add those to the submodule list as a dictionary
+        # modules and add those to the submodule list
         if ispkg:
-            submod_list.extend(list_all_submodules(submod))
+            submod_list.extend(_discover_imported_modules(
+                submod, tree_filter=tree_filter, depth=depth + 1,
+                selected=_submodule_selected(tree_filter, submod_fqname, selected)))
 
-        # otherwise we just add the string basename for this non-package module
-        # to the submodule list
+        # otherwise we just add the record for this non-package module
         else:
-            submod_list.append(submod_fqname)
+            submod_list.append((submod_fqname, submod.__file__, False))
+
+    return [(root_modname, package.__file__, True)] + submod_list
+
+def _discover_source_modules(source, modname, origin, package_keys, tree_filter=None,
+                             depth=0, selected=True):
+    # walk the directories of a package with a source provider, the
+    # package keys are None for modules that are not packages
+
+    if package_keys is None:
+        return [(modname, origin, False)]
+
+    submod_list = []
+
+    for submod_basename, submod_origin, submod_key in source.iter_modules(package_keys):
+
+        submod_fqname = "{}.{}".format(modname, submod_basename)
+
+        # subpackages the filter leaves out are never walked
+        if not _walk_submodule(tree_filter, submod_fqname, depth + 1, selected):
+            continue
+
+        submod_list.extend(_discover_source_modules(
+            source, submod_fqname, submod_origin,
+            None if submod_key is None else [submod_key],
+            tree_filter=tree_filter, depth=depth + 1,
+            selected=_submodule_selected(tree_filter, submod_fqname, selected)))
+
+    return [(modname, origin, True)] + submod_list
+
+def _discover_static_modules(modname, spec=None, tree_filter=None, selected=True,
+                             io_threads=1):
+
+    if spec is None:
+        spec = find_module_spec(modname)
+
+    # the directories are listed with scandir instead of asking the
+    # import system for the spec of every submodule
+    with DirectorySource(io_threads=io_threads, tree_filter=tree_filter) as source:
+
+        if spec.submodule_search_locations is not None:
+            source.add_package(spec.submodule_search_locations, modname, selected=selected)
+
+        return _discover_source_modules(source, modname, spec.origin,
+                                        spec.submodule_search_locations,
+                                        tree_filter=tree_filter, selected=selected)
+
+def _archive_module(source, path_in_archive):
+    # the (fqname, filepath, package key) of a module in an archive
+    # given by its name after the archive path, if any
+
+    modnames = path_in_archive.replace('/', MODULE_SEPARATOR).split(MODULE_SEPARATOR)
+    modnames = [modname for modname in modnames if modname]
+
+    mod_fqname, origin, package_key = archive_module(
+        source, modnames[0] if len(modnames) > 0 else None)
+
+    for modname in modnames[1:]:
+
+        submodules = [] if package_key is None else source.iter_modules([package_key])
+        for submod_basename, origin, package_key in submodules:
+            if submod_basename == modname:
+                break
+        else:
+            raise ModuleNotFoundError("No module named {}.{} in {}".format(
+                mod_fqname, modname, source.archive_path), name=modname)
+
+        mod_fqname = "{}.{}".format(mod_fqname, modname)
+
+    return mod_fqname, origin, package_key
+
+def _discover_archive_modules(path, tree_filter=None):
+
+    archive_path, path_in_archive = split_archive_path(path)
+
+    # nothing is unpacked, the archive is only listed
+    with open_archive(archive_path) as source:
+
+        mod_fqname, origin, package_key = _archive_module(source, path_in_archive)
+
+        return _discover_source_modules(
+            source, mod_fqname, origin, None if package_key is None else [package_key],
+            tree_filter=tree_filter,
+            selected=tree_filter is None or tree_filter.is_included(mod_fqname))
+
+def discover_modules(package, tree_filter=None, io_threads=1):
+    """List all the modules in this package as (fqname, filepath, ispkg)
+    records in depth first order.
+
+    The package may be given either as a module object, in which case
+    all submodules are imported to find them, or as a fully qualified
+    module name, in which case they are found statically on the
+    filesystem without executing any code of the package. A path to a
+    package directory or module file (with a path separator or a '.py'
+    extension) is found statically as well.
+
+    Packages can also be read from wheels, zip files, and tarballs
+    (e.g. source distributions) without unpacking them, given as the
+    path to the archive optionally followed by the name of a module in
+    it, e.g. 'dist/foo-1.0.tar.gz/foo.bar'. Without a module name the
+    package named after the distribution is used. The file paths of
+    the modules in archives are the path of the archive followed by
+    the path in it, like those zipimport uses.
+
+    If a `pymatuning.filters.TreeFilter` is given the modules it
+    leaves out are skipped without looking into them.
+
+    With more than one I/O thread the directories of a package found
+    statically are listed ahead in that many threads, see
+    `pymatuning.sources.DirectorySource`.
+
+    """
+
+    with profiling.phase('discovery'):
+
+        if is_archive_path(package):
+            mod_records = _discover_archive_modules(package, tree_filter=tree_filter)
+
+        elif is_module_path(package):
+            spec = path_module_spec(package)
+            mod_records = _discover_static_modules(
+                spec.name, spec=spec, tree_filter=tree_filter,
+                selected=tree_filter is None or tree_filter.is_included(spec.name),
+                io_threads=io_threads)
+
+        elif isinstance(package, str):
+            mod_records = _discover_static_modules(
+                package, tree_filter=tree_filter,
+                selected=tree_filter is None or tree_filter.is_included(package),
+                io_threads=io_threads)
+        else:
+            mod_records = _discover_imported_modules(
+                package, tree_filter=tree_filter,
+                selected=tree_filter is None or tree_filter.is_included(package.__name__))
+
+    profiler = profiling.active_profiler()
+    if profiler is not None:
+        profiler.label_modules(mod_records)
+
+    return mod_records
+
+def list_all_submodules(package):
+    """ List all the modules in this package with their fully qualified names."""
 
-    # return all the modules as one flattened list
-    return [root_modname] + submod_list
+    return [mod_fqname for mod_fqname, _, _ in discover_modules(package)]
 
-def package_tree(package):
+def package_name(package):
+    """The fully qualified name of a package given as a module object,
+    a module name, or a path."""
+
+    if is_archive_path(package):
+        archive_path, path_in_archive = split_archive_path(package)
+        with open_archive(archive_path) as source:
+            return _archive_module(source, path_in_archive)[0]
+
+    elif is_module_path(package):
+        return path_module_spec(package).name
+
+    elif isinstance(package, str):
+        return package
+    else:
+        return package.__name__
+
+def package_tree(package, cache=None, jobs=1):
     """Generate a NetworkX DiGraph representing the tree structure of the
-    package modules. The node IDs are the fully qualified module names."""
+    package modules. The node IDs are the fully qualified module names.
+
+    The package may be a module object or a module name, see
+    `discover_modules`. If a `pymatuning.cache.DefinitionCache` is
+    given only the modules that changed since the last run are
+    parsed. The modules are parsed in `jobs` processes, see
+    `files_definitions`.
+
+    """
+
+    # networkx takes long to import and most runs never need it
+    import networkx as nx
 
     pt = nx.DiGraph()
 
-    package_fqnames = list_all_submodules(package)
+    # the definitions come straight from the source files, only
+    # extension modules and namespace packages have none
+    mod_records, _, mod_defs = package_definitions(package, cache=cache, jobs=jobs)
+
     # add all the nodes
-    for mod_fqname in package_fqnames:
-        pt.add_node(mod_fqname)
+    for mod_fqname, mod_filepath, _ in mod_records:
+        pt.add_node(mod_fqname, filepath=mod_filepath)
 
     # then make the edges, by just focusing on connections between the
-    # base name and its supermodule
-    for mod_fqname in package_fqnames:
+    # base name and its supermodule, the root module comes first
+    root_fqname = mod_records[0][0]
+    for mod_fqname, _, _ in mod_records:
         # avoid splitting the name of the root module
-        if MODULE_SEPARATOR in mod_fqname:
-            base = mod_basename(mod_fqname)
+        if mod_fqname != root_fqname:
             root = mod_rootname(mod_fqname)
             pt.add_edge(root, mod_fqname)
 
 
-    # now we can traverse this tree and get all the definitions for
-    # each module and add them as attributes to the package tree
-    for mod_fqname in nx.bfs_tree(pt, package.__name__):
-
-        # first we need to load the module and then get it's module
-        # definitions
-        mod = import_module(mod_fqname)
-
-        defs = module_definitions(mod)
-
-        # then update that nodes attributes with the definitions
-        pt.node[mod_fqname].update(defs)
+    # now add the definitions as attributes to the package tree
+    for (mod_fqname, _, _), defs in zip(mod_records, mod_defs):
+        if defs is not None:
+            pt.nodes[mod_fqname].update(defs)
 
     return pt
 
-def load_module_ast(module):
-    with open(module.__file__) as rf:
+def load_file_ast(filepath):
+    # reading bytes lets the parser respect the encoding declaration
+    with open(filepath, 'rb') as rf:
         st = ast.parse(rf.read())
 
     return st
 
-def list_functions(st):
+def load_module_ast(module):
+    return load_file_ast(module_filepath(module))
 
-    function_names = []
+# the kinds of definitions collected for modules and for classes, in
+# the order they are added to the interface tree
+MODULE_DEFINITION_KINDS = ('functions', 'classes', 'variables',)
+CLASS_DEFINITION_KINDS = ('attributes', 'methods', 'classmethods', 'staticmethods',
+                          'properties', 'setters', 'getters',)
 
-    for thing in st.body:
-        if type(thing) == AST_FUNCTION_CLASS:
-            function_names.append(thing.name)
+def _target_names(target):
+    """Get the variable names bound by the target of an assignment."""
 
-    return function_names
+    if type(target) == ast.Name:
+        return [target.id]
 
-def list_classes(st):
+    # unpacking assignments bind all of the names in them
+    elif type(target) in (ast.Tuple, ast.List):
+        return [name for elt in target.elts for name in _target_names(elt)]
 
-    class_names = []
+    elif type(target) == ast.Starred:
+        return _target_names(target.value)
 
-    for thing in st.body:
-        if type(thing) == AST_CLASS_CLASS:
-            class_names.append(thing.name)
+    # assignments to attributes and subscripts don't define anything
+    else:
+        return []
 
-    return class_names
+def _literal_names(value):
+    """The strings in a literal list or tuple of strings, or None if it
+    is something else."""
+
+    if type(value) not in (ast.List, ast.Tuple):
+        return None
+
+    names = []
+    for elt in value.elts:
+        if type(elt) != ast.Constant or not isinstance(elt.value, str):
+            return None
+        names.append(elt.value)
+
+    return names
+
+def _has_docstring(node):
+    # the same test as `ast.get_docstring`
+    if len(node.body) == 0 or type(node.body[0]) != ast.Expr:
+        return False
+
+    value = node.body[0].value
+    return type(value) == ast.Constant and isinstance(value.value, str)
+
+def _function_info(node):
+    """The (line, flags, number of arguments, number of annotated
+    arguments) of a function definition, see
+    `pymatuning.tree.NO_INFO`."""
+
+    args = node.args
+    arguments = args.posonlyargs + args.args + args.kwonlyargs
+    if args.vararg is not None:
+        arguments.append(args.vararg)
+    if args.kwarg is not None:
+        arguments.append(args.kwarg)
+
+    flags = HAS_DOCSTRING if _has_docstring(node) else 0
+    if type(node) == ast.AsyncFunctionDef:
+        flags |= IS_ASYNC
+    if node.returns is not None:
+        flags |= RETURNS_ANNOTATED
+
+    return [node.lineno, flags, len(arguments),
+            sum(1 for arg in arguments if arg.annotation is not None)]
+
+def _class_info(node):
+    return [node.lineno, HAS_DOCSTRING if _has_docstring(node) else 0, -1, -1]
+
+# the compound statements, and the parts of them, whose blocks are run
+# when a module is imported if they are at the module level
+_BLOCK_CLASSES = tuple(getattr(ast, name) for name in
+                       ('If', 'For', 'AsyncFor', 'While', 'With', 'AsyncWith', 'Try',
+                        'TryStar', 'ExceptHandler', 'Match', 'match_case')
+                       if hasattr(ast, name))
+
+class DefinitionVisitor(ast.NodeVisitor):
+    """Collects all of the top level and class level definitions of a
+    module in a single walk over its syntax tree.
+
+    After visiting a module the `definitions` attribute has the lists
+    of 'functions', 'classes', and 'variables' as well as
+    'class_definitions', a list of (classname, definitions) pairs with
+    the definitions of each class, see `class_definitions`, and 'all'
+    the names in `__all__` if the module sets it to a literal list or
+    tuple of strings.
+
+    'info' has the (line, flags, number of arguments, number of
+    annotated arguments) of the functions and classes by name, and the
+    definitions of each class have the same for its methods, see
+    `pymatuning.tree.NO_INFO`. A name defined more than once has the
+    info of its first definition. 'docstring' is whether the module
+    has a docstring.
+
+    'imports' has a [module, level, names] record for each module
+    imported when the module is, at the module level, in the blocks of
+    compound statements there, or at the class level, in order. For
+    `import a.b` it is ['a.b', 0, None] and for `from ..a import b, c`
+    ['a', 2, ['b', 'c']], the module is '' for `from . import b`.
 
+    """
 
-def list_variables(st):
+    def __init__(self):
 
-    variable_names = []
+        self.definitions = {kind : [] for kind in MODULE_DEFINITION_KINDS}
+        self.definitions['class_definitions'] = []
 
-    for thing in st.body:
-        if type(thing) == AST_VARIABLE_CLASS:
-            # since we can set multiple variables at once with
-            # unpacking we get all the names from the "targets"
-            for name in thing.targets:
-                variable_names.append(name.id)
+        # the names in __all__ if it is a literal list or tuple
+        self.definitions['all'] = None
+
+        self.definitions['info'] = {}
+        self.definitions['docstring'] = False
+
+        self.definitions['imports'] = []
+
+        # the definitions of the class whose body we are in, if any
+        self._class_defs = None
+
+    def generic_visit(self, node):
+        # anything that is not a definition at the module or class
+        # level is not part of the interface so we never descend
+        # into it
+        pass
+
+    def visit_Module(self, node):
+
+        self.definitions['docstring'] = _has_docstring(node)
+
+        for thing in node.body:
+            self.visit(thing)
+
+    def visit_ClassDef(self, node):
+
+        # nested classes are not part of the interface
+        if self._class_defs is not None:
+            return
+
+        self.definitions['classes'].append(node.name)
+        self.definitions['info'].setdefault(node.name, _class_info(node))
+
+        self._class_defs = {kind : [] for kind in CLASS_DEFINITION_KINDS}
+        self._class_defs['info'] = {}
+        for thing in node.body:
+            self.visit(thing)
+
+        self.definitions['class_definitions'].append((node.name, self._class_defs))
+        self._class_defs = None
+
+    def visit_FunctionDef(self, node):
+
+        if self._class_defs is None:
+            self.definitions['functions'].append(node.name)
+            self.definitions['info'].setdefault(node.name, _function_info(node))
+            return
+
+        self._class_defs['info'].setdefault(node.name, _function_info(node))
+
+        # get the names of the plain decorators (e.g. `@property`) and
+        # of the attribute decorators (e.g. `@value.setter`) once
+        decorator_names = set()
+        decorator_attrs = set()
+        for dec in node.decorator_list:
+            if hasattr(dec, 'id'):
+                decorator_names.add(dec.id)
+            elif type(dec) == AST_ATTRIBUTE_CLASS:
+                decorator_attrs.add(dec.attr)
+
+        # methods are all the functions that are not one of the
+        # special methods (property, classmethod, staticmethod)
+        if decorator_names.isdisjoint(SPECIAL_METHODS):
+            self._class_defs['methods'].append(node.name)
+
+        if 'classmethod' in decorator_names:
+            self._class_defs['classmethods'].append(node.name)
+
+        if 'staticmethod' in decorator_names:
+            self._class_defs['staticmethods'].append(node.name)
+
+        if 'property' in decorator_names:
+            self._class_defs['properties'].append(node.name)
+
+        if 'setter' in decorator_attrs:
+            self._class_defs['setters'].append(node.name)
+
+        if 'getter' in decorator_attrs:
+            self._class_defs['getters'].append(node.name)
+
+    # async functions are the same kinds of definitions
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.definitions['imports'].append([alias.name, 0, None])
+
+    def visit_ImportFrom(self, node):
+        self.definitions['imports'].append([node.module or '', node.level,
+                                            [alias.name for alias in node.names]])
+
+    def _visit_block(self, node):
+
+        # nothing but the imports in compound statements is part of
+        # the interface, and in classes they are not looked at at all
+        if self._class_defs is not None:
+            return
+
+        for thing in ast.iter_child_nodes(node):
+            if type(thing) in (ast.Import, ast.ImportFrom):
+                self.visit(thing)
+            elif isinstance(thing, _BLOCK_CLASSES):
+                self._visit_block(thing)
+
+    visit_If = visit_For = visit_AsyncFor = visit_While = _visit_block
+    visit_With = visit_AsyncWith = visit_Try = visit_TryStar = visit_Match = _visit_block
+
+    def visit_Assign(self, node):
+
+        # since we can set multiple variables at once with
+        # unpacking we get all the names from the "targets"
+        names = [name for target in node.targets for name in _target_names(target)]
+
+        if self._class_defs is None:
+            self.definitions['variables'].extend(names)
+
+            if '__all__' in names:
+                self.definitions['all'] = _literal_names(node.value)
+
+        else:
+            self._class_defs['attributes'].extend(names)
+
+    def visit_AugAssign(self, node):
+
+        # only to collect `__all__ += [...]`
+        if (self._class_defs is None and
+            type(node.target) == ast.Name and
+            node.target.id == '__all__' and
+            self.definitions['all'] is not None):
+
+            names = _literal_names(node.value)
+            if names is None:
+                self.definitions['all'] = None
+            else:
+                self.definitions['all'].extend(names)
+
+def extract_definitions(st):
+    """Given the syntax tree of a module return its definitions, see
+    `DefinitionVisitor`."""
+
+    visitor = DefinitionVisitor()
+    visitor.visit(st)
+
+    return visitor.definitions
+
+# the ways of getting the syntax tree the definitions are extracted
+# from, 'ast' parses the whole source and 'scan' only its skeleton
+ENGINES = ('ast', 'scan',)
+
+def _skeleton_ast(source, filepath=None):
+    # the syntax tree of the skeleton of the source, or None if the
+    # source has to be parsed as a whole
+
+    with profiling.module_phase('scan', filepath):
+        try:
+            skeleton = skeleton_source(source)
+        except ScanError:
+            return None
+
+    with profiling.module_phase('parse', filepath):
+        try:
+            return ast.parse(skeleton)
+        except SyntaxError:
+            # parsing the whole source gives the right error
+            return None
+
+def source_definitions(source, filepath=None, engine='ast'):
+    """Get the definitions from the source code of a module. The file
+    path is only used to label the profiling of it.
+
+    With the 'scan' engine only the skeleton of the source is parsed,
+    see `pymatuning.scanner.skeleton_source`, which gives the same
+    definitions several times faster. The whole source is parsed if
+    the scanner can't handle it.
+
+    """
 
-    return variable_names
+    st = None
+    if engine == 'scan':
+        st = _skeleton_ast(source, filepath=filepath)
 
-def module_definitions(module):
+    if st is None:
+        with profiling.module_phase('parse', filepath):
+            st = ast.parse(source)
 
-    st = load_module_ast(module)
-    definitions = {}
-    definitions['functions'] = list_functions(st)
-    definitions['classes'] = list_classes(st)
-    definitions['variables'] = list_variables(st)
+    with profiling.module_phase('extract', filepath):
+        return extract_definitions(st)
+
+def file_definitions(filepath, cache=None, engine='ast', source=None):
+    """Get the definitions of a module source file.
+
+    If a `pymatuning.cache.DefinitionCache` is given the file is only
+    parsed if it changed since its definitions were cached. Both
+    engines give the same definitions so they share the cache.
+
+    The source can be given for files that are not on the filesystem,
+    e.g. the members of an archive.
+
+    """
+
+    if cache is None:
+
+        if source is None:
+            with profiling.module_phase('read', filepath):
+                with open(filepath, 'rb') as rf:
+                    source = rf.read()
+
+        return source_definitions(source, filepath=filepath, engine=engine)
+
+    with profiling.module_phase('cache', filepath):
+        definitions, source = cache.lookup(filepath, source=source)
+
+    if definitions is None:
+        definitions = source_definitions(source, filepath=filepath, engine=engine)
+        cache.store(filepath, definitions)
+
+    return definitions
+
+def _fetch_file(filepath, source, cache, read):
+    # the I/O for a module file before it can be parsed, done ahead in
+    # the I/O threads: looking it up in the cache, which reads it on a
+    # miss, or else reading it. Returns (definitions, source)
+
+    if cache is not None:
+        with profiling.module_phase('cache', filepath):
+            return cache.lookup(filepath, source=source)
+
+    if source is None and read:
+        with profiling.module_phase('read', filepath):
+            with open(filepath, 'rb') as rf:
+                source = rf.read()
+
+    return None, source
+
+def _fetch_files(filepaths, cache, io_threads, read=True):
+    # generate (index, definitions, source) for the files, with the
+    # I/O for the next files done while the ones before are parsed
+
+    def fetch(file_source):
+        idx, source = file_source
+        return _fetch_file(filepaths[idx], source, cache, read)
+
+    for (idx, _), (definitions, source) in prefetch_map(fetch, iter_file_sources(filepaths),
+                                                        io_threads=io_threads):
+        yield idx, definitions, source
+
+def _extract_file_worker(filepath, source, timed, engine):
+    # runs in the worker processes, the source is only given when it
+    # was already read while checking the cache
+
+    start_epoch = time.time()
+    start_cpu = time.process_time()
+
+    if source is None:
+        definitions = file_definitions(filepath, engine=engine)
+    else:
+        definitions = source_definitions(source, engine=engine)
+
+    # the profiler lives in the parent so send back the timings too
+    if timed:
+        timing = (start_epoch, time.time() - start_epoch,
+                  time.process_time() - start_cpu, os.getpid())
+    else:
+        timing = None
+
+    return definitions, timing
+
+def _extract_files_worker(filepaths, sources, timed, engine):
+    # a chunk of files for a worker process
+    return [_extract_file_worker(filepath, source, timed, engine)
+            for filepath, source in zip(filepaths, sources)]
+
+def files_definitions(filepaths, cache=None, jobs=1, executor=None, engine='ast',
+                      io_threads=1):
+    """Get the definitions of many module source files, in the same
+    order as the files.
+
+    With more than one job the files are parsed in a pool of that many
+    worker processes, 0 uses one per CPU. The workers only send back
+    the definitions so the results are the same as parsing serially.
+
+    An existing process pool executor can be given to share it between
+    many calls, e.g. for many packages, `jobs` should then be its
+    number of workers. See `source_definitions` for the engines.
+
+    The files can be members of archives, see `discover_modules`,
+    which are read straight from the archive.
+
+    With more than one I/O thread the files are read, and looked up in
+    the cache, ahead in that many threads while the ones before are
+    parsed, see `pymatuning.sources.prefetch_map`.
+
+    """
+
+    with profiling.phase('extraction', jobs=jobs, engine=engine):
+
+        if jobs == 0:
+            jobs = os.cpu_count()
+
+        if executor is not None:
+            return _parallel_files_definitions(filepaths, cache, jobs, executor, engine,
+                                               io_threads)
+
+        elif jobs == 1:
+
+            definitions = [None for _ in filepaths]
+            for idx, defs, source in _fetch_files(filepaths, cache, io_threads):
+
+                if defs is None:
+                    defs = source_definitions(source, filepath=filepaths[idx], engine=engine)
+                    if cache is not None:
+                        cache.store(filepaths[idx], defs)
+
+                definitions[idx] = defs
+
+            return definitions
+
+        else:
+            # only imported when needed since it is slow to import and
+            # most runs parse in a single process
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs,
+                                     initializer=profiling.init_worker) as executor:
+                return _parallel_files_definitions(filepaths, cache, jobs, executor, engine,
+                                                   io_threads)
+
+def _parallel_files_definitions(filepaths, cache, jobs, executor, engine, io_threads):
+
+    definitions = [None for _ in filepaths]
+
+    # give each worker a few chunks so they stay busy while keeping
+    # the communication overhead low, but not so large that the few
+    # misses of a mostly cached package end up in one chunk
+    chunksize = max(1, min(16, len(filepaths) // (jobs * 4)))
+
+    profiler = profiling.active_profiler()
+
+    def submit(chunk):
+        return executor.submit(_extract_files_worker,
+                               [filepath for _, filepath, _ in chunk],
+                               [source for _, _, source in chunk],
+                               profiler is not None, engine)
+
+    # only the files that are not in the cache go to the workers, a
+    # chunk at a time as soon as it is read. Without a cache the
+    # workers read the files themselves
+    submitted = []
+    chunk = []
+    for idx, defs, source in _fetch_files(filepaths, cache, io_threads, read=False):
+
+        if defs is not None:
+            definitions[idx] = defs
+            continue
+
+        chunk.append((idx, filepaths[idx], source))
+        if len(chunk) == chunksize:
+            submitted.append((chunk, submit(chunk)))
+            chunk = []
+
+    if len(chunk) > 0:
+        submitted.append((chunk, submit(chunk)))
+
+    for chunk, future in submitted:
+        for (idx, filepath, _), (defs, timing) in zip(chunk, future.result()):
+
+            definitions[idx] = defs
+
+            if timing is not None:
+                start_epoch, wall, cpu, pid = timing
+                profiler.add_event('parse+extract', 'module', start_epoch, wall, cpu,
+                                   pid=pid, filepath=filepath)
+
+            if cache is not None:
+                cache.store(filepath, defs)
 
     return definitions
 
+def module_definitions(module, cache=None):
+    return file_definitions(module_filepath(module), cache=cache)
+
+# the definitions of the syntax trees given to the list functions
+# below, so that listing every kind of definition of a module or class
+# only goes through it once
+_NODE_DEFINITIONS = weakref.WeakKeyDictionary()
+
+def _node_definitions(st):
+
+    defs = _NODE_DEFINITIONS.get(st)
+    if defs is None:
+
+        if type(st) == AST_CLASS_CLASS:
+            defs = class_definitions(st)
+        else:
+            defs = extract_definitions(st)
+
+        _NODE_DEFINITIONS[st] = defs
+
+    return defs
+
+def list_functions(st):
+    return list(_node_definitions(st)['functions'])
+
+def list_classes(st):
+    return list(_node_definitions(st)['classes'])
+
+def list_variables(st):
+
+    if type(st) == AST_CLASS_CLASS:
+        return list(_node_definitions(st)['attributes'])
+    else:
+        return list(_node_definitions(st)['variables'])
 
 def list_classdefs(st):
 
@@ -237,236 +996,415 @@ def list_classdefs(st):
 
     return class_defs
 
+def class_definitions(classdef):
+    """Given an ast.ClassDef object return a dictionary of the functions
+    (methods, classmethods, and staticmethods), properties (functions
+    with the `@property` decorator that are accessed like variables)
+    and variables (attributes).
+
+    """
+
+    visitor = DefinitionVisitor()
+    visitor.visit(classdef)
+
+    return visitor.definitions['class_definitions'][0][1]
 
 def list_methods(classdef):
+    return list(_node_definitions(classdef)['methods'])
 
-    function_names = []
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+def list_classmethods(classdef):
+    return list(_node_definitions(classdef)['classmethods'])
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.id for dec in thing.decorator_list if hasattr(dec, 'id')]
+def list_staticmethods(classdef):
+    return list(_node_definitions(classdef)['staticmethods'])
 
-            # then check that none of the decorators are one of them
-            if not any([True if dec in SPECIAL_METHODS else False for dec in decorator_names]):
-                function_names.append(thing.name)
+def list_properties(classdef):
+    return list(_node_definitions(classdef)['properties'])
 
-    return function_names
+def list_getters(classdef):
+    return list(_node_definitions(classdef)['getters'])
 
+def list_setters(classdef):
+    return list(_node_definitions(classdef)['setters'])
+
+def list_module_definitions(module, cache=None):
+    defs = module_definitions(module, cache=cache)
+    return it.chain(*[defs[t] for t in MODULE_DEFINITION_KINDS])
+
+# the kind codes of the nodes for each kind of definition
+DEFINITION_KIND_CODES = {
+    'functions' : FUNCTION,
+    'classes' : CLASS,
+    'variables' : VARIABLE,
+    'attributes' : ATTRIBUTE,
+    'methods' : METHOD,
+    'classmethods' : CLASSMETHOD,
+    'staticmethods' : STATICMETHOD,
+    'properties' : PROPERTY,
+    'setters' : SETTER,
+    'getters' : GETTER,
+}
+
+def _merge_kind(members, name, kind):
+    # a name defined more than once is one node with the larger kind
+    # code, at the place it was first defined
+    if kind > members.get(name, -1):
+        members[name] = kind
+
+def add_module_definitions(i_tree, module_node, defs, tree_filter=None, depth=0):
+    """Add the nodes for the definitions of a module, as returned by
+    `module_definitions`, to an InterfaceTree.
+
+    If a `pymatuning.filters.TreeFilter` is given the definitions it
+    leaves out are not added, `depth` is the depth of the module node
+    for it.
+
+    The module node gets the info of the module, and the nodes of the
+    definitions theirs, see `pymatuning.tree.InterfaceTree.info`.
 
-def list_classmethods(classdef):
+    """
 
-    function_names = []
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+    # the kind of every name in the module and in each of its
+    # classes, a class defined twice is only one node
+    members = {}
+    class_members = {}
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.id for dec in thing.decorator_list if hasattr(dec, 'id')]
+    # the info of the members of each class
+    class_infos = {}
 
+    for function_name in defs['functions']:
+        _merge_kind(members, function_name, FUNCTION)
 
-            # then check that none of the decorators are one of them
-            if any([True if dec == 'classmethod' else False for dec in decorator_names]):
-                function_names.append(thing.name)
+    for variable_name in defs['variables']:
+        _merge_kind(members, variable_name, VARIABLE)
 
-    return function_names
+    for classname, class_defs in defs['class_definitions']:
 
-def list_staticmethods(classdef):
+        _merge_kind(members, classname, CLASS)
+        attributes = class_members.setdefault(classname, {})
 
-    function_names = []
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+        for kind in CLASS_DEFINITION_KINDS:
+            for member in class_defs[kind]:
+                _merge_kind(attributes, member, DEFINITION_KIND_CODES[kind])
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.id for dec in thing.decorator_list if hasattr(dec, 'id')]
+        infos = class_infos.setdefault(classname, {})
+        for member, info in class_defs['info'].items():
+            infos.setdefault(member, info)
 
-            # then check that none of the decorators are one of them
-            if any([True if dec == 'staticmethod' else False for dec in decorator_names]):
-                function_names.append(thing.name)
+    i_tree.set_info(module_node, (1, HAS_DOCSTRING if defs['docstring'] else 0, -1, -1))
 
-    return function_names
+    mod_fqname = i_tree.name(module_node)
+    infos = defs['info']
 
-def list_properties(classdef):
+    for name, kind in members.items():
 
-    function_names = []
+        fqname = mod_fqname + MODULE_SEPARATOR + name
+        info = infos.get(name, NO_INFO)
 
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+        if name in class_members:
+            member_infos = class_infos[name]
+            kept_members = [(member, member_kind, member_infos.get(member, NO_INFO))
+                            for member, member_kind in class_members[name].items()]
+        else:
+            kept_members = ()
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.id for dec in thing.decorator_list if hasattr(dec, 'id')]
+        if tree_filter is not None:
 
-            # then check that none of the decorators are one of them
-            if any([True if dec == 'property' else False for dec in decorator_names]):
-                function_names.append(thing.name)
+            kept_members = [
+                (member, member_kind, member_info)
+                for member, member_kind, member_info in kept_members
+                if tree_filter.keep_definition(fqname + CLASS_METHOD_SEPARATOR + member,
+                                               member, member_kind, depth + 2,
+                                               info=member_info)]
 
-    return function_names
+            if not tree_filter.keep_definition(fqname, name, kind, depth + 1,
+                                               all_names=defs['all'], info=info,
+                                               n_members=len(kept_members)):
+                continue
 
-def list_getters(classdef):
+        node = i_tree.add_node(name, kind, module_node, info=info)
 
-    function_names = []
+        for member, member_kind, member_info in kept_members:
+            i_tree.add_node(member, member_kind, node, info=member_info)
 
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+def build_interface_tree(mod_records, mod_defs, tree_filter=None):
+    """Build an InterfaceTree from the (fqname, filepath, ispkg) module
+    records of `discover_modules` and the definitions of each module.
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.attr for dec in thing.decorator_list
-                               if type(dec) == AST_ATTRIBUTE_CLASS]
+    The definitions of a module may be None to only have the module
+    node, see `interface_tree` for the filter.
 
-            # then check that none of the decorators are one of them
-            if any([True if dec == 'getter' else False for dec in decorator_names]):
-                function_names.append(thing.name)
+    """
 
-    return function_names
+    with profiling.phase('build'):
+        return _build_interface_tree(mod_records, mod_defs, tree_filter)
 
-def list_setters(classdef):
+def _build_interface_tree(mod_records, mod_defs, tree_filter):
 
-    function_names = []
+    i_tree = InterfaceTree()
 
-    for thing in classdef.body:
-        # first check if the thing is a function
-        if type(thing) == AST_FUNCTION_CLASS:
+    # first all of the modules so the submodules come before the
+    # definitions of their supermodule
+    module_nodes = {}
+    for mod_fqname, _, _ in mod_records:
+        parent = module_nodes.get(mod_rootname(mod_fqname), NO_NODE)
+        module_nodes[mod_fqname] = i_tree.add_node(mod_fqname, MODULE, parent)
 
-            # if it is then we want to make sure it is not one of the
-            # special methods (property, classmethod, staticmethod),
-            # so get the names of the decorators
-            decorator_names = [dec.attr for dec in thing.decorator_list
-                               if type(dec) == AST_ATTRIBUTE_CLASS]
+    root_depth = mod_records[0][0].count(MODULE_SEPARATOR)
 
-            # then check that none of the decorators are one of them
-            if any([True if dec == 'setter' else False for dec in decorator_names]):
-                function_names.append(thing.name)
+    for (mod_fqname, _, _), defs in zip(mod_records, mod_defs):
 
-    return function_names
+        if defs is None:
+            continue
 
+        add_module_definitions(i_tree, module_nodes[mod_fqname], defs,
+                               tree_filter=tree_filter,
+                               depth=mod_fqname.count(MODULE_SEPARATOR) - root_depth)
 
+    return i_tree
 
-def class_definitions(classdef):
-    """Given an ast.ClassDef object return a dictionary of the functions
-    (methods, classmethods, and staticmethods), properties (functions
-    with the `@property` decorator that are accessed like variables)
-    and variables (attributes).
+def parsed_modules(mod_records, tree_filter=None, shard=None):
+    """Whether each of the module records gets its definitions in the
+    interface tree, see `interface_tree` for the filter and shard."""
+
+    # supermodules of the included modules are only in the tree for
+    # its structure so they are not parsed, and neither are extension
+    # modules
+    if tree_filter is None:
+        parsed = [is_source_file(mod_filepath) for _, mod_filepath, _ in mod_records]
+    else:
+        selected = tree_filter.selected_modules([mod_fqname for mod_fqname, _, _ in mod_records])
+        parsed = [mod_fqname in selected and is_source_file(mod_filepath)
+                  for mod_fqname, mod_filepath, _ in mod_records]
+
+    if shard is not None:
+        shard_idx, n_shards = shard
+        parsed = [parse and shard_of(mod_fqname, n_shards) == shard_idx
+                  for (mod_fqname, _, _), parse in zip(mod_records, parsed)]
+
+    return parsed
+
+def package_definitions(package, cache=None, jobs=1, executor=None, tree_filter=None,
+                        engine='ast', io_threads=1, shard=None, mod_records=None):
+    """Discover the modules of a package and parse the ones that get
+    their definitions in the interface tree, with the arguments of
+    `interface_tree`.
+
+    Returns the module records, whether each was parsed, and the
+    definitions of each module, which are None for the ones that were
+    not. Module records that were already discovered can be given
+    instead of looking for them again.
 
     """
 
-    definitions = {}
-    definitions['attributes'] = list_variables(classdef)
-    definitions['methods'] = list_methods(classdef)
-    definitions['classmethods'] = list_classmethods(classdef)
-    definitions['staticmethods'] = list_staticmethods(classdef)
-    definitions['properties'] = list_properties(classdef)
-    definitions['setters'] = list_setters(classdef)
-    definitions['getters'] = list_getters(classdef)
+    if mod_records is None:
+        mod_records = discover_modules(package, tree_filter=tree_filter, io_threads=io_threads)
 
-    return definitions
+    parsed = parsed_modules(mod_records, tree_filter=tree_filter, shard=shard)
 
+    parsed_defs = iter(files_definitions([mod_filepath for (_, mod_filepath, _), parse
+                                          in zip(mod_records, parsed) if parse],
+                                         cache=cache, jobs=jobs, executor=executor,
+                                         engine=engine, io_threads=io_threads))
 
+    mod_defs = [next(parsed_defs) if parse else None for parse in parsed]
 
-def list_module_definitions(module):
-    defs = module_definitions(module)
-    return it.chain(*[defs[t] for t in ('functions', 'classes', 'variables')])
+    # keep the cache within its size bounds
+    if cache is not None:
+        cache.evict()
 
-def interface_tree(package):
+    return mod_records, parsed, mod_defs
+
+def interface_tree(package, cache=None, jobs=1, executor=None, tree_filter=None,
+                   engine='ast', compact=False, io_threads=1, shard=None, lazy=False,
+                   imports=False):
     """Generate the entire Interface Tree (it) for this package.
 
     This includes all submodules in the package as well as all
     function and class definitions and constant assignment.
 
-    This tree can then be further filtered so as to get a particular
-    view of the interface tree (e.g. only public definitions)
+    The package may be a module object or a module name, see
+    `discover_modules`. When given a name nothing from the package
+    is imported. A `pymatuning.cache.DefinitionCache` can be given to
+    reuse the definitions of unchanged modules and the modules are
+    parsed in `jobs` processes, or in the workers of an existing
+    executor, with the given engine, see `files_definitions`. With
+    more than one I/O thread the directories and files are listed and
+    read ahead in that many threads, which helps most on network
+    filesystems.
+
+    By default this is a NetworkX DiGraph, if `compact` is True the
+    `pymatuning.tree.InterfaceTree` it is built as is returned
+    instead.
+
+    This tree can be filtered so as to get a particular view of the
+    interface tree (e.g. only public definitions) by giving a
+    `pymatuning.filters.TreeFilter`. It is applied while building the
+    tree, so the modules it leaves out are never discovered or parsed
+    and only the definitions it keeps become nodes.
+
+    With a shard (i, N) all of the modules are in the tree but only the
+    ones of the i-th of N shards are parsed, see
+    `pymatuning.shards.shard_of`. The partial trees of all the shards
+    can then be merged with `pymatuning.shards.merge_partials`.
+
+    If `lazy` is True the package, given by name or path, is only
+    discovered and parsed as far as the compact tree is looked at, see
+    `pymatuning.lazy.LazyInterfaceTree`, and the jobs, I/O threads,
+    and shard are not used.
+
+    If `imports` is True the `pymatuning.imports.ImportGraph` of the
+    imports between the parsed modules is built from the same
+    definitions and an (interface tree, import graph) pair is
+    returned.
 
     """
 
-    # first generate the package tree. This is just the modules.
-    pt = package_tree(package)
-
-    # initialize the interface tree with the nodes (without
-    # attributes) and edges from the package tree
-    i_tree = pt.copy()
-    # delete all the attributes
-    for node_id in i_tree.nodes:
-        i_tree.node[node_id].clear()
-
-    # then we traverse this and generate make nodes for all the
-    # variables, functions, and classes as well as expanding out the
-    # definitions within classes to their own nodes as well.
-    for mod_fqname in nx.bfs_tree(pt, package.__name__):
-
-        module_node = pt.node[mod_fqname]
-
-        # make nodes for all the functions, variables, and classes
-        # with an edge to them
-        for function_name in module_node['functions']:
-            function_node_id = (mod_fqname, function_name)
-            edge = (mod_fqname, function_node_id)
-            i_tree.add_edge(*edge)
-
-        for variable_name in module_node['variables']:
-            variable_node_id = (mod_fqname, variable_name)
-            edge = (mod_fqname, variable_node_id)
-            i_tree.add_edge(*edge)
-
-        # for the class we need to get the syntax tree for the module
-        # to get the classdefs
-        mod_st = load_module_ast(import_module(mod_fqname))
-        classdefs = list_classdefs(mod_st)
-
-        for classdef in classdefs:
-
-            # add a node and edge for the class
-            classname = classdef.name
-            class_node_id = (mod_fqname, classname)
-            edge = (mod_fqname, class_node_id)
-            i_tree.add_edge(*edge)
-
-            # then get its definitions and add them as well
-            class_defs = class_definitions(classdef)
-
-            # attribute
-            for attribute in class_defs['attributes']:
-                attribute_node_id = (mod_fqname, classname, attribute)
-                edge = (class_node_id, attribute_node_id)
-                i_tree.add_edge(*edge)
-
-            # methods
-            for method in class_defs['methods']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
-            for method in class_defs['classmethods']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
-            for method in class_defs['staticmethods']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
-            for method in class_defs['properties']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
-            for method in class_defs['setters']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
-            for method in class_defs['getters']:
-                method_node_id = (mod_fqname, classname, method)
-                edge = (class_node_id, method_node_id)
-                i_tree.add_edge(*edge)
+    if lazy:
+
+        if imports:
+            raise ValueError("The imports of a lazy tree are only known as it is expanded")
+
+        # the lazy tree is made of the functions here
+        from pymatuning.lazy import lazy_interface_tree
+
+        i_tree = lazy_interface_tree(package, cache=cache, tree_filter=tree_filter,
+                                     engine=engine)
+        if compact:
+            return i_tree
+
+        with profiling.phase('networkx'):
+            return i_tree.to_networkx()
+
+    mod_records, _, mod_defs = package_definitions(
+        package, cache=cache, jobs=jobs, executor=executor, tree_filter=tree_filter,
+        engine=engine, io_threads=io_threads, shard=shard)
+
+    i_tree = build_interface_tree(mod_records, mod_defs, tree_filter=tree_filter)
+
+    if not compact:
+        with profiling.phase('networkx'):
+            i_tree = i_tree.to_networkx()
+
+    if imports:
 
+        # it uses the functions here
+        from pymatuning.imports import import_graph
+
+        return i_tree, import_graph(mod_records, mod_defs)
 
     return i_tree
+
+def subtree_hashes(i_tree):
+    """Compute a hash of the subtree of every node of an InterfaceTree
+    from the kind and short name (see `InterfaceTree.label`) of the
+    node and the hashes of its children, regardless of their order.
+
+    Returns a list of the digests indexed by node id.
+
+    """
+
+    # a lazy tree would grow while its children are looked at
+    i_tree.expand_all()
+
+    hashes = [None for _ in range(len(i_tree))]
+
+    # children are always added after their parents so going through
+    # the ids backwards visits every node after all of its children
+    for node in reversed(range(len(i_tree))):
+
+        h = hashlib.blake2b(digest_size=16)
+        h.update(bytes((i_tree.kind(node),)))
+        h.update(i_tree.label(node).encode('utf-8'))
+
+        for child_hash in sorted(hashes[child] for child in i_tree.children(node)):
+            h.update(child_hash)
+
+        hashes[node] = h.digest()
+
+    return hashes
+
+def diff_interface_trees(old, new):
+    """Compare two interface trees, e.g. of two releases of a package.
+
+    Returns a dictionary with the 'added', 'removed', and 'moved'
+    definitions and modules. Added and removed are lists of (fqname,
+    kind name) pairs for the top node of each added or removed
+    subtree, moved is a list of (old fqname, new fqname, kind name)
+    for subtrees that were removed in one place and added unchanged
+    in another.
+
+    Nodes are matched by their short name, and whether they are
+    modules, under their matched parents, starting from the roots.
+    Subtrees with equal hashes (see `subtree_hashes`) are skipped
+    without looking into them, so the comparison only goes down the
+    branches that changed.
+
+    """
+
+    old = as_interface_tree(old)
+    new = as_interface_tree(new)
+
+    old_hashes = subtree_hashes(old)
+    new_hashes = subtree_hashes(new)
+
+    added = []
+    removed = []
+
+    # the roots are compared even if their names differ
+    stack = [(old.root, new.root)]
+    while stack:
+
+        old_node, new_node = stack.pop()
+
+        if old_hashes[old_node] == new_hashes[new_node]:
+            continue
+
+        # a submodule and a definition in the __init__ of a package can
+        # have the same name
+        old_children = {(old.is_module(child), old.label(child)) : child
+                        for child in old.children(old_node)}
+
+        for new_child in new.children(new_node):
+
+            old_child = old_children.pop((new.is_module(new_child), new.label(new_child)),
+                                         None)
+
+            if old_child is None:
+                added.append(new_child)
+
+            # a changed kind is a different definition
+            elif old.kind(old_child) != new.kind(new_child):
+                removed.append(old_child)
+                added.append(new_child)
+
+            else:
+                stack.append((old_child, new_child))
+
+        removed.extend(old_children.values())
+
+    # subtrees that were added exactly as one that was removed were
+    # moved
+    removed_by_hash = {}
+    for old_node in removed:
+        removed_by_hash.setdefault(old_hashes[old_node], []).append(old_node)
+
+    moved = []
+    moved_old_nodes = set()
+    still_added = []
+    for new_node in added:
+
+        candidates = removed_by_hash.get(new_hashes[new_node])
+
+        if candidates:
+            old_node = candidates.pop()
+            moved_old_nodes.add(old_node)
+            moved.append((old.fqname(old_node), new.fqname(new_node), new.kind_name(new_node)))
+        else:
+            still_added.append(new_node)
+
+    return {'added' : sorted((new.fqname(node), new.kind_name(node))
+                             for node in still_added),
+            'removed' : sorted((old.fqname(node), old.kind_name(node))
+                               for node in removed if node not in moved_old_nodes),
+            'moved' : sorted(moved)}
@@ -1,5 +1,20 @@
 import re
 
+from pymatuning.tree import (
+    as_interface_tree,
+    MODULE,
+    VARIABLE,
+    FUNCTION,
+    CLASS,
+    ATTRIBUTE,
+    METHOD,
+    CLASSMETHOD,
+    STATICMETHOD,
+    GETTER,
+    SETTER,
+    PROPERTY,
+)
+
 
 class NamingStyle:
     # It may seem counterintuitive that single naming style
@@ -15,6 +30,10 @@ class NamingStyle:
 
     @classmethod
     def get_regex(cls, name_type):
+        return cls.regex_table()[name_type]
+
+    @classmethod
+    def regex_table(cls):
         return {
             "module": cls.MOD_NAME_RGX,
             "const": cls.CONST_NAME_RGX,
@@ -26,7 +45,7 @@ class NamingStyle:
             "variable": cls.DEFAULT_NAME_RGX,
             "class_attribute": cls.CLASS_ATTRIBUTE_RGX,
             "inlinevar": cls.COMP_VAR_RGX,
-        }[name_type]
+        }
 
 
 class SnakeCaseStyle(NamingStyle):
@@ -75,10 +94,16 @@ class UpperCaseStyle(NamingStyle):
     CLASS_ATTRIBUTE_RGX = re.compile("[A-Z_][A-Z0-9_]{2,}$")
 
 
+ANY_NAME_RGX = re.compile(".*")
+
 class AnyStyle(NamingStyle):
     @classmethod
     def get_regex(cls, name_type):
-        return re.compile(".*")
+        return ANY_NAME_RGX
+
+    @classmethod
+    def regex_table(cls):
+        return {name_type : ANY_NAME_RGX for name_type in NamingStyle.regex_table()}
 
 
 NAMING_STYLES = {
@@ -88,3 +113,57 @@ NAMING_STYLES = {
     "UPPER_CASE": UpperCaseStyle,
     "any": AnyStyle,
 }
+
+# the name type checked for each kind of node in an interface tree
+KIND_NAME_TYPES = {
+    MODULE : "module",
+    VARIABLE : "variable",
+    FUNCTION : "function",
+    CLASS : "class",
+    ATTRIBUTE : "class_attribute",
+    METHOD : "method",
+    CLASSMETHOD : "method",
+    STATICMETHOD : "method",
+    GETTER : "attr",
+    SETTER : "attr",
+    PROPERTY : "attr",
+}
+
+def check_names(tree, style):
+    """Check the names of all the nodes of an interface tree against a
+    naming style, which is either a NamingStyle class or a key of
+    NAMING_STYLES.
+
+    Generates (node, name_type) for each node of the
+    `pymatuning.tree.InterfaceTree` whose name does not match.
+
+    """
+
+    tree = as_interface_tree(tree)
+
+    if isinstance(style, str):
+        style = NAMING_STYLES[style]
+
+    # look up the regex for every kind once
+    regex_table = style.regex_table()
+    kind_regexes = {kind : regex_table[name_type]
+                    for kind, name_type in KIND_NAME_TYPES.items()}
+
+    # the same names show up over and over again (e.g. __init__) so
+    # we remember the verdicts
+    verdicts = {}
+
+    for node, _ in tree.walk():
+
+        kind = tree.kind(node)
+        name = tree.label(node)
+
+        key = (KIND_NAME_TYPES[kind], name)
+        try:
+            ok = verdicts[key]
+        except KeyError:
+            ok = kind_regexes[kind].match(name) is not None
+            verdicts[key] = ok
+
+        if not ok:
+            yield node, KIND_NAME_TYPES[kind]
@@ -0,0 +1,212 @@
+import os
+import sys
+import time
+import json
+from contextlib import contextmanager, nullcontext
+
+# the profiler that the hooks record to, if any
+_active_profiler = None
+
+class Profiler:
+    """Records the wall time, CPU time, and allocated memory of the
+    phases of a run and of the work done for each module.
+
+    Activate it with `activate` and the hooks in `pymatuning.listings`
+    and the renderers record to it. Allocations are only measured if
+    `trace_memory` is True, which starts tracemalloc and slows
+    everything down somewhat.
+
+    """
+
+    def __init__(self, trace_memory=True):
+
+        self.trace_memory = trace_memory
+
+        # to convert between the clocks of this process and of worker
+        # processes
+        self._start_perf = time.perf_counter()
+        self._start_epoch = time.time()
+
+        # (name, category, start, wall, cpu, alloc, pid, args) for
+        # every recorded event, start is in seconds since the
+        # profiler was made
+        self.events = []
+
+        # the fully qualified module name for source files
+        self._module_names = {}
+
+    def _alloc(self):
+
+        if not self.trace_memory:
+            return 0
+
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            return tracemalloc.get_traced_memory()[0]
+        else:
+            return 0
+
+    @contextmanager
+    def record(self, name, category='phase', **args):
+        """Context manager recording the block as an event."""
+
+        start = time.perf_counter()
+        start_cpu = time.process_time()
+        start_alloc = self._alloc()
+        try:
+            yield
+        finally:
+            self.events.append((name, category, start - self._start_perf,
+                                time.perf_counter() - start,
+                                time.process_time() - start_cpu,
+                                self._alloc() - start_alloc,
+                                os.getpid(), args))
+
+    def add_event(self, name, category, start_epoch, wall, cpu, alloc=0, pid=None, **args):
+        """Add an event measured elsewhere, e.g. in a worker process,
+        with its start time since the epoch."""
+
+        self.events.append((name, category, start_epoch - self._start_epoch,
+                            wall, cpu, alloc, pid or os.getpid(), args))
+
+    def label_modules(self, mod_records):
+        """Name the source files of the (fqname, filepath, ispkg) module
+        records in the reports."""
+
+        for mod_fqname, mod_filepath, _ in mod_records:
+            self._module_names[mod_filepath] = mod_fqname
+
+    def module_name(self, filepath):
+        return self._module_names.get(filepath, filepath)
+
+    def phase_totals(self):
+        """Dictionary of the summed (wall, cpu, alloc) of each phase."""
+
+        totals = {}
+        for name, category, _, wall, cpu, alloc, _, _ in self.events:
+
+            if category != 'phase':
+                continue
+
+            total = totals.get(name, (0., 0., 0))
+            totals[name] = (total[0] + wall, total[1] + cpu, total[2] + alloc)
+
+        return totals
+
+    def module_totals(self):
+        """Dictionary of the summed (wall, cpu, alloc) of the events for
+        each module."""
+
+        totals = {}
+        for _, category, _, wall, cpu, alloc, _, args in self.events:
+
+            if category != 'module':
+                continue
+
+            mod_name = self.module_name(args['filepath'])
+            total = totals.get(mod_name, (0., 0., 0))
+            totals[mod_name] = (total[0] + wall, total[1] + cpu, total[2] + alloc)
+
+        return totals
+
+    def report(self, stream, top=20):
+        """Write the time spent in each phase and the `top` slowest
+        modules."""
+
+        stream.write("{:<40} {:>10} {:>10} {:>12}\n".format(
+            "phase", "wall (s)", "cpu (s)", "alloc (KiB)"))
+        for name, (wall, cpu, alloc) in self.phase_totals().items():
+            stream.write("{:<40} {:>10.4f} {:>10.4f} {:>12.1f}\n".format(
+                name, wall, cpu, alloc / 1024))
+
+        stream.write("\n{:<40} {:>10} {:>10} {:>12}\n".format(
+            "module", "wall (s)", "cpu (s)", "alloc (KiB)"))
+        module_totals = sorted(self.module_totals().items(),
+                               key=lambda item: item[1][0], reverse=True)
+        for mod_name, (wall, cpu, alloc) in module_totals[:top]:
+            stream.write("{:<40} {:>10.4f} {:>10.4f} {:>12.1f}\n".format(
+                mod_name, wall, cpu, alloc / 1024))
+
+    def write_chrome_trace(self, stream):
+        """Write the events in the Chrome trace event format, which can
+        be opened in chrome://tracing or Perfetto."""
+
+        trace_events = []
+        for name, category, start, wall, cpu, alloc, pid, args in self.events:
+
+            event_args = dict(args)
+            event_args['cpu_s'] = cpu
+            event_args['alloc_bytes'] = alloc
+
+            if category == 'module':
+                name = "{} {}".format(name, self.module_name(args['filepath']))
+
+            trace_events.append({'name' : name,
+                                 'cat' : category,
+                                 'ph' : 'X',
+                                 'ts' : start * 1e6,
+                                 'dur' : wall * 1e6,
+                                 'pid' : pid,
+                                 'tid' : pid,
+                                 'args' : event_args})
+
+        json.dump({'traceEvents' : trace_events, 'displayTimeUnit' : 'ms'}, stream)
+
+def activate(profiler):
+    """Make the hooks record to this profiler."""
+
+    global _active_profiler
+
+    # tracemalloc is only imported for profiling
+    import tracemalloc
+
+    if profiler.trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+    _active_profiler = profiler
+
+def deactivate():
+
+    global _active_profiler
+
+    if _active_profiler is not None and _active_profiler.trace_memory:
+        import tracemalloc
+        tracemalloc.stop()
+
+    _active_profiler = None
+
+def init_worker():
+    """Initializer of worker processes. Forked workers inherit the
+    active profiler and tracemalloc, but would only record into a copy
+    that is thrown away and run slower for it. Their work is timed by
+    the parent instead."""
+
+    global _active_profiler
+
+    _active_profiler = None
+
+    tracemalloc = sys.modules.get('tracemalloc')
+    if tracemalloc is not None and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+def active_profiler():
+    return _active_profiler
+
+def phase(name, **args):
+    """Hook recording a phase of the run to the active profiler, does
+    nothing if there is none."""
+
+    if _active_profiler is None:
+        return nullcontext()
+    else:
+        return _active_profiler.record(name, category='phase', **args)
+
+def module_phase(name, filepath):
+    """Hook recording a step of the work for the module with this
+    source file to the active profiler, does nothing if there is
+    none."""
+
+    if _active_profiler is None:
+        return nullcontext()
+    else:
+        return _active_profiler.record(name, category='module', filepath=filepath)
@@ -0,0 +1,175 @@
+# each format is a sink that the nodes of a tree are pushed to as it is
+# walked, so any number of formats are written from a single walk of
+# the tree with `render`
+
+import abc
+
+from pymatuning.tree import (
+    as_interface_tree,
+    MODULE,
+    MODULE_SEPARATOR,
+    CLASS_METHOD_SEPARATOR,
+)
+from pymatuning import profiling
+
+class RendererSink(abc.ABC):
+    """A format that the nodes of an interface tree are pushed to in
+    depth first order by `render`.
+
+    `start` is called with the tree before the first node, `nodes` for
+    each batch of the nodes, and `finish` after the last one. A batch
+    is a list of (node, depth, label, fqname, parent_fqname) records.
+
+    """
+
+    # the name of the format in the profile
+    format_name = None
+
+    # whether `nodes` needs the fully qualified names, which take some
+    # work to build, otherwise they are None
+    needs_fqnames = False
+
+    def start(self, tree):
+        self.tree = tree
+
+    @abc.abstractmethod
+    def nodes(self, records):
+        """Write a batch of node records."""
+
+    def finish(self):
+        pass
+
+def iter_nodes(tree):
+    """Generate (node, depth, fqname, parent_fqname) for every node of an
+    InterfaceTree in depth first order.
+
+    The fully qualified names are built from the ones of the ancestors
+    we keep for each depth instead of walking up the tree every time.
+
+    """
+
+    kind = tree.kind
+    name = tree.name
+
+    # the fqnames of the ancestors of the current node at each depth,
+    # and the same with the separator for their children
+    fqnames = []
+    prefixes = []
+
+    for node, depth in tree.walk():
+
+        del fqnames[depth:]
+        del prefixes[depth:]
+
+        if kind(node) == MODULE:
+            fqname = name(node)
+            prefixes.append(fqname + MODULE_SEPARATOR)
+        else:
+            fqname = prefixes[depth - 1] + name(node)
+            prefixes.append(fqname + CLASS_METHOD_SEPARATOR)
+
+        if depth == 0:
+            parent_fqname = None
+        else:
+            parent_fqname = fqnames[depth - 1]
+
+        fqnames.append(fqname)
+
+        yield node, depth, fqname, parent_fqname
+
+# the number of nodes pushed to the sinks at a time
+RENDER_BATCH_SIZE = 1024
+
+def render(tree, sinks):
+    """Walk an interface tree once and push every node to each of the
+    sinks, see `RendererSink`.
+
+    The nodes are pushed in batches so the sinks can write them with
+    few calls.
+
+    """
+
+    tree = as_interface_tree(tree)
+    sinks = list(sinks)
+
+    format_names = '+'.join(sink.format_name or type(sink).__name__ for sink in sinks)
+
+    with profiling.phase('render', format=format_names):
+
+        for sink in sinks:
+            sink.start(tree)
+
+        if any(sink.needs_fqnames for sink in sinks):
+            nodes = iter_nodes(tree)
+        else:
+            nodes = ((node, depth, None, None) for node, depth in tree.walk())
+
+        pushes = [sink.nodes for sink in sinks]
+        label = tree.label
+
+        batch = []
+        for node, depth, fqname, parent_fqname in nodes:
+
+            batch.append((node, depth, label(node), fqname, parent_fqname))
+
+            if len(batch) == RENDER_BATCH_SIZE:
+                for push in pushes:
+                    push(batch)
+                batch = []
+
+        if len(batch) > 0:
+            for push in pushes:
+                push(batch)
+
+        for sink in sinks:
+            sink.finish()
+
+def _listing_sink(marker):
+
+    def make(stream):
+        from pymatuning.renderers.orgmode import ListingSink
+        return ListingSink(stream, marker=marker)
+
+    return make
+
+def _json_sink(stream):
+    from pymatuning.renderers.json import JsonSink
+    return JsonSink(stream)
+
+def _ndjson_sink(stream):
+    from pymatuning.renderers.json import NDJSONSink
+    return NDJSONSink(stream)
+
+# the formats by name, each a function making the sink for a stream
+SINK_FORMATS = {
+    'orgmode' : _listing_sink("-"),
+    'orgmode:outline' : _listing_sink("-"),
+    'orgmode:checklist' : _listing_sink("- [ ]"),
+    'json' : _json_sink,
+    'ndjson' : _ndjson_sink,
+}
+
+def parse_output_spec(spec):
+    """Parse an output given as 'FORMAT=PATH', e.g.
+    'orgmode:checklist=tree.org', into (format, path).
+
+    Raises ValueError if it is not given like that or the format is not
+    one of `SINK_FORMATS`.
+
+    """
+
+    format_name, sep, path = spec.partition('=')
+
+    if not sep or not path:
+        raise ValueError("Output must be given as FORMAT=PATH, not {}".format(spec))
+
+    if format_name not in SINK_FORMATS:
+        raise ValueError("Unknown format {}, must be one of {}".format(
+            format_name, ", ".join(SINK_FORMATS)))
+
+    return format_name, path
+
+def make_sink(format_name, stream):
+    """Make the sink of a format in `SINK_FORMATS` writing to a
+    stream."""
+    return SINK_FORMATS[format_name](stream)
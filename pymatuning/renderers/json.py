@@ -0,0 +1,177 @@
+from json.encoder import encode_basestring_ascii as _encode
+
+from pymatuning.tree import (
+    as_interface_tree,
+    MODULE,
+    KIND_NAMES,
+    HAS_DOCSTRING,
+    IS_ASYNC,
+    RETURNS_ANNOTATED,
+)
+from pymatuning.renderers import RendererSink, render, iter_nodes
+
+# the kind names as JSON strings
+_KIND_STRINGS = tuple(_encode(kind_name) for kind_name in KIND_NAMES)
+
+_BOOLS = ('false', 'true')
+
+def _info_fields(tree, node):
+    # the fields of `InterfaceTree.info_attributes`, if there are any,
+    # to go at the end of an object
+
+    lineno, flags, nargs, n_annotated = tree.info(node)
+    if lineno == 0:
+        return ''
+
+    fields = ', "lineno": {}, "docstring": {}'.format(lineno,
+                                                    _BOOLS[bool(flags & HAS_DOCSTRING)])
+
+    if nargs >= 0:
+        fields += ', "nargs": {}, "n_annotated": {}, "returns_annotated": {}, "async": {}'.format(
+            nargs, n_annotated,
+            _BOOLS[bool(flags & RETURNS_ANNOTATED)],
+            _BOOLS[bool(flags & IS_ASYNC)])
+
+    return fields
+
+def _ndjson_line(tree, node, depth, label, fqname, parent_fqname):
+
+    # the same as json.dumps of the record, without building the dict
+    return '{{"fqname": {}, "name": {}, "kind": {}, "parent": {}, "depth": {}{}}}'.format(
+        _encode(fqname),
+        _encode(label),
+        _KIND_STRINGS[tree.kind(node)],
+        'null' if parent_fqname is None else _encode(parent_fqname),
+        depth,
+        _info_fields(tree, node))
+
+def iter_ndjson(tree):
+    """Generate the lines of the NDJSON listing of an interface tree,
+    one record per node with its 'fqname', 'name', 'kind', 'parent'
+    fqname, and 'depth', and the fields of
+    `pymatuning.tree.InterfaceTree.info_attributes` where they are
+    known."""
+
+    tree = as_interface_tree(tree)
+
+    for node, depth, fqname, parent_fqname in iter_nodes(tree):
+        yield _ndjson_line(tree, node, depth, tree.label(node), fqname, parent_fqname)
+
+class NDJSONSink(RendererSink):
+    """Writes the NDJSON listing of an interface tree to a file-like
+    object as the nodes are pushed to it, see `iter_ndjson`.
+
+    The stream is flushed at each module so consumers can read the
+    records while the rest of the tree is still being written.
+
+    """
+
+    format_name = 'ndjson'
+    needs_fqnames = True
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def nodes(self, records):
+
+        tree = self.tree
+        stream = self.stream
+
+        lines = []
+        for node, depth, label, fqname, parent_fqname in records:
+
+            if tree.kind(node) == MODULE:
+                stream.write(''.join(lines))
+                stream.flush()
+                lines = []
+
+            lines.append(_ndjson_line(tree, node, depth, label, fqname, parent_fqname) + '\n')
+
+        stream.write(''.join(lines))
+
+    def finish(self):
+        self.stream.flush()
+
+def write_ndjson(tree, stream):
+    """Write the NDJSON listing of an interface tree to a file-like
+    object as the tree is walked, see `NDJSONSink`."""
+
+    render(tree, [NDJSONSink(stream)])
+
+def _json_object_start(tree, node, label, fqname):
+    return '{{"fqname": {}, "name": {}, "kind": {}{}, "children": ['.format(
+        _encode(fqname),
+        _encode(label),
+        _KIND_STRINGS[tree.kind(node)],
+        _info_fields(tree, node))
+
+def _json_close(prev_depth, depth):
+    # close the nodes of the previous branch, if this is not a child of
+    # the previous node it is a sibling of it or of one of its
+    # ancestors
+    return ']}' * (prev_depth - depth + 1) + ',\n'
+
+def iter_json(tree):
+    """Generate the pieces of a nested JSON document of an interface
+    tree, where every node is an object with its 'fqname', 'name',
+    'kind', the fields of `pymatuning.tree.InterfaceTree.info_attributes`
+    where they are known, and a list of 'children' objects.
+
+    The pieces are generated as the tree is walked so the document is
+    never held in memory as a whole.
+
+    """
+
+    tree = as_interface_tree(tree)
+
+    prev_depth = -1
+    for node, depth, fqname, _ in iter_nodes(tree):
+
+        if depth <= prev_depth:
+            yield _json_close(prev_depth, depth)
+
+        yield _json_object_start(tree, node, tree.label(node), fqname)
+
+        prev_depth = depth
+
+    yield ']}' * (prev_depth + 1) + '\n'
+
+class JsonSink(RendererSink):
+    """Writes the nested JSON document of an interface tree to a
+    file-like object as the nodes are pushed to it, see
+    `iter_json`."""
+
+    format_name = 'json'
+    needs_fqnames = True
+
+    def __init__(self, stream):
+
+        self.stream = stream
+        self._prev_depth = -1
+
+    def nodes(self, records):
+
+        tree = self.tree
+        prev_depth = self._prev_depth
+
+        pieces = []
+        for node, depth, label, fqname, _ in records:
+
+            if depth <= prev_depth:
+                pieces.append(_json_close(prev_depth, depth))
+
+            pieces.append(_json_object_start(tree, node, label, fqname))
+
+            prev_depth = depth
+
+        self.stream.write(''.join(pieces))
+        self._prev_depth = prev_depth
+
+    def finish(self):
+        self.stream.write(']}' * (self._prev_depth + 1) + '\n')
+
+def write_json(tree, stream):
+    """Write the nested JSON document of an interface tree to a
+    file-like object as the tree is walked, see `JsonSink`."""
+
+    render(tree, [JsonSink(stream)])
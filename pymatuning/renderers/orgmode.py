@@ -1,49 +1,339 @@
-import networkx as nx
+import os
+import os.path as osp
+import re
 
-from pymatuning.listings import mod_basename
+from pymatuning.tree import as_interface_tree
+from pymatuning.renderers import RendererSink, render
+from pymatuning import profiling
 
-def _roots(graph):
-    return [x for x in graph.nodes() if graph.out_degree(x)>0 and graph.in_degree(x)==0]
+def iter_listing(tree, n_indent_spaces=2, marker="-"):
+    """Given an interface tree, either a `pymatuning.tree.InterfaceTree`
+    or a NetworkX DiGraph tree object, generate the lines of a list in
+    org mode format one at a time.
 
-def _tree_output_content(tree_struct, level=0):
+    The tree is walked iteratively so this works for trees of any
+    depth.
 
-    # make list of the content (level, content)
-    data = [(level, tree_struct['id'])]
+    """
+
+    tree = as_interface_tree(tree)
+
+    # the whitespace and marker that start the lines at each depth,
+    # extended as we go deeper
+    prefixes = []
+
+    for node, indent_level in tree.walk():
+
+        while len(prefixes) <= indent_level:
+            prefixes.append("{whitespace}{marker} ".format(
+                whitespace=' ' * (len(prefixes) * n_indent_spaces),
+                marker=marker))
+
+        yield prefixes[indent_level] + tree.label(node)
+
+class ListingSink(RendererSink):
+    """Writes the org mode listing of an interface tree to a file-like
+    object, line by line as the nodes are pushed to it, see
+    `pymatuning.renderers.render`."""
+
+    format_name = 'orgmode'
+
+    def __init__(self, stream, n_indent_spaces=2, marker="-"):
+
+        self.stream = stream
+        self.n_indent_spaces = n_indent_spaces
+        self.marker = marker
+
+        # the whitespace and marker that start the lines at each
+        # depth, extended as we go deeper
+        self._prefixes = []
 
-    # if this has children then add those in after this sub trees root
-    # data is in
-    if 'children' in tree_struct:
-        for substruct in tree_struct['children']:
-            data.extend(_tree_output_content(substruct, level=level+1))
+    def nodes(self, records):
 
-    return data
+        prefixes = self._prefixes
+
+        lines = []
+        for _, depth, label, _, _ in records:
+
+            while len(prefixes) <= depth:
+                prefixes.append("{whitespace}{marker} ".format(
+                    whitespace=' ' * (len(prefixes) * self.n_indent_spaces),
+                    marker=self.marker))
+
+            lines.append(prefixes[depth] + label + '\n')
+
+        self.stream.write(''.join(lines))
+
+def write_listing(tree, stream, n_indent_spaces=2, marker="-"):
+    """Write the org mode listing of an interface tree to a file-like
+    object, line by line as the tree is walked."""
+
+    render(tree, [ListingSink(stream, n_indent_spaces=n_indent_spaces, marker=marker)])
 
 def listing(tree, n_indent_spaces=2, marker="-"):
-    """Given a NetworkX DiGraph tree object generate a list in plaintext
-    in org mode format.
+    """Given an interface tree, either a `pymatuning.tree.InterfaceTree`
+    or a NetworkX DiGraph tree object, generate a list in plaintext in
+    org mode format.
+    """
+
+    # combine all the lines
+    return '\n'.join(iter_listing(tree, n_indent_spaces=n_indent_spaces, marker=marker))
+
+# a line of a listing for a node: the indentation, the bullet with an
+# optional checkbox, and the name, which is struck through for nodes
+# that are gone from the tree
+NODE_LINE_RGX = re.compile(r"( *)([-+]|\d+[.)]) (\[[ Xx-]\] )?(\+?)(\w+)\4\s*$")
+
+class _ListingItem:
+    # a node line of an existing listing and the lines under it
+
+    __slots__ = ('path', 'prefix', 'label', 'struck', 'line', 'body', 'depth', 'parent',
+                 'idx', 'matched',)
+
+    def __init__(self, path, prefix, label, struck, line, depth, parent, idx):
+
+        self.path = path
+        self.prefix = prefix
+        self.label = label
+        self.struck = struck
+        self.line = line
+        self.body = []
+        self.depth = depth
+        self.parent = parent
+        self.idx = idx
+        self.matched = False
+
+def parse_listing(lines, n_indent_spaces=2):
+    """Parse the lines of an existing org mode listing.
+
+    Node lines are list items with only a name, indented by their
+    depth. Every other line, e.g. notes, belongs to the node line
+    before it, or to the preamble before the first one.
+
+    Returns the preamble lines, the items for the node lines in order,
+    and an index from the path of names of each node to its items.
+
     """
 
-    root = _roots(tree)[0]
+    preamble = []
+    items = []
+    index = {}
+
+    # the items of the current path
+    stack = []
+
+    for line in lines:
+
+        match = NODE_LINE_RGX.match(line)
+        if match is not None:
+
+            indent, bullet, checkbox, strike, label = match.groups()
+            depth, remainder = divmod(len(indent), n_indent_spaces)
 
-    lines_data = _tree_output_content(nx.tree_data(tree, root))
-    lines = []
-    for indent_level, content in lines_data:
+            if remainder == 0 and depth <= len(stack):
 
-        if type(content) == str:
-            content_str = mod_basename(content)
+                del stack[depth:]
+
+                if depth == 0:
+                    parent = None
+                    path = (label,)
+                else:
+                    parent = stack[-1]
+                    path = parent.path + (label,)
+
+                item = _ListingItem(path, "{}{} {}".format(indent, bullet, checkbox or ''),
+                                    label, strike == '+', line, depth, parent, len(items))
+
+                items.append(item)
+                index.setdefault(path, []).append(item)
+                stack.append(item)
+
+                continue
+
+        if len(items) > 0:
+            items[-1].body.append(line)
         else:
-            content_str = content[-1]
+            preamble.append(line)
 
-        whitespace = ''.join([' ' for _ in range(indent_level * n_indent_spaces)])
-        line = "{whitespace}{marker} {content}".format(whitespace=whitespace,
-                                                       marker=marker,
-                                                       content=content_str)
+    return preamble, items, index
 
-        lines.append(line)
+def _removed_block(items, item, counts):
+    # the lines of an item that is gone from the tree and of the ones
+    # under it
 
+    end = item.idx + 1
+    while end < len(items) and items[end].depth > item.depth:
+        end += 1
 
-    # combine all the lines
-    return '\n'.join(lines)
+    for removed in items[item.idx:end]:
+
+        if removed.struck:
+            yield removed.line
+        else:
+            counts['removed'] += 1
+            yield "{}+{}+".format(removed.prefix, removed.label)
+
+        yield from removed.body
+
+def iter_updated_listing(tree, preamble, items, index, n_indent_spaces=2, marker="-",
+                         counts=None):
+    """Generate the lines of an existing listing, as from
+    `parse_listing`, updated to the interface tree.
+
+    The nodes are in the order of the tree. Nodes that were already in
+    the listing keep their line, and so their checkbox, and the lines
+    under it. New nodes get a fresh line with the marker. Nodes that
+    are gone are kept, struck through, at the end of the nodes under
+    their parent.
+
+    The number of 'added', 'removed', and 'restored' nodes are counted
+    in the `counts` dictionary, if given.
+
+    """
+
+    tree = as_interface_tree(tree)
+
+    if counts is None:
+        counts = {}
+    for key in ('added', 'removed', 'restored',):
+        counts.setdefault(key, 0)
+
+    # match the nodes to the items first so we know which items are
+    # gone before writing anything
+    matches = []
+    path = []
+    for node, depth in tree.walk():
+
+        del path[depth:]
+        path.append(tree.label(node))
+
+        candidates = index.get(tuple(path))
+        if candidates:
+            item = candidates.pop(0)
+            item.matched = True
+        else:
+            item = None
+
+        matches.append((node, depth, item))
+
+    # the items that are gone, by the item of their parent, the ones
+    # under them go along with them
+    removed_children = {}
+    removed_roots = []
+    for item in items:
+
+        if item.matched:
+            continue
+
+        if item.parent is None:
+            removed_roots.append(item)
+        elif item.parent.matched:
+            removed_children.setdefault(item.parent.idx, []).append(item)
+
+    yield from preamble
+
+    prefixes = []
+
+    # the depth and item of the matched ancestors of the current node,
+    # whose removed children come after all of their nodes
+    open_items = []
+
+    for node, depth, item in matches:
+
+        while len(open_items) > 0 and open_items[-1][0] >= depth:
+            _, closed = open_items.pop()
+            for removed in removed_children.get(closed.idx, ()):
+                yield from _removed_block(items, removed, counts)
+
+        if item is None:
+
+            while len(prefixes) <= depth:
+                prefixes.append("{whitespace}{marker} ".format(
+                    whitespace=' ' * (len(prefixes) * n_indent_spaces),
+                    marker=marker))
+
+            counts['added'] += 1
+            yield prefixes[depth] + tree.label(node)
+
+        else:
+
+            if item.struck:
+                counts['restored'] += 1
+                yield item.prefix + item.label
+            else:
+                yield item.line
+
+            yield from item.body
+
+            open_items.append((depth, item))
+
+    while len(open_items) > 0:
+        _, closed = open_items.pop()
+        for removed in removed_children.get(closed.idx, ()):
+            yield from _removed_block(items, removed, counts)
+
+    for removed in removed_roots:
+        yield from _removed_block(items, removed, counts)
+
+def update_listing(tree, filepath, n_indent_spaces=2, marker="-"):
+    """Update the org mode listing in a file to the interface tree, see
+    `iter_updated_listing`, or write a new one if there is none.
+
+    The file is parsed once and the new listing is written to a
+    temporary file that replaces it atomically, and only if anything
+    changed.
+
+    Returns the counts of 'added', 'removed', and 'restored' nodes and
+    whether the file was 'changed'.
+
+    """
+
+    if osp.exists(filepath):
+        with open(filepath, 'r') as rf:
+            old_lines = rf.read().splitlines()
+    else:
+        old_lines = None
+
+    counts = {}
+
+    with profiling.phase('render', format='orgmode-update'):
+
+        preamble, items, index = parse_listing(old_lines or [],
+                                               n_indent_spaces=n_indent_spaces)
+
+        import tempfile
+
+        fd, tmp_path = tempfile.mkstemp(dir=osp.dirname(osp.abspath(filepath)),
+                                        prefix='.' + osp.basename(filepath), suffix='.tmp')
+
+        # compare to the old lines as we go
+        changed = old_lines is None
+        n_lines = 0
+        try:
+            with os.fdopen(fd, 'w') as wf:
+                for line in iter_updated_listing(tree, preamble, items, index,
+                                                 n_indent_spaces=n_indent_spaces,
+                                                 marker=marker, counts=counts):
+
+                    if not changed and (n_lines >= len(old_lines) or
+                                        old_lines[n_lines] != line):
+                        changed = True
+
+                    wf.write(line)
+                    wf.write('\n')
+                    n_lines += 1
+
+            if old_lines is not None and n_lines != len(old_lines):
+                changed = True
 
+            if changed:
+                if old_lines is not None:
+                    os.chmod(tmp_path, os.stat(filepath).st_mode)
+                os.replace(tmp_path, filepath)
 
+        finally:
+            if osp.exists(tmp_path):
+                os.remove(tmp_path)
 
+    counts['changed'] = changed
+    return counts
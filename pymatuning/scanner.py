@@ -0,0 +1,499 @@
+import re
+import io
+import tokenize
+
+# a string literal, the triple quoted ones can span lines
+_STRING = (r"(?:'''[^'\\]*(?:(?:\\.|'(?!''))[^'\\]*)*'''"
+           r'|"""[^"\\]*(?:(?:\\.|"(?!""))[^"\\]*)*"""'
+           r"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'"
+           r'|"[^"\\\n]*(?:\\.[^"\\\n]*)*")')
+
+# the only things that matter for finding the logical lines of the
+# source, everything in between is skipped over by the regex engine.
+# A lone quote is the start of an unterminated string
+_TOKEN_RGX = re.compile(r"""[(\[{)\]}\n=;]|%s|\#[^\n]*|\\\n|['"]""" % _STRING, re.DOTALL)
+
+_DEF_RGX = re.compile(r"(?:async\b[\s\\]*)?def\b")
+_CLASS_RGX = re.compile(r"class\b")
+
+# import statements, the only ones that start with these
+_IMPORT_RGX = re.compile(r"(?:import|from)\b")
+
+# the headers of compound statements other than definitions, which
+# can have their body on the same line
+_COMPOUND_RGX = re.compile(r"(?:if|elif|else|for|while|try|except|finally|with|async)\b")
+
+# the start of a string literal
+_STRING_START_RGX = re.compile(r"""[rRbBuUfF]{0,2}['"]""")
+
+# statements that are not assignments even if they have an equals
+# sign, one line compound statements and expressions that are only a
+# string (e.g. docstrings)
+_NOT_ASSIGNMENT_RGX = re.compile(
+    r"""(?:if|elif|else|for|while|try|except|finally|with|async)\b|[rRbBuUfF]{0,2}['"]""")
+
+class ScanError(ValueError):
+    """The source has something the scanner doesn't handle, parse all
+    of it instead."""
+    pass
+
+def _decode(source):
+
+    if isinstance(source, str):
+        text = source
+    else:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(source).readline)
+        try:
+            text = source.decode(encoding)
+        except UnicodeDecodeError as err:
+            raise ScanError(str(err))
+
+    # the same newlines as the parser sees them
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+
+    return text
+
+# the braces of the replacement fields of f-strings
+_BRACE_RGX = re.compile(r"[{}]")
+
+def _fstring_braces_balanced(literal):
+    # strings nested in the replacement fields of f-strings can use
+    # the same quotes since python 3.12, which would end the literal
+    # early for us and leave the braces unbalanced
+    depth = 0
+    skip = -1
+    for match in _BRACE_RGX.finditer(literal):
+
+        pos = match.start()
+        if pos == skip:
+            continue
+
+        # doubled braces are only escapes outside of the replacement
+        # fields, inside them `}}` closes two nested fields
+        if depth == 0 and literal[pos + 1:pos + 2] == match.group():
+            skip = pos + 1
+        elif match.group() == '{':
+            depth += 1
+        elif depth == 0:
+            return False
+        else:
+            depth -= 1
+
+    return depth == 0
+
+# the start of the first line after a block, a line that is not
+# blank or a comment and indented at most as much as the statement
+# that opened the block, for each indentation
+_BLOCK_END_RGXS = {}
+
+def _block_end_rgx(indent):
+
+    if indent not in _BLOCK_END_RGXS:
+        _BLOCK_END_RGXS[indent] = re.compile(r"\n {0,%d}(?=[^ \n#])" % indent)
+
+    return _BLOCK_END_RGXS[indent]
+
+# the only ways a line can be part of the one before it, other than
+# brackets
+_SPANNING_TOKENS = ('"""', "'''", '\\\n')
+
+class _LogicalLines:
+    """Iterator over the (start, end) of the logical lines of a source,
+    the end is before a trailing comment.
+
+    The lines in a block can be jumped over with `skip_block` without
+    looking at their tokens.
+
+    """
+
+    def __init__(self, text, skip_blocks=True):
+
+        self.text = text
+        self.skip_blocks = skip_blocks
+
+        # where the value of the last line starts if it is an
+        # assignment, after the last equals sign outside of brackets
+        self.value_start = None
+
+        # whether the last line has more than one statement
+        self.semicolon = False
+
+        # whether lines were jumped over
+        self.jumped = False
+
+        # start of the next line
+        self.pos = 0
+
+        # the (indent, end) of the block last skipped
+        self._block = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+
+        text = self.text
+
+        if self.pos > len(text):
+            raise StopIteration
+
+        line_start = self.pos
+        depth = 0
+        self.value_start = None
+        self.semicolon = False
+
+        # start of a comment at the end of the line
+        comment_start = None
+
+        for match in _TOKEN_RGX.finditer(text, line_start):
+
+            start = match.start()
+            char = text[start]
+
+            if char in '([{':
+                depth += 1
+
+            elif char in ')]}':
+                depth -= 1
+                if depth < 0:
+                    raise ScanError("unmatched closing bracket")
+
+            # newlines in brackets don't end the line
+            elif char == '\n':
+                if depth == 0:
+                    self.pos = match.end()
+                    return line_start, start if comment_start is None else comment_start
+
+            elif char == '=':
+                # not part of a comparison, augmented assignment, or
+                # named expression
+                if (depth == 0 and
+                    text[start - 1] not in '=<>!:+-*/%&|^@' and
+                    text[start + 1:start + 2] != '='):
+                    self.value_start = match.end()
+
+            elif char == '#':
+                if depth == 0:
+                    comment_start = start
+
+            elif char == ';':
+                if depth == 0:
+                    self.semicolon = True
+
+            elif char == '\\':
+                # a line continuation
+                pass
+
+            elif match.end() - start == 1:
+                raise ScanError("unterminated string")
+
+            else:
+                prefix = text[start - 2:start]
+                if (('f' in prefix or 'F' in prefix) and
+                    not _fstring_braces_balanced(match.group())):
+                    raise ScanError("nested f-string quotes")
+
+        if depth != 0:
+            raise ScanError("unclosed bracket")
+
+        self.pos = len(text) + 1
+        return line_start, len(text) if comment_start is None else comment_start
+
+    def skip_block(self, indent):
+        """Jump over the next lines that are indented deeper than
+        `indent`.
+
+        This is only done up to the first token that could make a line
+        part of the one before it, from there on the lines have to be
+        scanned. Brackets can't do that unnoticed, an unclosed bracket
+        in the skipped lines would leave an unmatched closing one
+        after them.
+
+        """
+
+        text = self.text
+
+        if not self.skip_blocks or self.pos > len(text):
+            return
+
+        if (self._block is None or
+            self._block[0] != indent or
+            self.pos >= self._block[1]):
+
+            match = _block_end_rgx(indent).search(text, self.pos - 1)
+            self._block = (indent, len(text) if match is None else match.start() + 1)
+
+        end = self._block[1]
+
+        for token in _SPANNING_TOKENS:
+            token_pos = text.find(token, self.pos, end)
+            if token_pos != -1:
+                # up to the line with the token
+                end = text.rfind('\n', self.pos, token_pos) + 1
+
+        if end > self.pos:
+            self.pos = end
+            self.jumped = True
+
+def skeleton_source(source):
+    """Reduce the source of a module to the statements that can define
+    something at the module or class level.
+
+    Only the logical lines of the source are found, without parsing
+    it. The bodies of functions, except for their docstrings, and of
+    all other compound statements except classes are cut out, as are
+    the statements that can't be assignments. Every statement that is
+    kept stays on its line, so the skeleton parses to a syntax tree
+    with the same definitions as the whole source, with the same line
+    numbers, signatures, and docstrings, see
+    `pymatuning.listings.DefinitionVisitor`, at a fraction of the
+    cost.
+
+    Raises ScanError for sources it can't reduce reliably, e.g. with
+    tabs in the indentation.
+
+    """
+
+    text = _decode(source)
+
+    lines = _LogicalLines(text)
+    try:
+        return _skeleton(text, lines)
+    except ScanError:
+        # the error could come from an unclosed bracket in lines we
+        # jumped over, which are then scanned too
+        if not lines.jumped:
+            raise
+
+    return _skeleton(text, _LogicalLines(text, skip_blocks=False))
+
+class _SkeletonLines:
+    # the lines of a skeleton, with every statement put on the line it
+    # starts on in the source
+
+    def __init__(self, text):
+
+        self.text = text
+        self.lines = []
+
+        # a position in the text and the index of its line
+        self._pos = 0
+        self._line_idx = 0
+
+    def add(self, start, statement):
+        """Add the statement starting at a position of the text and
+        return the index of its last line."""
+
+        self._line_idx += self.text.count('\n', self._pos, start)
+        self._pos = start
+
+        if self._line_idx < len(self.lines):
+            raise ScanError("two statements on one line")
+
+        self.lines.extend([''] * (self._line_idx - len(self.lines)))
+        self.lines.extend(statement.split('\n'))
+
+        return len(self.lines) - 1
+
+    def add_pass(self, line_idx):
+        """Give the compound statement whose header ends on this line a
+        body."""
+        self.lines[line_idx] += ' pass'
+
+def _skeleton(text, lines):
+
+    skeleton = _SkeletonLines(text)
+
+    # the (start, line) of the decorators of the next definition
+    decorators = []
+
+    # the indentation the lines of the block of the last compound
+    # statement must be deeper than
+    block_indent = None
+
+    # lines deeper than this are in a block we skip
+    skip_indent = None
+
+    # lines deeper than this are in the block of a compound statement
+    # at the module level, we only look for imports in it
+    import_indent = None
+
+    # the last line of the header of the function whose body we are
+    # waiting for, only a docstring is kept of it
+    def_header = None
+
+    # the indentation of the body of the class we are in, whether we
+    # are waiting for its first line, and the last line of its header
+    # if nothing of its body was kept yet
+    class_indent = None
+    class_started = False
+    class_header = None
+
+    # whether the line is the first of the module or of the body of a
+    # class, which could be their docstring
+    body_first = True
+
+    for start, end in lines:
+
+        line = text[start:end]
+        code = line.strip()
+
+        # blank and comment lines
+        if not code:
+            continue
+
+        indent = len(line) - len(line.lstrip())
+
+        # python counts tabs and form feeds in its own way
+        if line[:indent].strip(' '):
+            raise ScanError("tab or form feed in the indentation")
+
+        if block_indent is not None:
+
+            if indent <= block_indent:
+                raise ScanError("expected an indented block")
+
+            block_indent = None
+
+            if def_header is not None:
+
+                if _STRING_START_RGX.match(code):
+                    skeleton.add(start, ' ' * indent + code)
+                else:
+                    skeleton.add_pass(def_header)
+
+                def_header = None
+
+            if class_started:
+                class_indent = indent
+                class_started = False
+                body_first = True
+
+        if skip_indent is not None:
+
+            if indent > skip_indent:
+                lines.skip_block(skip_indent)
+                continue
+
+            skip_indent = None
+
+        if import_indent is not None:
+
+            if indent > import_indent:
+
+                if _IMPORT_RGX.match(code):
+                    skeleton.add(start, code)
+
+                elif code[-1] == ':':
+                    block_indent = indent
+
+                    # definitions in the block are not part of the
+                    # interface
+                    if _DEF_RGX.match(code) or _CLASS_RGX.match(code):
+                        skip_indent = indent
+
+                elif 'import' in code and (lines.semicolon or _COMPOUND_RGX.match(code)):
+                    raise ScanError("import in a one line compound statement")
+
+                continue
+
+            import_indent = None
+
+        if class_indent is not None and indent == 0:
+
+            # the class body could be left without statements
+            if class_header is not None:
+                skeleton.add_pass(class_header)
+
+            class_indent = class_header = None
+
+        if indent != (0 if class_indent is None else class_indent):
+            raise ScanError("unexpected indentation")
+
+        first = body_first
+        body_first = False
+
+        if code[0] == '@':
+            decorators.append((start, ' ' * indent + code))
+            continue
+
+        header = code[-1] == ':'
+
+        piece = None
+
+        if _DEF_RGX.match(code):
+
+            piece = ' ' * indent + code
+
+            if header:
+                block_indent = skip_indent = indent
+
+        elif _CLASS_RGX.match(code) and class_indent is None:
+
+            piece = code
+
+            if header:
+                block_indent = 0
+                class_started = True
+
+        elif _IMPORT_RGX.match(code):
+            piece = ' ' * indent + code
+
+        # other compound statements, and classes in classes, define
+        # nothing that is part of the interface, but at the module
+        # level they can import
+        elif header:
+            block_indent = indent
+            if class_indent is None:
+                import_indent = indent
+            else:
+                skip_indent = indent
+
+        # the docstring of the module or of a class
+        elif first and _STRING_START_RGX.match(code):
+            piece = ' ' * indent + code
+
+        elif 'import' in code and (lines.semicolon or _COMPOUND_RGX.match(code)):
+            raise ScanError("import in a one line compound statement")
+
+        # only assignments define something else
+        elif '=' in code and not _NOT_ASSIGNMENT_RGX.match(code):
+
+            # only the targets are needed, except for the value of
+            # `__all__`. Equals signs of lambda defaults are outside
+            # of brackets too.
+            value_start = lines.value_start
+            if (value_start is None or
+                'lambda' in code or
+                '__all__' in text[start:value_start]):
+                piece = ' ' * indent + code
+            else:
+                piece = ' ' * indent + text[start + indent:value_start] + ' 0'
+
+        if piece is not None:
+
+            for decorator_start, decorator in decorators:
+                skeleton.add(decorator_start, decorator)
+
+            line_idx = skeleton.add(start, piece)
+
+            if indent > 0:
+                class_header = None
+
+            # the compound statements that are kept need a body
+            if header and class_started:
+                class_header = line_idx
+            elif header:
+                def_header = line_idx
+
+        decorators = []
+
+    if block_indent is not None:
+        raise ScanError("expected an indented block")
+
+    if class_header is not None:
+        skeleton.add_pass(class_header)
+
+    skeleton.lines.append('')
+    return '\n'.join(skeleton.lines)
@@ -0,0 +1,183 @@
+import json
+import hashlib
+import heapq
+
+from pymatuning.tree import (
+    InterfaceTree,
+    as_interface_tree,
+    NO_NODE,
+    MODULE,
+    MODULE_SEPARATOR,
+    KIND_NAMES,
+)
+from pymatuning import profiling
+
+# the partial trees of shards are NDJSON: a header object and then a
+# [module index, module info, nodes] record for each parsed module of
+# the shard, in the order of the modules. Change the version whenever
+# the records change.
+PARTIAL_FORMAT = 'pymatuning-partial'
+PARTIAL_VERSION = 2
+
+# the number of values of each node in a record
+_NODE_VALUES = 7
+
+def shard_of(mod_fqname, n_shards):
+    """The shard a module belongs to, by a hash of its fully qualified
+    name that is the same on every machine and python version."""
+
+    digest = hashlib.blake2b(mod_fqname.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % n_shards
+
+def parse_shard(spec):
+    """Parse a shard given as 'i/N' into (i, N), the shards are numbered
+    from 0."""
+
+    try:
+        shard, n_shards = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError("Shard must be given as i/N, not {}".format(spec))
+
+    if not 0 <= shard < n_shards:
+        raise ValueError("Shard {} is not one of the {} shards".format(shard, n_shards))
+
+    return shard, n_shards
+
+def iter_partial(tree, shard):
+    """Generate the lines of the partial tree of a shard, from the tree
+    built with `pymatuning.listings.interface_tree` for it.
+
+    The header has the fully qualified names of all of the modules, as
+    every shard discovers all of them, so the structure of the modules
+    can be rebuilt from any one. Each record has the index of a module
+    of the shard, its info, and its definitions as a flat list of
+    (parent, kind code, name) followed by their info, see
+    `pymatuning.tree.InterfaceTree.info`. The parent is the position
+    of the parent in the list counting from 1, or 0 for the module.
+
+    """
+
+    tree = as_interface_tree(tree)
+    shard_idx, n_shards = shard
+
+    modules = [node for node, _ in tree.walk() if tree.kind(node) == MODULE]
+
+    yield json.dumps({'format' : PARTIAL_FORMAT,
+                      'version' : PARTIAL_VERSION,
+                      'shard' : shard_idx,
+                      'shards' : n_shards,
+                      'modules' : [tree.name(module) for module in modules]})
+
+    for mod_idx, module in enumerate(modules):
+
+        if shard_of(tree.name(module), n_shards) != shard_idx:
+            continue
+
+        # the position of each node in the record
+        positions = {module : 0}
+        nodes = []
+
+        for child in tree.children(module):
+
+            if tree.kind(child) == MODULE:
+                continue
+
+            for node, _ in tree.walk(child):
+                positions[node] = len(positions)
+                nodes.extend((positions[tree.parent(node)], tree.kind(node), tree.name(node)))
+                nodes.extend(tree.info(node))
+
+        # parsed modules have their info even without definitions
+        if len(nodes) > 0 or tree.lineno(module) is not None:
+            yield json.dumps([mod_idx, tree.info(module), nodes], separators=(',', ':'))
+
+def write_partial(tree, stream, shard):
+    """Write the partial tree of a shard to a file-like object, see
+    `iter_partial`."""
+
+    with profiling.phase('render', format='partial'):
+        for line in iter_partial(tree, shard):
+            stream.write(line)
+            stream.write('\n')
+
+def _read_header(stream):
+
+    line = stream.readline()
+    try:
+        header = json.loads(line)
+    except ValueError:
+        header = None
+
+    if not isinstance(header, dict) or header.get('format') != PARTIAL_FORMAT:
+        raise ValueError("{} is not a partial interface tree".format(
+            getattr(stream, 'name', stream)))
+
+    if header['version'] != PARTIAL_VERSION:
+        raise ValueError("{} has version {} of the partial format, not {}".format(
+            getattr(stream, 'name', stream), header['version'], PARTIAL_VERSION))
+
+    return header
+
+def _iter_records(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+def merge_partials(streams):
+    """Merge the partial trees of all the shards of a run, given as
+    file-like objects, into the InterfaceTree a single run would have
+    built.
+
+    The module nodes are made from the header and the records of the
+    shards are merged in module order as they are read, so only the
+    tree being built is held in memory.
+
+    Raises ValueError if the partial trees are not all of the shards
+    of the same run.
+
+    """
+
+    with profiling.phase('merge'):
+
+        headers = [_read_header(stream) for stream in streams]
+
+        n_shards = headers[0]['shards']
+        modules = headers[0]['modules']
+
+        for header in headers:
+            if header['shards'] != n_shards or header['modules'] != modules:
+                raise ValueError("The partial trees are not from the same run")
+
+        shards = sorted(header['shard'] for header in headers)
+        if shards != list(range(n_shards)):
+            raise ValueError("Need the partial trees of all {} shards, got shards {}".format(
+                n_shards, ", ".join(str(shard) for shard in shards)))
+
+        i_tree = InterfaceTree()
+
+        # first all of the modules, the same as when the tree is built
+        # in one go
+        module_nodes = {}
+        for mod_fqname in modules:
+            parent = module_nodes.get(mod_fqname.rpartition(MODULE_SEPARATOR)[0], NO_NODE)
+            module_nodes[mod_fqname] = i_tree.add_node(mod_fqname, MODULE, parent)
+
+        records = heapq.merge(*(_iter_records(stream) for stream in streams),
+                              key=lambda record: record[0])
+
+        for mod_idx, mod_info, nodes in records:
+
+            module_node = module_nodes[modules[mod_idx]]
+            i_tree.set_info(module_node, mod_info)
+
+            record_nodes = [module_node]
+            for idx in range(0, len(nodes), _NODE_VALUES):
+                parent, kind, name = nodes[idx:idx + 3]
+
+                if not 0 < kind < len(KIND_NAMES):
+                    raise ValueError("Unknown kind code {} in the partial trees".format(kind))
+
+                record_nodes.append(i_tree.add_node(name, kind, record_nodes[parent],
+                                                    info=nodes[idx + 3:idx + _NODE_VALUES]))
+
+        return i_tree
@@ -0,0 +1,527 @@
+import abc
+import os
+import os.path as osp
+import re
+from collections import deque
+from importlib.machinery import (
+    all_suffixes,
+    EXTENSION_SUFFIXES,
+    SOURCE_SUFFIXES,
+    BYTECODE_SUFFIXES,
+)
+
+from pymatuning.tree import MODULE_SEPARATOR
+
+# the archives packages can be read from without unpacking them
+ZIP_EXTS = ('.whl', '.zip', '.egg',)
+TAR_EXTS = ('.tar.gz', '.tgz', '.tar.bz2', '.tar.xz', '.tar',)
+ARCHIVE_EXTS = ZIP_EXTS + TAR_EXTS
+
+# the order the import system prefers the files of a module in
+ORIGIN_SUFFIXES = EXTENSION_SUFFIXES + SOURCE_SUFFIXES + BYTECODE_SUFFIXES
+
+# the longest first in case they overlap, as in inspect.getmodulename
+_MODULE_SUFFIXES = sorted(all_suffixes(), key=len, reverse=True)
+
+# the separator of the paths of archive members
+MEMBER_SEPARATOR = '/'
+
+# the number of threads doing I/O ahead of the parsing by default,
+# they mostly wait on the storage so there can be more than CPUs
+DEFAULT_IO_THREADS = 8
+
+def module_name(filename):
+    """The module name for a file name, or None if it is not a module
+    file."""
+
+    for suffix in _MODULE_SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)]
+
+    return None
+
+def is_source_file(filepath):
+    """Whether a module file has python source, rather than being an
+    extension module or bytecode. Namespace packages have no file,
+    which is None."""
+
+    return filepath is not None and filepath.endswith(tuple(SOURCE_SUFFIXES))
+
+def split_archive_path(path):
+    """Split a path into the path of an archive file and the path inside
+    it, like the paths zipimport uses. Returns None if the path is
+    not in an archive."""
+
+    lower_path = path.lower()
+    for ext in ARCHIVE_EXTS:
+
+        idx = lower_path.find(ext)
+        while idx != -1:
+
+            end = idx + len(ext)
+            if end == len(path) or path[end] == os.sep:
+
+                archive_path = path[:end]
+                if osp.isfile(archive_path):
+                    return archive_path, path[end + 1:].replace(os.sep, MEMBER_SEPARATOR)
+
+            idx = lower_path.find(ext, end)
+
+    return None
+
+def is_archive_path(package):
+    """Whether a package given as a string is in an archive, see
+    `split_archive_path`."""
+
+    return isinstance(package, str) and split_archive_path(package) is not None
+
+class SourceProvider(abc.ABC):
+    """Lists the files of a tree of directories and reads them.
+
+    The directories are addressed by keys specific to the provider,
+    `filepath` turns a key into the path used in the module records.
+
+    """
+
+    @abc.abstractmethod
+    def listdir(self, key):
+        """Dictionary of the names in a directory to whether they are
+        directories themselves."""
+
+    @abc.abstractmethod
+    def join(self, key, name):
+        """The key of an entry of a directory."""
+
+    @abc.abstractmethod
+    def filepath(self, key):
+        """The path of a key in the module records."""
+
+    @abc.abstractmethod
+    def read_sources(self, keys):
+        """Generate (key, source bytes) for the files, in the order that
+        is fastest to read them in."""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def init_filename(self, key):
+        """The file name of the __init__ of a package directory, or None
+        if it is not a package."""
+        return self._origin(self.listdir(key), '__init__')
+
+    def _origin(self, entries, modname):
+        # the file of a module the import system would use
+        for suffix in ORIGIN_SUFFIXES:
+            filename = modname + suffix
+            if entries.get(filename) is False:
+                return filename
+
+        return None
+
+    def iter_modules(self, keys):
+        """Generate the (name, filepath, package key) of the modules in
+        the directories, the package key is None for modules that are
+        not packages.
+
+        The modules are the same and in the same order as those of
+        `pkgutil.iter_modules` for the directories.
+
+        """
+
+        yielded = set()
+        for key in keys:
+
+            entries = self.listdir(key)
+
+            # packages come before the modules of the same name
+            for filename in sorted(entries):
+
+                modname = module_name(filename)
+
+                if modname == '__init__' or modname in yielded:
+                    continue
+
+                if modname is None:
+
+                    if not entries[filename] or '.' in filename or filename in yielded:
+                        continue
+
+                    # only directories with an __init__ are packages
+                    package_key = self.join(key, filename)
+                    init_filename = self.init_filename(package_key)
+                    if init_filename is None:
+                        continue
+
+                    yielded.add(filename)
+                    yield (filename,
+                           self.filepath(self.join(package_key, init_filename)),
+                           package_key)
+
+                elif '.' not in modname:
+
+                    yielded.add(modname)
+                    yield (modname,
+                           self.filepath(self.join(key, self._origin(entries, modname))),
+                           None)
+
+class DirectorySource(SourceProvider):
+    """The files on the filesystem, the keys are the paths of the
+    directories.
+
+    Each directory is only listed once. With more than one I/O thread
+    the subdirectories of a directory are listed ahead in a pool of
+    that many threads as soon as it is, since on network filesystems
+    every listing is a round trip. If a `pymatuning.filters.TreeFilter`
+    is given, the subdirectories of the packages given to
+    `add_package` are only listed ahead if the filter walks them.
+
+    """
+
+    def __init__(self, io_threads=1, tree_filter=None):
+
+        self.io_threads = io_threads
+        self.tree_filter = tree_filter
+        self._executor = None
+
+        # the entries of the directories listed, or the futures of
+        # the ones being listed
+        self._listings = {}
+
+        # the (fqname, depth, selected) of the package directories,
+        # for the filter
+        self._packages = {}
+
+    def add_package(self, keys, modname, depth=0, selected=True):
+        """Name the package whose directories are at the keys, at a
+        depth in the tree and whether the filter selects it, so that
+        its subdirectories are only listed ahead if the filter walks
+        them."""
+
+        for key in keys:
+            self._packages[key] = (modname, depth, selected)
+
+    def _scandir(self, key):
+
+        try:
+            with os.scandir(key) as entries:
+                return {entry.name : entry.is_dir() for entry in entries}
+        except OSError:
+            return {}
+
+    def listdir(self, key):
+
+        entries = self._listings.get(key)
+        if isinstance(entries, dict):
+            return entries
+
+        if entries is None:
+            entries = self._scandir(key)
+        else:
+            entries = entries.result()
+
+        self._listings[key] = entries
+        self._prefetch_subdirs(key, entries)
+
+        return entries
+
+    def _prefetch_subdirs(self, key, entries):
+
+        if self.io_threads <= 1:
+            return
+
+        if self._executor is None:
+            # like the archive modules this is imported only when used,
+            # most runs don't need it and it is slow to import
+            from concurrent.futures import ThreadPoolExecutor
+            self._executor = ThreadPoolExecutor(max_workers=self.io_threads)
+
+        tree_filter = self.tree_filter
+        package = self._packages.get(key) if tree_filter is not None else None
+
+        # only directories that can be packages are ever listed
+        for name, is_dir in entries.items():
+
+            subdir_key = osp.join(key, name)
+            if not is_dir or '.' in name or subdir_key in self._listings:
+                continue
+
+            # the same test as when the modules are walked
+            if package is not None:
+
+                modname, depth, selected = package
+                submod_fqname = modname + MODULE_SEPARATOR + name
+                if not tree_filter.walk_module(submod_fqname, depth + 1, selected):
+                    continue
+
+                self._packages[subdir_key] = (submod_fqname, depth + 1,
+                                              selected or tree_filter.is_included(submod_fqname))
+
+            self._listings[subdir_key] = self._executor.submit(self._scandir, subdir_key)
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def join(self, key, name):
+        return osp.join(key, name)
+
+    def filepath(self, key):
+        return key
+
+    def read_sources(self, keys):
+
+        for key in keys:
+            with open(key, 'rb') as rf:
+                yield key, rf.read()
+
+class _ArchiveSource(SourceProvider):
+    # the keys are the member paths inside the archive, with '' for
+    # its top directory
+
+    def __init__(self, archive_path, names):
+
+        self.archive_path = archive_path
+
+        # the entries of every directory, archives don't always have
+        # members for the directories themselves
+        self._dirs = {'' : {}}
+        for name in names:
+
+            parts = name.split(MEMBER_SEPARATOR)
+            for depth in range(len(parts) - 1):
+                dir_key = MEMBER_SEPARATOR.join(parts[:depth])
+                self._dirs.setdefault(dir_key, {})[parts[depth]] = True
+                self._dirs.setdefault(MEMBER_SEPARATOR.join(parts[:depth + 1]), {})
+
+            self._dirs.setdefault(MEMBER_SEPARATOR.join(parts[:-1]), {})[parts[-1]] = False
+
+    def listdir(self, key):
+        return self._dirs.get(key, {})
+
+    def join(self, key, name):
+        if key:
+            return key + MEMBER_SEPARATOR + name
+        else:
+            return name
+
+    def filepath(self, key):
+        if key:
+            return osp.join(self.archive_path, *key.split(MEMBER_SEPARATOR))
+        else:
+            return self.archive_path
+
+class ZipSource(_ArchiveSource):
+    """The members of a zip archive, e.g. a wheel, which are read one
+    at a time."""
+
+    def __init__(self, archive_path):
+
+        import zipfile
+        self._zip = zipfile.ZipFile(archive_path)
+
+        super().__init__(archive_path, [info.filename for info in self._zip.infolist()
+                                        if not info.is_dir()])
+
+    def read_sources(self, keys):
+
+        # in the order they are stored in
+        infos = sorted((self._zip.getinfo(key) for key in keys),
+                       key=lambda info: info.header_offset)
+
+        for info in infos:
+            yield info.filename, self._zip.read(info)
+
+    def close(self):
+        self._zip.close()
+
+def _member_name(name):
+    # tarballs made in the current directory have a leading './'
+    while name.startswith('./'):
+        name = name[2:]
+    return name
+
+class TarSource(_ArchiveSource):
+    """The members of a tar archive, e.g. a source distribution.
+
+    Compressed tar archives can only be read from the start, so the
+    members are streamed in a single pass each time sources are read.
+
+    """
+
+    def __init__(self, archive_path):
+
+        import tarfile
+        with tarfile.open(archive_path, 'r|*') as tar:
+            names = [_member_name(member.name) for member in tar if member.isfile()]
+
+        super().__init__(archive_path, names)
+
+    def read_sources(self, keys):
+
+        import tarfile
+
+        wanted = set(keys)
+        with tarfile.open(self.archive_path, 'r|*') as tar:
+            for member in tar:
+
+                name = _member_name(member.name)
+                if name not in wanted or not member.isfile():
+                    continue
+
+                yield name, tar.extractfile(member).read()
+
+                wanted.discard(name)
+                if len(wanted) == 0:
+                    break
+
+def open_archive(archive_path):
+    """The source provider for an archive file."""
+
+    if archive_path.lower().endswith(ZIP_EXTS):
+        return ZipSource(archive_path)
+    else:
+        return TarSource(archive_path)
+
+def distribution_name(archive_path):
+    """The name of the distribution of a wheel or source distribution
+    from its file name, normalized like a module name."""
+
+    filename = osp.basename(archive_path)
+    for ext in ARCHIVE_EXTS:
+        if filename.lower().endswith(ext):
+            filename = filename[:-len(ext)]
+            break
+
+    # wheels have the name before the first dash, source
+    # distributions before the last one
+    if archive_path.lower().endswith('.whl'):
+        name = filename.split('-')[0]
+    else:
+        name = filename.rsplit('-', 1)[0]
+
+    return re.sub(r"[-_.]+", "_", name).lower()
+
+def archive_roots(source):
+    """The directories of an archive to look for the top level modules
+    in: the top of a wheel, or the top directory of a source
+    distribution and its 'src' directory."""
+
+    top_entries = source.listdir('')
+
+    roots = ['']
+    if len(top_entries) == 1:
+
+        (top_name, is_dir), = top_entries.items()
+        if is_dir and source.init_filename(top_name) is None:
+            roots = [top_name]
+
+    src_key = source.join(roots[0], 'src')
+    if source.listdir(roots[0]).get('src') and source.init_filename(src_key) is None:
+        roots.append(src_key)
+
+    return roots
+
+def archive_module(source, modname=None):
+    """Find a top level module in an archive, returns its (name,
+    filepath, package key) as from `SourceProvider.iter_modules`.
+
+    Without a module name the one with the name of the distribution
+    is taken, or the only public package in it.
+
+    """
+
+    modules = list(source.iter_modules(archive_roots(source)))
+
+    if modname is None:
+
+        dist_name = distribution_name(source.archive_path)
+        for module in modules:
+            if module[0].lower() == dist_name:
+                return module
+
+        packages = [module for module in modules
+                    if module[2] is not None and not module[0].startswith('_')]
+        if len(packages) == 1:
+            return packages[0]
+
+        raise ModuleNotFoundError(
+            "Can't tell which package in {} to use, give one of {} as {}".format(
+                source.archive_path,
+                ", ".join(module[0] for module in modules),
+                osp.join(source.archive_path, "<module name>")))
+
+    for module in modules:
+        if module[0] == modname:
+            return module
+
+    raise ModuleNotFoundError("No module named {} in {}".format(modname, source.archive_path),
+                              name=modname)
+
+def iter_file_sources(filepaths):
+    """Generate (index, source) for the module files. The source is None
+    for files on the filesystem, which are read by whoever needs them,
+    and the bytes of the members of archives.
+
+    Each archive is opened once and its members read in the order that
+    is fastest for it, so the indices are not in order.
+
+    """
+
+    archive_members = {}
+    for idx, filepath in enumerate(filepaths):
+
+        split_path = split_archive_path(filepath)
+        if split_path is None:
+            yield idx, None
+        else:
+            archive_path, member = split_path
+            archive_members.setdefault(archive_path, {})[member] = idx
+
+    for archive_path, members in archive_members.items():
+        with open_archive(archive_path) as source:
+            for member, member_source in source.read_sources(members.keys()):
+                yield members[member], member_source
+
+def prefetch_map(func, items, io_threads=DEFAULT_IO_THREADS):
+    """Generate (item, func(item)) for the items in order, with func
+    called ahead of the consumer in a pool of `io_threads` threads.
+
+    This is for I/O like reading files, so that the consumer rarely
+    waits on it. At most twice as many calls as threads are ahead at
+    a time, which bounds the results held in memory. With a single
+    thread func is only called when the next result is needed.
+
+    """
+
+    if io_threads <= 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(max_workers=io_threads)
+    pending = deque()
+    try:
+
+        for item in items:
+
+            pending.append((item, executor.submit(func, item)))
+
+            if len(pending) >= 2 * io_threads:
+                item, future = pending.popleft()
+                yield item, future.result()
+
+        while len(pending) > 0:
+            item, future = pending.popleft()
+            yield item, future.result()
+
+    finally:
+        executor.shutdown(cancel_futures=True)
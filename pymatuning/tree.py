@@ -0,0 +1,466 @@
+from array import array
+
+# codes for the kinds of nodes. When the same name is defined more
+# than once in a module or class the node gets the larger code, so
+# e.g. a property with a setter is a property and not a method.
+MODULE = 0
+VARIABLE = 1
+FUNCTION = 2
+CLASS = 3
+ATTRIBUTE = 4
+METHOD = 5
+CLASSMETHOD = 6
+STATICMETHOD = 7
+GETTER = 8
+SETTER = 9
+PROPERTY = 10
+
+KIND_NAMES = ('module', 'variable', 'function', 'class', 'attribute', 'method',
+              'classmethod', 'staticmethod', 'getter', 'setter', 'property',)
+
+KIND_CODES = {name : code for code, name in enumerate(KIND_NAMES)}
+
+# the id used for no node, e.g. the parent of the root
+NO_NODE = -1
+
+# typecode of the arrays of node ids, 32 bit signed ints
+NODE_TYPECODE = 'i'
+
+MODULE_SEPARATOR = '.'
+CLASS_METHOD_SEPARATOR = '.'
+
+# the bits of the flags of a node
+HAS_DOCSTRING = 0x1
+IS_ASYNC = 0x2
+RETURNS_ANNOTATED = 0x4
+
+# the (line, flags, number of arguments, number of annotated
+# arguments) of a node, the line is 0 where it is not known and the
+# counts are -1 for nodes that are not functions
+NO_INFO = (0, 0, -1, -1)
+
+class InterfaceTree:
+    """Compact tree of the modules and definitions of a package.
+
+    Nodes are integer ids, the root is 0, and the structure is kept in
+    arrays indexed by them: the parent, first child, and next sibling
+    of each node, its kind code, and the id of its name in a table of
+    interned strings. The children of a node are in the order they
+    were added.
+
+    Module nodes are named by their fully qualified name, definitions
+    by their plain name.
+
+    The information about the source of each node, see `info`, is kept
+    in arrays as well: the line it is defined on, its flags (see
+    `HAS_DOCSTRING`, `IS_ASYNC`, and `RETURNS_ANNOTATED`), and for
+    functions the number of their arguments and of the annotated
+    ones.
+
+    Use `to_networkx` to get the same DiGraph as the one built by
+    `pymatuning.listings.interface_tree`.
+
+    """
+
+    def __init__(self):
+
+        # interned strings for the names, and the index of each
+        self._strings = []
+        self._string_ids = {}
+
+        self._names = array(NODE_TYPECODE)
+        self._kinds = array('b')
+        self._parents = array(NODE_TYPECODE)
+        self._first_children = array(NODE_TYPECODE)
+        self._next_siblings = array(NODE_TYPECODE)
+
+        # used to append children in constant time
+        self._last_children = array(NODE_TYPECODE)
+
+        self._linenos = array('i')
+        self._flags = array('B')
+        self._nargs = array('h')
+        self._n_annotated = array('h')
+
+    def __len__(self):
+        return len(self._kinds)
+
+    def _intern(self, string):
+
+        try:
+            return self._string_ids[string]
+        except KeyError:
+            string_id = len(self._strings)
+            self._strings.append(string)
+            self._string_ids[string] = string_id
+            return string_id
+
+    def add_node(self, name, kind, parent=NO_NODE, info=NO_INFO):
+        """Add a node as the last child of the parent and return its id.
+        The info is the (line, flags, number of arguments, number of
+        annotated arguments) of it, see `NO_INFO`."""
+
+        node = len(self._kinds)
+
+        self._names.append(self._intern(name))
+        self._kinds.append(kind)
+        self._parents.append(parent)
+        self._first_children.append(NO_NODE)
+        self._next_siblings.append(NO_NODE)
+        self._last_children.append(NO_NODE)
+
+        lineno, flags, nargs, n_annotated = info
+        self._linenos.append(lineno)
+        self._flags.append(flags)
+        self._nargs.append(nargs)
+        self._n_annotated.append(n_annotated)
+
+        if parent != NO_NODE:
+            last = self._last_children[parent]
+            if last == NO_NODE:
+                self._first_children[parent] = node
+            else:
+                self._next_siblings[last] = node
+            self._last_children[parent] = node
+
+        return node
+
+    def set_kind(self, node, kind):
+        self._kinds[node] = kind
+
+    def set_info(self, node, info):
+        lineno, flags, nargs, n_annotated = info
+        self._linenos[node] = lineno
+        self._flags[node] = flags
+        self._nargs[node] = nargs
+        self._n_annotated[node] = n_annotated
+
+    def detach_children(self, node, first):
+        """Detach the child `first` of a node and all of the children
+        after it, so that new ones can be added in their place.
+
+        The detached nodes stay in the arrays, so ids are never reused,
+        but they can no longer be reached from the root.
+
+        """
+
+        prev = NO_NODE
+        child = self._first_children[node]
+        while child != first:
+            prev = child
+            child = self._next_siblings[child]
+
+        if prev == NO_NODE:
+            self._first_children[node] = NO_NODE
+        else:
+            self._next_siblings[prev] = NO_NODE
+
+        self._last_children[node] = prev
+
+    @property
+    def root(self):
+        return 0
+
+    def name(self, node):
+        return self._strings[self._names[node]]
+
+    def kind(self, node):
+        return self._kinds[node]
+
+    def kind_name(self, node):
+        return KIND_NAMES[self._kinds[node]]
+
+    def parent(self, node):
+        return self._parents[node]
+
+    def is_module(self, node):
+        return self._kinds[node] == MODULE
+
+    def info(self, node):
+        """The (line, flags, number of arguments, number of annotated
+        arguments) of a node, see `NO_INFO`."""
+        return (self._linenos[node], self._flags[node], self._nargs[node],
+                self._n_annotated[node])
+
+    def lineno(self, node):
+        """The line the node is defined on, or None if it is not known,
+        e.g. for variables. Modules are on line 1."""
+        return self._linenos[node] or None
+
+    def has_docstring(self, node):
+        return bool(self._flags[node] & HAS_DOCSTRING)
+
+    def is_async(self, node):
+        return bool(self._flags[node] & IS_ASYNC)
+
+    def returns_annotated(self, node):
+        return bool(self._flags[node] & RETURNS_ANNOTATED)
+
+    def nargs(self, node):
+        """The number of arguments of a function, including `self`,
+        `*args`, and `**kwargs`, or None if it is not a function."""
+
+        nargs = self._nargs[node]
+        return None if nargs < 0 else nargs
+
+    def n_annotated(self, node):
+        """The number of annotated arguments of a function, or None if
+        it is not a function."""
+
+        n_annotated = self._n_annotated[node]
+        return None if n_annotated < 0 else n_annotated
+
+    def info_attributes(self, node):
+        """The information about the node as a dictionary of its known
+        attributes: 'lineno' and 'docstring' where the line is known,
+        and 'nargs', 'n_annotated', 'returns_annotated', and 'async'
+        for functions."""
+
+        lineno, flags, nargs, n_annotated = self.info(node)
+        if lineno == 0:
+            return {}
+
+        attrs = {'lineno' : lineno,
+                 'docstring' : bool(flags & HAS_DOCSTRING)}
+
+        if nargs >= 0:
+            attrs['nargs'] = nargs
+            attrs['n_annotated'] = n_annotated
+            attrs['returns_annotated'] = bool(flags & RETURNS_ANNOTATED)
+            attrs['async'] = bool(flags & IS_ASYNC)
+
+        return attrs
+
+    def children(self, node):
+        """Generate the ids of the children of a node in order."""
+
+        child = self._first_children[node]
+        while child != NO_NODE:
+            yield child
+            child = self._next_siblings[child]
+
+    # for networkx style iteration
+    successors = children
+
+    def label(self, node):
+        """The short name of the node as shown in listings."""
+
+        name = self.name(node)
+        if self._kinds[node] == MODULE:
+            return name.split(MODULE_SEPARATOR)[-1]
+        else:
+            return name
+
+    def module_of(self, node):
+        """The id of the module a node is defined in, or the node itself
+        if it is a module."""
+
+        while self._kinds[node] != MODULE:
+            node = self._parents[node]
+
+        return node
+
+    def fqname(self, node):
+        """The fully qualified name of the node, e.g. 'pkg.mod.Class.method'."""
+
+        if self._kinds[node] == MODULE:
+            return self.name(node)
+
+        parent = self._parents[node]
+        if self._kinds[parent] == MODULE:
+            sep = MODULE_SEPARATOR
+        else:
+            sep = CLASS_METHOD_SEPARATOR
+
+        return self.fqname(parent) + sep + self.name(node)
+
+    def node_id(self, node):
+        """The id of the node in the networkx graph, the fully qualified
+        name for modules and a tuple of the module name and the names
+        of the definitions otherwise."""
+
+        if self._kinds[node] == MODULE:
+            return self.name(node)
+
+        names = []
+        while self._kinds[node] != MODULE:
+            names.append(self.name(node))
+            node = self._parents[node]
+        names.append(self.name(node))
+
+        return tuple(reversed(names))
+
+    def walk(self, node=0):
+        """Generate (node, depth) pairs for the subtree of the node in
+        depth first order.
+
+        This only follows the child and sibling links so it takes no
+        extra memory no matter the size of the tree.
+
+        """
+
+        first_children = self._first_children
+        next_siblings = self._next_siblings
+        parents = self._parents
+
+        top = node
+        depth = 0
+        while True:
+
+            yield node, depth
+
+            # go down if we can
+            child = first_children[node]
+            if child != NO_NODE:
+                node = child
+                depth += 1
+                continue
+
+            # otherwise go to the next sibling of this node or of the
+            # closest ancestor that has one
+            while node != top and next_siblings[node] == NO_NODE:
+                node = parents[node]
+                depth -= 1
+
+            if node == top:
+                return
+
+            node = next_siblings[node]
+
+    def expand_all(self):
+        """Make sure every node of the tree is in it, which is always the
+        case here, see `pymatuning.lazy.LazyInterfaceTree`."""
+        pass
+
+    def branch(self, node):
+        """A new InterfaceTree with the subtree of the node and only the
+        path of its ancestors above it, e.g. to list one class of a
+        package."""
+
+        branch = InterfaceTree()
+
+        ancestors = []
+        ancestor = self._parents[node]
+        while ancestor != NO_NODE:
+            ancestors.append(ancestor)
+            ancestor = self._parents[ancestor]
+
+        parent = NO_NODE
+        for ancestor in reversed(ancestors):
+            parent = branch.add_node(self.name(ancestor), self._kinds[ancestor], parent,
+                                     info=self.info(ancestor))
+
+        # the node in the branch of the ancestor at each depth
+        branch_parents = [parent]
+        for sub, depth in self.walk(node):
+            del branch_parents[depth + 1:]
+            branch_parents.append(branch.add_node(self.name(sub), self._kinds[sub],
+                                                  branch_parents[depth],
+                                                  info=self.info(sub)))
+
+        return branch
+
+    def to_networkx(self):
+        """Convert to a NetworkX DiGraph with the node ids of `node_id`,
+        the kind name of each node as the 'kind' attribute, and the
+        attributes of `info_attributes`."""
+
+        import networkx as nx
+
+        graph = nx.DiGraph()
+
+        # first the modules and the edges between them then the
+        # definitions, the same order the interface tree is built in
+        modules = [node for node, _ in self.walk() if self._kinds[node] == MODULE]
+        for node in modules:
+            graph.add_node(self.name(node), kind=KIND_NAMES[MODULE],
+                           **self.info_attributes(node))
+
+        for node in modules:
+            parent = self._parents[node]
+            if parent != NO_NODE:
+                graph.add_edge(self.name(parent), self.name(node))
+
+        # the definitions are added module by module breadth first
+        queue = [self.root]
+        for module in queue:
+
+            for child in self.children(module):
+
+                if self._kinds[child] == MODULE:
+                    queue.append(child)
+                    continue
+
+                for node, _ in self.walk(child):
+                    node_id = self.node_id(node)
+                    graph.add_node(node_id, kind=self.kind_name(node),
+                                   **self.info_attributes(node))
+                    graph.add_edge(self.node_id(self._parents[node]), node_id)
+
+        return graph
+
+    @classmethod
+    def from_networkx(cls, graph):
+        """Convert a NetworkX DiGraph tree, like one made by `to_networkx`
+        or `pymatuning.listings.interface_tree`, to an InterfaceTree.
+
+        If the nodes don't have a 'kind' attribute the kinds are
+        guessed from the node ids. The information about the nodes is
+        taken from the attributes of `info_attributes`.
+
+        """
+
+        tree = cls()
+
+        root = [node for node in graph.nodes() if graph.in_degree(node) == 0][0]
+
+        stack = [(root, NO_NODE)]
+        while stack:
+
+            node_id, parent = stack.pop()
+
+            if 'kind' in graph.nodes[node_id]:
+                kind = KIND_CODES[graph.nodes[node_id]['kind']]
+            elif type(node_id) == str:
+                kind = MODULE
+            elif len(node_id) == 2 and graph.out_degree(node_id) > 0:
+                kind = CLASS
+            elif len(node_id) == 2:
+                kind = FUNCTION
+            else:
+                kind = METHOD
+
+            if kind == MODULE:
+                name = node_id
+            else:
+                name = node_id[-1]
+
+            node = tree.add_node(name, kind, parent, info=_attributes_info(graph.nodes[node_id]))
+
+            for child in reversed(list(graph.successors(node_id))):
+                stack.append((child, node))
+
+        return tree
+
+def _attributes_info(attrs):
+    # the info of a node from the attributes of `info_attributes`
+
+    if 'lineno' not in attrs:
+        return NO_INFO
+
+    flags = HAS_DOCSTRING if attrs.get('docstring') else 0
+    if attrs.get('async'):
+        flags |= IS_ASYNC
+    if attrs.get('returns_annotated'):
+        flags |= RETURNS_ANNOTATED
+
+    return (attrs['lineno'], flags, attrs.get('nargs', -1), attrs.get('n_annotated', -1))
+
+def as_interface_tree(tree):
+    """Get an InterfaceTree for either an InterfaceTree or a NetworkX
+    DiGraph tree."""
+
+    if isinstance(tree, InterfaceTree):
+        return tree
+    else:
+        return InterfaceTree.from_networkx(tree)
@@ -0,0 +1,421 @@
+import sys
+import os
+import os.path as osp
+import time
+import select
+import struct
+
+from pymatuning.listings import (
+    discover_modules,
+    parsed_modules,
+    files_definitions,
+    file_definitions,
+    build_interface_tree,
+    add_module_definitions,
+)
+from pymatuning.sources import module_name
+from pymatuning.tree import MODULE, MODULE_SEPARATOR
+from pymatuning import profiling
+
+# seconds between the snapshots of the stat poller
+DEFAULT_POLL_INTERVAL = 0.5
+
+# seconds to wait for more events after the first one, editors often
+# save a file in several steps
+DEBOUNCE_SECONDS = 0.05
+
+def _package_entries(dirpath):
+    # the names in a package directory that can be modules
+    try:
+        with os.scandir(dirpath) as entries:
+            return frozenset(entry.name for entry in entries
+                             if (entry.is_dir() and '.' not in entry.name) or
+                             module_name(entry.name) is not None)
+    except OSError:
+        return None
+
+def _as_lists(value):
+    # definitions as they come out of the cache, which stores them as
+    # JSON, with lists for all of the tuples
+    if isinstance(value, (list, tuple)):
+        return [_as_lists(item) for item in value]
+    elif isinstance(value, dict):
+        return {key : _as_lists(item) for key, item in value.items()}
+    else:
+        return value
+
+class WatchedTree:
+    """The interface tree of a package found statically on the
+    filesystem, kept in memory and up to date with its source files.
+
+    The definitions of every module are kept as well, so a changed
+    module is parsed again on its own and only its subtree in the tree
+    is replaced. Adding or removing modules discovers the modules
+    again, but still only parses the new and changed ones. The tree is
+    built again from the kept definitions once the replaced subtrees
+    take as much room in it as the rest.
+
+    The keyword arguments are those of
+    `pymatuning.listings.interface_tree`.
+
+    """
+
+    def __init__(self, package, cache=None, jobs=1, executor=None, tree_filter=None,
+                 engine='ast', io_threads=1):
+
+        self.package = package
+        self.cache = cache
+        self.jobs = jobs
+        self.executor = executor
+        self.tree_filter = tree_filter
+        self.engine = engine
+        self.io_threads = io_threads
+
+        self.tree = None
+
+        # the (filepath, message) of the modules that couldn't be
+        # parsed in the last update, they keep their old definitions
+        self.errors = []
+
+        # the definitions of the parsed modules by their file
+        self._definitions = {}
+
+        self.rebuild()
+
+    def _parse(self, filepaths):
+        # parse the files, one at a time if any of them has errors so
+        # the others still get their definitions
+
+        try:
+            return files_definitions(filepaths, cache=self.cache, jobs=self.jobs,
+                                     executor=self.executor, engine=self.engine,
+                                     io_threads=self.io_threads)
+        except (SyntaxError, ValueError, OSError):
+            pass
+
+        definitions = []
+        for filepath in filepaths:
+            try:
+                definitions.append(file_definitions(filepath, cache=self.cache,
+                                                    engine=self.engine))
+            except (SyntaxError, ValueError, OSError) as err:
+                self.errors.append((filepath, str(err)))
+                definitions.append(self._definitions.get(filepath))
+
+        return definitions
+
+    def rebuild(self):
+        """Discover the modules and build the tree again, only the
+        modules whose definitions are not in memory are parsed."""
+
+        mod_records = discover_modules(self.package, tree_filter=self.tree_filter,
+                                       io_threads=self.io_threads)
+        parsed = parsed_modules(mod_records, tree_filter=self.tree_filter)
+
+        filepaths = [mod_filepath for (_, mod_filepath, _), parse in zip(mod_records, parsed)
+                     if parse]
+
+        new_filepaths = [filepath for filepath in filepaths
+                         if filepath not in self._definitions]
+        for filepath, defs in zip(new_filepaths, self._parse(new_filepaths)):
+            self._definitions[filepath] = _as_lists(defs)
+
+        # forget the modules that are gone
+        self._definitions = {filepath : self._definitions[filepath] for filepath in filepaths}
+
+        self._mod_records = mod_records
+        self._parsed = parsed
+        self._build()
+
+        self._root_depth = mod_records[0][0].count(MODULE_SEPARATOR)
+
+        # what the package directories had in them
+        self._package_dirs = {osp.dirname(mod_filepath) : None
+                              for _, mod_filepath, ispkg in mod_records
+                              if ispkg and mod_filepath is not None}
+        for dirpath in self._package_dirs:
+            self._package_dirs[dirpath] = _package_entries(dirpath)
+
+    def _build(self):
+        # build the tree from the kept definitions
+
+        self.tree = build_interface_tree(
+            self._mod_records,
+            [self._definitions[mod_filepath] if parse else None
+             for (_, mod_filepath, _), parse in zip(self._mod_records, self._parsed)],
+            tree_filter=self.tree_filter)
+
+        # the module nodes come first in the tree, so their ids are the
+        # indices of the records and stay the same in every build
+        self._module_nodes = {mod_filepath : node for node, ((_, mod_filepath, _), parse)
+                              in enumerate(zip(self._mod_records, self._parsed)) if parse}
+
+        self._built_size = len(self.tree)
+
+    def watched_paths(self):
+        """The paths of the parsed module files and of the package
+        directories, changes to anything else don't matter."""
+        return list(self._module_nodes) + list(self._package_dirs)
+
+    def _replace_definitions(self, node, defs):
+
+        tree = self.tree
+
+        for child in tree.children(node):
+            if tree.kind(child) != MODULE:
+                tree.detach_children(node, child)
+                break
+
+        add_module_definitions(
+            tree, node, defs, tree_filter=self.tree_filter,
+            depth=tree.name(node).count(MODULE_SEPARATOR) - self._root_depth)
+
+    def update(self, changed_paths):
+        """Bring the tree up to date with the paths of changed files and
+        directories, e.g. from a watcher. Returns whether the tree
+        changed."""
+
+        with profiling.phase('update'):
+
+            self.errors = []
+
+            modified = []
+            dirpaths = set()
+            for path in changed_paths:
+
+                if path in self._module_nodes and osp.isfile(path):
+                    modified.append(path)
+                elif path in self._package_dirs:
+                    dirpaths.add(path)
+                else:
+                    dirpaths.add(osp.dirname(path))
+
+            # only a different set of modules in a package directory
+            # changes the structure, not e.g. an editor's swap files
+            structural = any(_package_entries(dirpath) != self._package_dirs[dirpath]
+                             for dirpath in dirpaths if dirpath in self._package_dirs)
+
+            if structural:
+
+                for filepath in modified:
+                    del self._definitions[filepath]
+
+                self.rebuild()
+                return True
+
+            changed = False
+            for filepath, defs in zip(modified, self._parse(modified)):
+
+                if defs is None:
+                    continue
+
+                # the kept definitions may have come from the cache
+                defs = _as_lists(defs)
+                if defs == self._definitions[filepath]:
+                    continue
+
+                self._definitions[filepath] = defs
+                self._replace_definitions(self._module_nodes[filepath], defs)
+                changed = True
+
+            # the replaced definitions stay in the arrays of the tree
+            if len(self.tree) > 2 * self._built_size:
+                self._build()
+
+            return changed
+
+def _stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+class StatPoller:
+    """Waits for changes to the watched paths by comparing snapshots of
+    their stat every `interval` seconds. This works everywhere,
+    including on network filesystems."""
+
+    def __init__(self, interval=DEFAULT_POLL_INTERVAL):
+
+        self.interval = interval
+        self._snapshot = {}
+
+    def set_paths(self, paths):
+        """Watch these paths, the ones already watched keep their
+        snapshot."""
+
+        snapshot = self._snapshot
+        self._snapshot = {path : snapshot[path] if path in snapshot else _stat_key(path)
+                          for path in paths}
+
+    def wait(self):
+        """Block until any of the paths changed and return the set of
+        them."""
+
+        while True:
+
+            time.sleep(self.interval)
+
+            changed = set()
+            for path, key in self._snapshot.items():
+                new_key = _stat_key(path)
+                if new_key != key:
+                    self._snapshot[path] = new_key
+                    changed.add(path)
+
+            if len(changed) > 0:
+                return changed
+
+    def close(self):
+        pass
+
+# from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_FROM = 0x40
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+                IN_DELETE_SELF)
+
+# struct inotify_event without the name that follows it
+_EVENT_STRUCT = struct.Struct('iIII')
+
+def _inotify_libc():
+    # the C library if it has inotify, which is only on linux
+
+    if not sys.platform.startswith('linux'):
+        return None
+
+    # ctypes is slow to import so only when watching
+    import ctypes
+    import ctypes.util
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    except OSError:
+        return None
+
+    if not hasattr(libc, 'inotify_init1'):
+        return None
+
+    return libc
+
+class InotifyWatcher:
+    """Waits for changes in the directories of the watched paths with
+    inotify, so changes are seen right away without any polling. Only
+    on linux, and it doesn't see changes made on other machines to
+    network filesystems."""
+
+    def __init__(self, libc):
+
+        import ctypes
+
+        self._libc = libc
+
+        self._fd = libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        # the watch descriptors of the directories and back
+        self._watches = {}
+        self._dirpaths = {}
+
+    def set_paths(self, paths):
+        """Watch the directories of these paths, and the paths
+        themselves if they are directories."""
+
+        dirpaths = {path if osp.isdir(path) else osp.dirname(path) for path in paths}
+
+        for dirpath in set(self._watches) - dirpaths:
+            self._libc.inotify_rm_watch(self._fd, self._watches.pop(dirpath))
+
+        for dirpath in dirpaths - set(self._watches):
+
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), INOTIFY_MASK)
+            if wd < 0:
+                import ctypes
+                errno = ctypes.get_errno()
+                raise OSError(errno, os.strerror(errno), dirpath)
+
+            self._watches[dirpath] = wd
+            self._dirpaths[wd] = dirpath
+
+    def _read_events(self, changed):
+
+        data = os.read(self._fd, 64 * 1024)
+
+        offset = 0
+        while offset < len(data):
+
+            wd, mask, _, name_len = _EVENT_STRUCT.unpack_from(data, offset)
+            offset += _EVENT_STRUCT.size
+
+            name = data[offset:offset + name_len].rstrip(b'\0')
+            offset += name_len
+
+            # events were lost so anything could have changed
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self._watches)
+                continue
+
+            dirpath = self._dirpaths.get(wd)
+            if dirpath is None:
+                continue
+
+            if name:
+                changed.add(osp.join(dirpath, os.fsdecode(name)))
+            else:
+                changed.add(dirpath)
+
+    def wait(self):
+        """Block until anything changed in the watched directories and
+        return the set of the changed paths."""
+
+        changed = set()
+
+        select.select([self._fd], [], [])
+        self._read_events(changed)
+
+        # take the rest of the events of the same save too
+        while select.select([self._fd], [], [], DEBOUNCE_SECONDS)[0]:
+            self._read_events(changed)
+
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+def make_watcher(poll=False, interval=DEFAULT_POLL_INTERVAL):
+    """An inotify watcher where there is inotify, otherwise or if
+    `poll` is True a stat poller."""
+
+    libc = None if poll else _inotify_libc()
+
+    if libc is None:
+        return StatPoller(interval=interval)
+    else:
+        return InotifyWatcher(libc)
+
+def write_file(filepath, write):
+    """Write a file with `write(stream)` to a temporary file that then
+    replaces it, so that readers never see it half written."""
+
+    import tempfile
+
+    fd, tmp_path = tempfile.mkstemp(dir=osp.dirname(osp.abspath(filepath)),
+                                    prefix='.' + osp.basename(filepath), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w') as wf:
+            write(wf)
+        os.replace(tmp_path, filepath)
+    finally:
+        if osp.exists(tmp_path):
+            os.remove(tmp_path)
@@ -0,0 +1,44 @@
+import os
+import os.path as osp
+import textwrap
+
+import pytest
+
+def write_files(root, files):
+    """Write a dictionary of relative paths to sources under a
+    directory, dedenting the sources."""
+
+    for relpath, source in files.items():
+        path = osp.join(str(root), relpath)
+        os.makedirs(osp.dirname(path), exist_ok=True)
+        with open(path, 'w') as wf:
+            wf.write(textwrap.dedent(source))
+
+@pytest.fixture
+def make_package(tmp_path):
+    """Make a package from a dictionary of paths in it to sources and
+    return the path to its directory."""
+
+    def make(name, files, root=None):
+        root = tmp_path if root is None else tmp_path / root
+        write_files(root / name, files)
+        return str(root / name)
+
+    return make
+
+def pytest_addoption(parser):
+    parser.addoption('--run-slow', action='store_true',
+                     help="Run the tests marked slow, like the startup budget.")
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "slow: timing checks, only run with --run-slow")
+
+def pytest_collection_modifyitems(config, items):
+
+    if config.getoption('--run-slow'):
+        return
+
+    skip_slow = pytest.mark.skip(reason="needs --run-slow")
+    for item in items:
+        if 'slow' in item.keywords:
+            item.add_marker(skip_slow)
@@ -0,0 +1,68 @@
+from click.testing import CliRunner
+
+from pymatuning.cli import cli
+
+PACKAGES = {
+    'pka' : {'__init__.py' : "X = 1\n", 'mod.py' : "def f():\n    pass\n"},
+    'pkb' : {'__init__.py' : "", 'sub/__init__.py' : "class K:\n    y = 2\n"},
+}
+
+def _invoke(*args):
+    result = CliRunner().invoke(cli, list(args))
+    assert result.exit_code == 0, result.output
+    return result.output
+
+def _separate_runs(command, site, names, *options):
+    return {name : _invoke(command, '--no-cache', *options, str(site / name))
+            for name in names}
+
+def test_batch_matches_separate_runs(make_package, tmp_path):
+
+    for name, files in PACKAGES.items():
+        make_package(name, files, root='site')
+    site = tmp_path / 'site'
+    (site / 'single.py').write_text("def g():\n    pass\n")
+
+    expected = _separate_runs('orgmode', site, ['pka', 'pkb', 'single.py'])
+    assert "- K" in expected['pkb']
+
+    # a directory that is not a package stands for everything in it,
+    # with several jobs sharing the one worker pool
+    for jobs in ('1', '2'):
+
+        output_dir = tmp_path / 'out{}'.format(jobs)
+        _invoke('orgmode', '--no-cache', '-j', jobs, '--output-dir', str(output_dir), str(site))
+
+        assert sorted(path.name for path in output_dir.iterdir()) == \
+            ['pka.org', 'pkb.org', 'single.org']
+        for name, output in expected.items():
+            assert (output_dir / (name.split('.')[0] + '.org')).read_text() == output
+
+def test_batch_from_module_list(make_package, tmp_path, monkeypatch):
+
+    for name, files in PACKAGES.items():
+        make_package(name, files, root='site')
+    site = tmp_path / 'site'
+    monkeypatch.syspath_prepend(str(site))
+
+    expected = _separate_runs('json', site, ['pka', 'pkb'], '--format', 'ndjson')
+
+    # a requirements file, with the distribution names
+    module_list = tmp_path / 'requirements.txt'
+    module_list.write_text("# packages\npka>=1.0\n-e ./somewhere\n\npkb  # the other one\n")
+
+    output_dir = tmp_path / 'out'
+    _invoke('json', '--no-cache', '--format', 'ndjson', '-r', str(module_list),
+            '--output-dir', str(output_dir))
+
+    for name, output in expected.items():
+        assert (output_dir / (name + '.ndjson')).read_text() == output
+
+def test_many_packages_need_output_dir(make_package):
+
+    packages = [make_package(name, files) for name, files in PACKAGES.items()]
+
+    result = CliRunner().invoke(cli, ['orgmode', '--no-cache'] + packages)
+
+    assert result.exit_code == 2
+    assert "--output-dir" in result.output
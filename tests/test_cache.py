@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+from pymatuning.cache import DefinitionCache
+from pymatuning.listings import file_definitions
+
+def _age(path, seconds=60):
+    # move the modification time back so the entry is not racy
+    mtime = time.time() - seconds
+    os.utime(path, (mtime, mtime))
+
+@pytest.fixture
+def module(tmp_path):
+
+    path = tmp_path / 'mod.py'
+    path.write_text("def f():\n    pass\n")
+    _age(path)
+
+    return str(path)
+
+def test_hit_on_same_stat(module, tmp_path):
+
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    defs = file_definitions(module, cache=cache)
+
+    # a new cache only has what is on disk
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    cached, source = cache.lookup(module)
+
+    assert cached == defs
+    # the file was not read
+    assert source is None
+
+def test_touched_file_hits_on_hash(module, tmp_path):
+
+    file_definitions(module, cache=DefinitionCache(str(tmp_path / 'cache')))
+    _age(module, seconds=30)
+
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    cached, source = cache.lookup(module)
+
+    assert cached['functions'] == ['f']
+    # the file had to be read to compare the hash
+    assert source is not None
+
+    # and the new stat was stored
+    assert DefinitionCache(str(tmp_path / 'cache')).lookup(module)[1] is None
+
+@pytest.mark.parametrize('new_source', [
+    # same size
+    "def g():\n    pass\n",
+    "def f():\n    pass\n\ndef g():\n    pass\n",
+])
+def test_changed_file_misses(module, tmp_path, new_source):
+
+    file_definitions(module, cache=DefinitionCache(str(tmp_path / 'cache')))
+
+    with open(module, 'w') as wf:
+        wf.write(new_source)
+    _age(module, seconds=30)
+
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    assert cache.lookup(module)[0] is None
+
+    assert 'g' in file_definitions(module, cache=cache)['functions']
+
+def test_changed_size_misses_with_same_mtime(module, tmp_path):
+
+    file_definitions(module, cache=DefinitionCache(str(tmp_path / 'cache')))
+    st = os.stat(module)
+
+    with open(module, 'a') as wf:
+        wf.write("def g():\n    pass\n")
+    os.utime(module, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    assert DefinitionCache(str(tmp_path / 'cache')).lookup(module)[0] is None
+
+def test_racy_entry_checks_hash(tmp_path):
+
+    # a file modified just before its entry was written could change
+    # again within the same mtime
+    path = tmp_path / 'mod.py'
+    path.write_text("def f():\n    pass\n")
+    file_definitions(str(path), cache=DefinitionCache(str(tmp_path / 'cache')))
+
+    st = os.stat(str(path))
+    path.write_text("def g():\n    pass\n")
+    os.utime(str(path), ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    assert cache.lookup(str(path))[0] is None
@@ -0,0 +1,15 @@
+from click.testing import CliRunner
+
+from pymatuning.cli import cli
+
+def test_batch_skips_missing_address(make_package, tmp_path):
+
+    package = make_package('pk', {'__init__.py' : "class Thing:\n    def method(self):\n        pass\n"})
+    output_dir = tmp_path / 'out'
+
+    result = CliRunner().invoke(cli, ['orgmode', '--no-cache', '--output-dir', str(output_dir),
+                                      package + ':Nope', package + ':Thing'])
+
+    assert result.exit_code == 1
+    assert "Skipping {}:Nope".format(package) in result.output
+    assert (output_dir / 'pk.Thing.org').read_text() == "- pk\n  - Thing\n    - method\n"
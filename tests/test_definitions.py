@@ -0,0 +1,74 @@
+import ast
+import textwrap
+
+from pymatuning import listings
+from pymatuning.listings import (
+    list_classdefs,
+    list_classes,
+    list_functions,
+    list_variables,
+    list_methods,
+    list_classmethods,
+    list_staticmethods,
+    list_properties,
+    list_getters,
+    list_setters,
+)
+
+SOURCE = textwrap.dedent("""
+    class Thing:
+        attr = 1
+
+        def method(self):
+            pass
+
+        @classmethod
+        def make(cls):
+            pass
+
+        @staticmethod
+        def helper():
+            pass
+
+        @property
+        def value(self):
+            pass
+
+        @value.setter
+        def value(self, value):
+            pass
+
+    def function():
+        pass
+
+    VARIABLE = 1
+    """)
+
+def test_list_functions_walk_once(monkeypatch):
+
+    n_visitors = []
+
+    class CountingVisitor(listings.DefinitionVisitor):
+        def __init__(self, *args, **kwargs):
+            n_visitors.append(None)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(listings, 'DefinitionVisitor', CountingVisitor)
+
+    st = ast.parse(SOURCE)
+    classdef, = list_classdefs(st)
+
+    assert list_functions(st) == ['function']
+    assert list_classes(st) == ['Thing']
+    assert list_variables(st) == ['VARIABLE']
+    assert len(n_visitors) == 1
+
+    assert list_variables(classdef) == ['attr']
+    # setters are listed as methods as well, like they always were
+    assert list_methods(classdef) == ['method', 'value']
+    assert list_classmethods(classdef) == ['make']
+    assert list_staticmethods(classdef) == ['helper']
+    assert list_properties(classdef) == ['value']
+    assert list_getters(classdef) == []
+    assert list_setters(classdef) == ['value']
+    assert len(n_visitors) == 2
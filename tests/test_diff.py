@@ -0,0 +1,114 @@
+from pymatuning.listings import interface_tree, diff_interface_trees
+from pymatuning.tree import InterfaceTree
+
+def test_diff_module_and_definition_with_the_same_name(make_package):
+
+    # the submodule pk.foo and the function foo in pk/__init__.py
+    old = make_package('pk', {'__init__.py' : """
+                                  def foo():
+                                      pass
+
+                                  def bar():
+                                      pass
+                                  """,
+                              'foo.py' : "x = 1\n"},
+                       root='old')
+
+    new = make_package('pk', {'__init__.py' : """
+                                  def foo():
+                                      pass
+
+                                  def baz():
+                                      pass
+                                  """,
+                              'foo.py' : "x = 1\n"},
+                       root='new')
+
+    differences = diff_interface_trees(interface_tree(old, compact=True),
+                                       interface_tree(new, compact=True))
+
+    assert differences == {'added' : [('pk.baz', 'function')],
+                           'removed' : [('pk.bar', 'function')],
+                           'moved' : []}
+
+def test_diff_changed_kind(make_package):
+
+    old = make_package('pk', {'__init__.py' : "def thing():\n    pass\n"}, root='old')
+    new = make_package('pk', {'__init__.py' : "class thing:\n    pass\n"}, root='new')
+
+    differences = diff_interface_trees(interface_tree(old, compact=True),
+                                       interface_tree(new, compact=True))
+
+    assert differences['added'] == [('pk.thing', 'class')]
+    assert differences['removed'] == [('pk.thing', 'function')]
+
+def test_diff_moved_subtree(make_package):
+
+    old = make_package('pk', {'__init__.py' : "",
+                              'a.py' : "class Thing:\n    def method(self):\n        pass\n",
+                              'b.py' : "def f():\n    pass\n"},
+                       root='old')
+    new = make_package('pk', {'__init__.py' : "",
+                              'a.py' : "",
+                              'b.py' : "def f():\n    pass\n\n"
+                                       "class Thing:\n    def method(self):\n        pass\n"},
+                       root='new')
+
+    differences = diff_interface_trees(interface_tree(old, compact=True),
+                                       interface_tree(new, compact=True))
+
+    assert differences == {'added' : [],
+                           'removed' : [],
+                           'moved' : [('pk.a.Thing', 'pk.b.Thing', 'class')]}
+
+    # a changed subtree is not moved
+    new = make_package('pk', {'__init__.py' : "",
+                              'a.py' : "",
+                              'b.py' : "class Thing:\n    def other(self):\n        pass\n"},
+                       root='changed')
+
+    differences = diff_interface_trees(interface_tree(old, compact=True),
+                                       interface_tree(new, compact=True))
+
+    assert differences == {'added' : [('pk.b.Thing', 'class')],
+                           'removed' : [('pk.a.Thing', 'class'), ('pk.b.f', 'function')],
+                           'moved' : []}
+
+class _CountingTree(InterfaceTree):
+    # counts how often the children of each node are asked for
+
+    def children(self, node):
+        self.counts[node] = self.counts.get(node, 0) + 1
+        return super().children(node)
+
+def _counting_tree(package):
+
+    i_tree = interface_tree(package, compact=True)
+    i_tree.__class__ = _CountingTree
+    i_tree.counts = {}
+
+    return i_tree
+
+def test_diff_skips_equal_subtrees(make_package):
+
+    files = {'__init__.py' : "",
+             'same.py' : "class Same:\n    def method(self):\n        pass\n",
+             'changed.py' : "def f():\n    pass\n"}
+    old = _counting_tree(make_package('pk', files, root='old'))
+
+    files['changed.py'] = "def g():\n    pass\n"
+    new = _counting_tree(make_package('pk', files, root='new'))
+
+    assert diff_interface_trees(old, new)['added'] == [('pk.changed.g', 'function')]
+
+    # the hashes look at every node once, the comparison only at the
+    # ones on the way to the change
+    for i_tree in (old, new):
+
+        counts = dict(i_tree.counts)
+        nodes = {i_tree.fqname(node) : node for node in range(len(i_tree))}
+
+        assert counts[nodes['pk']] == 2
+        assert counts[nodes['pk.changed']] == 2
+        assert counts[nodes['pk.same']] == 1
+        assert counts[nodes['pk.same.Same']] == 1
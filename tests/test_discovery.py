@@ -0,0 +1,70 @@
+import sys
+from importlib import import_module
+
+import pytest
+
+from pymatuning.listings import discover_modules, interface_tree
+from pymatuning.renderers.orgmode import listing
+
+PACKAGE_FILES = {
+    '__init__.py' : "from .mod import f\n",
+    'mod.py' : "def f():\n    pass\n",
+    'sub/__init__.py' : "X = 1\n",
+    'sub/deep.py' : "class Deep:\n    def method(self):\n        pass\n",
+    'sub/_private.py' : "Y = 2\n",
+    'data/notes.txt' : "not a module\n",
+}
+
+@pytest.fixture
+def importable(tmp_path, monkeypatch):
+    """Put the temporary directory on sys.path and forget the modules
+    imported from it afterwards."""
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    modnames = set(sys.modules)
+
+    yield
+
+    for modname in set(sys.modules) - modnames:
+        del sys.modules[modname]
+
+def _records(mod_records):
+    return [(mod_fqname, ispkg) for mod_fqname, _, ispkg in mod_records]
+
+@pytest.mark.parametrize('modname, files', [
+    ('discpkg', PACKAGE_FILES),
+    # namespace packages have no __init__.py and no file
+    ('discnspkg', {relpath : source for relpath, source in PACKAGE_FILES.items()
+                   if relpath != '__init__.py'}),
+])
+def test_static_matches_import(make_package, importable, modname, files):
+
+    make_package(modname, files)
+
+    static_records = discover_modules(modname)
+    static_listing = listing(interface_tree(modname))
+
+    imported_records = discover_modules(import_module(modname))
+    imported_listing = listing(interface_tree(import_module(modname)))
+
+    assert _records(static_records) == _records(imported_records)
+    assert [filepath for _, filepath, _ in static_records] == \
+        [filepath for _, filepath, _ in imported_records]
+    assert static_listing == imported_listing
+    assert "Deep" in static_listing
+
+def test_namespace_package_has_no_file(make_package, importable):
+
+    make_package('discns', {'mod.py' : "def f():\n    pass\n"})
+
+    assert _records(discover_modules('discns')) == [('discns', True), ('discns.mod', False)]
+    assert discover_modules('discns')[0][1] is None
+    assert listing(interface_tree('discns')) == "- discns\n  - mod\n    - f"
+
+def test_frozen_module_is_found_statically():
+
+    # `os` is frozen in the interpreter but has a source file
+    static_listing = listing(interface_tree('os'))
+
+    assert static_listing == listing(interface_tree(import_module('os')))
+    assert "makedirs" in static_listing
@@ -0,0 +1,93 @@
+import pytest
+
+from pymatuning.filters import TreeFilter, is_private
+from pymatuning.listings import discover_modules, interface_tree
+from pymatuning.renderers.orgmode import listing
+from pymatuning.tree import FUNCTION, VARIABLE
+
+PACKAGE_FILES = {
+    '__init__.py' : "",
+    'a/__init__.py' : "",
+    'a/sub/__init__.py' : "def in_a_sub():\n    pass\n",
+    'a/other.py' : "",
+    'sub/__init__.py' : "def in_sub():\n    pass\n",
+    'b/__init__.py' : "",
+    'b/c/__init__.py' : "",
+    'b/c/sub.py' : "X = 1\n",
+    '_private.py' : "",
+}
+
+MODNAMES = ['pk', 'pk.a', 'pk.a.other', 'pk.a.sub', 'pk.b', 'pk.b.c', 'pk.b.c.sub', 'pk._private',
+            'pk.sub']
+
+def _modnames(package, tree_filter):
+    return sorted(mod_fqname for mod_fqname, _, _
+                  in discover_modules(package, tree_filter=tree_filter))
+
+@pytest.mark.parametrize('include', [
+    ['*.sub'], ['pk.*.sub'], ['pk.a*'], ['pk.?.sub'], ['pk.[ab].c'], ['pk.b.c*'], ['pk.sub'],
+    ['*'], ['nothing.*'],
+])
+def test_walk_agrees_with_is_included(make_package, include):
+
+    package = make_package('pk', PACKAGE_FILES)
+    tree_filter = TreeFilter(include=include)
+
+    # every included module is reached, whatever the wildcards match
+    included = [modname for modname in MODNAMES if tree_filter.is_included(modname)]
+    assert set(included) <= set(_modnames(package, tree_filter))
+
+def test_star_matches_dots(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    tree_filter = TreeFilter(include=['*.sub'])
+
+    # the subpackages at every depth are found, the other modules are
+    # only there for the structure
+    i_tree = interface_tree(package, tree_filter=tree_filter, compact=True)
+    assert [i_tree.label(node) for node, _ in i_tree.walk()
+            if not i_tree.is_module(node)] == ['in_a_sub', 'X', 'in_sub']
+
+def test_walk_prunes_what_cannot_match():
+
+    tree_filter = TreeFilter(include=['pk.a*.sub'])
+
+    assert tree_filter.walk_module('pk.ab', 1, False)
+    assert not tree_filter.walk_module('pk.b', 1, False)
+
+    tree_filter = TreeFilter(include=['pk.a.sub'])
+
+    assert tree_filter.walk_module('pk.a', 1, False)
+    assert not tree_filter.walk_module('pk.b', 1, False)
+
+def test_included_modules_have_definitions(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    tree_filter = TreeFilter(include=['pk.a.*'])
+
+    # supermodules are only in the tree for its structure
+    assert listing(interface_tree(package, tree_filter=tree_filter)) == \
+        "- pk\n  - a\n    - other\n    - sub\n      - in_a_sub"
+
+def test_exclude_depth_and_private(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    assert _modnames(package, TreeFilter(exclude=['pk.b'])) == [
+        'pk', 'pk._private', 'pk.a', 'pk.a.other', 'pk.a.sub', 'pk.sub']
+
+    assert _modnames(package, TreeFilter(max_depth=1)) == [
+        'pk', 'pk._private', 'pk.a', 'pk.b', 'pk.sub']
+
+    assert _modnames(package, TreeFilter(public_only=True)) == [
+        'pk', 'pk.a', 'pk.a.other', 'pk.a.sub', 'pk.b', 'pk.b.c', 'pk.b.c.sub', 'pk.sub']
+
+def test_keep_definition():
+
+    tree_filter = TreeFilter(public_only=True, exclude_kinds=[VARIABLE])
+
+    assert not tree_filter.keep_definition('pk.X', 'X', VARIABLE, 1)
+    assert not tree_filter.keep_definition('pk.hidden', 'hidden', FUNCTION, 1, all_names=['shown'])
+    assert tree_filter.keep_definition('pk.shown', 'shown', FUNCTION, 1, all_names=['shown'])
+
+    assert is_private('_name') and not is_private('__init__')
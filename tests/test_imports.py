@@ -0,0 +1,38 @@
+from pymatuning.imports import ImportGraph, package_imports
+
+def test_costs_count_enclosing_packages(make_package):
+
+    package = make_package('pk', {
+        '__init__.py' : "",
+        'a.py' : "from pk.sub import deep\n",
+        'sub/__init__.py' : "from . import deep\n",
+        'sub/deep.py' : "X = 1\n",
+    })
+
+    mod_records, graph = package_imports(package)
+
+    assert graph.imports('pk.a') == ['pk.sub', 'pk.sub.deep']
+
+    # importing pk.sub.deep runs pk and pk.sub first
+    costs = graph.transitive_costs()
+    assert costs[graph.module_id('pk.sub.deep')] == (3, 0)
+    assert costs[graph.module_id('pk.a')] == (4, 0)
+    assert costs[graph.module_id('pk')] == (1, 0)
+
+    # pk.sub imports pk.sub.deep which is in it, but that is not a cycle
+    assert graph.cycles() == []
+
+def test_cycles_and_order():
+
+    graph = ImportGraph(['pk', 'pk.a', 'pk.b', 'pk.c'])
+    graph.add_import('pk.a', 'pk.b')
+    graph.add_import('pk.b', 'pk.a')
+    graph.add_import('pk.c', 'pk.a')
+
+    assert graph.cycles() == [['pk.a', 'pk.b']]
+
+    order = graph.topological_order()
+    assert order.index('pk.a') < order.index('pk.c')
+
+    assert graph.transitive_costs([1, 10, 100, 1000]) == [
+        (1, 1), (3, 111), (3, 111), (4, 1111)]
@@ -0,0 +1,27 @@
+import os
+
+from pymatuning.index import DefinitionIndex
+
+def _names(index, name):
+    return [fqname for fqname, _, _ in index.find(name)]
+
+def test_refresh_racy_module(make_package, tmp_path):
+
+    package = make_package('pk', {'__init__.py' : "", 'mod.py' : "def f():\n    pass\n"})
+    mod_path = os.path.join(package, 'mod.py')
+
+    index = DefinitionIndex(str(tmp_path / 'index.db'))
+    index.add_package(package)
+    assert _names(index, 'f') == ['pk.mod.f']
+
+    # a change right after indexing with the same size and mtime is
+    # still found, like in the definition cache
+    st = os.stat(mod_path)
+    with open(mod_path, 'w') as wf:
+        wf.write("def g():\n    pass\n")
+    os.utime(mod_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+
+    # both files were just written, so both are parsed again
+    assert index.refresh() == 2
+    assert _names(index, 'f') == []
+    assert _names(index, 'g') == ['pk.mod.g']
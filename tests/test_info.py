@@ -0,0 +1,105 @@
+import pytest
+
+from pymatuning.cache import DefinitionCache
+from pymatuning.listings import interface_tree
+from pymatuning.tree import HAS_DOCSTRING, IS_ASYNC, RETURNS_ANNOTATED
+
+PACKAGE_FILES = {
+    '__init__.py' : '"""The package."""\n',
+    'mod.py' : """\
+        import functools
+
+        X = 1
+
+        def plain():
+            pass
+
+        @functools.lru_cache()
+        def decorated(a, /, b: int, *args: str, c=1, d: float, **kwargs) -> int:
+            \"\"\"A docstring.\"\"\"
+            return a
+
+        async def fetch(url):
+            return url
+
+        class K:
+            \"\"\"A class.\"\"\"
+
+            attr = 1
+
+            def method(self, x: int):
+                pass
+
+            @staticmethod
+            async def static() -> None:
+                pass
+
+            @property
+            def value(self):
+                \"\"\"The value.\"\"\"
+                return 1
+
+            @value.setter
+            def value(self, value):
+                pass
+        """,
+}
+
+# the (line, flags, number of arguments, number of annotated
+# arguments) of every node
+EXPECTED_INFO = {
+    'pk' : (1, HAS_DOCSTRING, -1, -1),
+    'pk.mod' : (1, 0, -1, -1),
+    'pk.mod.X' : (0, 0, -1, -1),
+    'pk.mod.plain' : (5, 0, 0, 0),
+    'pk.mod.decorated' : (9, HAS_DOCSTRING | RETURNS_ANNOTATED, 6, 3),
+    'pk.mod.fetch' : (13, IS_ASYNC, 1, 0),
+    'pk.mod.K' : (16, HAS_DOCSTRING, -1, -1),
+    'pk.mod.K.attr' : (0, 0, -1, -1),
+    'pk.mod.K.method' : (21, 0, 2, 1),
+    'pk.mod.K.static' : (25, IS_ASYNC | RETURNS_ANNOTATED, 0, 0),
+    # the getter of a property
+    'pk.mod.K.value' : (29, HAS_DOCSTRING, 1, 0),
+}
+
+def _infos(i_tree):
+    return {i_tree.fqname(node) : i_tree.info(node) for node, _ in i_tree.walk()}
+
+@pytest.mark.parametrize('engine', ['ast', 'scan'])
+def test_info_columns(make_package, engine):
+
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True, engine=engine)
+
+    assert _infos(i_tree) == EXPECTED_INFO
+
+def test_info_accessors(make_package):
+
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+    nodes = {i_tree.fqname(node) : node for node, _ in i_tree.walk()}
+
+    decorated = nodes['pk.mod.decorated']
+    assert i_tree.lineno(decorated) == 9
+    assert i_tree.has_docstring(decorated)
+    assert i_tree.returns_annotated(decorated)
+    assert not i_tree.is_async(decorated)
+    assert (i_tree.nargs(decorated), i_tree.n_annotated(decorated)) == (6, 3)
+
+    # nothing is known about variables, and classes have no arguments
+    variable = nodes['pk.mod.X']
+    assert (i_tree.lineno(variable), i_tree.nargs(variable)) == (None, None)
+    assert i_tree.info_attributes(variable) == {}
+    assert i_tree.info_attributes(nodes['pk.mod.K']) == {'lineno' : 16, 'docstring' : True}
+
+    assert i_tree.info_attributes(nodes['pk.mod.fetch']) == {
+        'lineno' : 13, 'docstring' : False, 'nargs' : 1, 'n_annotated' : 0,
+        'returns_annotated' : False, 'async' : True}
+
+def test_info_from_cache(make_package, tmp_path):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    interface_tree(package, cache=DefinitionCache(str(tmp_path / 'cache')))
+
+    # the info is the same when the definitions are read back
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    assert _infos(interface_tree(package, cache=cache, compact=True)) == EXPECTED_INFO
@@ -0,0 +1,60 @@
+import os.path as osp
+
+from click.testing import CliRunner
+
+from pymatuning.cache import DefinitionCache
+from pymatuning.cli import cli
+from pymatuning.listings import discover_modules, files_definitions, interface_tree
+from pymatuning.renderers.orgmode import listing
+
+# enough modules for the workers to get more than one chunk each
+PACKAGE_FILES = dict(
+    {'__init__.py' : "from .mod0 import f0\n",
+     'sub/__init__.py' : "X = 1\n",
+     'sub/deep.py' : "class Deep:\n    def method(self):\n        pass\n"},
+    **{'mod{}.py'.format(i) : "def f{0}():\n    pass\n\nclass K{0}:\n    y = {0}\n".format(i)
+       for i in range(12)})
+
+def test_files_definitions_match_serial(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    filepaths = [filepath for _, filepath, _ in discover_modules(package)]
+
+    serial = files_definitions(filepaths)
+    parallel = files_definitions(filepaths, jobs=2)
+
+    # in the same order as the files
+    assert parallel == serial
+    assert serial[filepaths.index(osp.join(package, 'mod3.py'))]['functions'] == ['f3']
+
+def test_partly_cached_match_serial(make_package, tmp_path):
+
+    package = make_package('pk', PACKAGE_FILES)
+    filepaths = [filepath for _, filepath, _ in discover_modules(package)]
+
+    # only every other file is in the cache, the rest go to the workers
+    cache = DefinitionCache(str(tmp_path / 'cache'))
+    files_definitions(filepaths[::2], cache=cache)
+
+    assert files_definitions(filepaths, cache=cache, jobs=2) == files_definitions(filepaths)
+
+def test_interface_tree_matches_serial(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    serial = listing(interface_tree(package, compact=True))
+
+    assert listing(interface_tree(package, jobs=2, compact=True)) == serial
+    assert "method" in serial
+
+def test_cli_jobs_match_serial(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    outputs = []
+    for jobs in ('1', '2'):
+        result = CliRunner().invoke(cli, ['orgmode', '--no-cache', '-j', jobs, package])
+        assert result.exit_code == 0, result.output
+        outputs.append(result.output)
+
+    assert outputs[0] == outputs[1]
@@ -0,0 +1,91 @@
+import io
+import json
+
+from click.testing import CliRunner
+
+from pymatuning.cli import cli
+from pymatuning.listings import interface_tree
+from pymatuning.renderers.json import write_json, write_ndjson, iter_json, iter_ndjson
+from pymatuning.tree import InterfaceTree, MODULE
+
+PACKAGE_FILES = {
+    '__init__.py' : "X = 1\n",
+    'mod.py' : """\
+        def café(a, b: int) -> int:
+            \"\"\"A docstring.\"\"\"
+            return a
+
+        class K:
+            async def method(self):
+                pass
+        """,
+    'sub/__init__.py' : "",
+    'sub/deep.py' : "Y = 2\n",
+}
+
+def _written(write, tree):
+    stream = io.StringIO()
+    write(tree, stream)
+    return stream.getvalue()
+
+def _flatten(obj, parent=None, depth=0):
+    # the nested objects as the records of the NDJSON listing
+    record = {key : value for key, value in obj.items() if key != 'children'}
+    record.update(parent=parent, depth=depth)
+    yield record
+
+    for child in obj['children']:
+        yield from _flatten(child, obj['fqname'], depth + 1)
+
+def test_json_matches_tree(make_package):
+
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+
+    document = json.loads(_written(write_json, i_tree))
+    records = [json.loads(line) for line in _written(write_ndjson, i_tree).splitlines()]
+
+    # a record per node in the order of the tree
+    assert [(record['fqname'], record['kind'], record['depth']) for record in records] == \
+        [(i_tree.fqname(node), i_tree.kind_name(node), depth) for node, depth in i_tree.walk()]
+
+    # and the nested document has the same nodes and fields
+    assert list(_flatten(document)) == records
+
+    assert records[2] == {
+        'fqname' : 'pk.mod.café', 'name' : 'café', 'kind' : 'function',
+        'parent' : 'pk.mod', 'depth' : 2, 'lineno' : 1, 'docstring' : True,
+        'nargs' : 2, 'n_annotated' : 1, 'returns_annotated' : True, 'async' : False,
+    }
+    assert records[-1] == {'fqname' : 'pk.X', 'name' : 'X', 'kind' : 'variable',
+                           'parent' : 'pk', 'depth' : 1}
+
+def test_streamed_pieces_match_written(make_package):
+
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+
+    assert "".join(iter_json(i_tree)) == _written(write_json, i_tree)
+    assert "".join(line + "\n" for line in iter_ndjson(i_tree)) == \
+        _written(write_ndjson, i_tree)
+
+    # from the DiGraph as well
+    assert _written(write_json, i_tree.to_networkx()) == _written(write_json, i_tree)
+
+def test_single_node():
+
+    i_tree = InterfaceTree()
+    i_tree.add_node('pk', MODULE)
+
+    assert json.loads(_written(write_json, i_tree)) == {
+        'fqname' : 'pk', 'name' : 'pk', 'kind' : 'module', 'children' : []}
+
+def test_cli_json(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    i_tree = interface_tree(package, compact=True)
+
+    for fmt, write in (('nested', write_json), ('ndjson', write_ndjson)):
+
+        result = CliRunner().invoke(cli, ['json', '--no-cache', '--format', fmt, package])
+
+        assert result.exit_code == 0, result.output
+        assert result.output == _written(write, i_tree)
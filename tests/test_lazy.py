@@ -0,0 +1,70 @@
+from pymatuning.listings import interface_tree, diff_interface_trees, subtree_hashes
+from pymatuning.lazy import LazyInterfaceTree, address_tree, is_address, split_address
+from pymatuning.renderers.orgmode import listing
+
+PACKAGE = {
+    '__init__.py' : "from . import sub\n\ndef top():\n    pass\n",
+    'sub/__init__.py' : "",
+    'sub/mod.py' : """
+        class Thing:
+
+            def method(self):
+                pass
+
+            @property
+            def value(self):
+                return 1
+
+        def helper():
+            pass
+        """,
+    'other.py' : "x = 1\n",
+}
+
+def test_lazy_tree_is_the_whole_tree(make_package):
+
+    package = make_package('pk', PACKAGE)
+
+    lazy_tree = interface_tree(package, compact=True, lazy=True)
+    assert len(lazy_tree) == 1
+
+    assert listing(lazy_tree) == listing(interface_tree(package, compact=True))
+
+def test_lazy_tree_hashes_and_diff(make_package):
+
+    package = make_package('pk', PACKAGE)
+
+    # the tree grows while it is hashed
+    lazy_tree = interface_tree(package, compact=True, lazy=True)
+    assert len(subtree_hashes(lazy_tree)) == len(interface_tree(package, compact=True))
+
+    differences = diff_interface_trees(interface_tree(package, compact=True, lazy=True),
+                                       interface_tree(package, compact=True))
+    assert differences == {'added' : [], 'removed' : [], 'moved' : []}
+
+def test_find_only_parses_the_module(make_package):
+
+    package = make_package('pk', PACKAGE)
+
+    tree = LazyInterfaceTree(package)
+    node = tree.find('pk.sub.mod', ['Thing'])
+
+    assert tree.fqname(node) == 'pk.sub.mod.Thing'
+
+    # the packages on the way were only listed
+    assert not tree.is_expanded(tree.find('pk'))
+    assert not tree.is_expanded(tree.find('pk.sub'))
+
+def test_address_tree(make_package):
+
+    package = make_package('pk', PACKAGE)
+
+    address = package + '/sub/mod.py:Thing'
+    assert is_address(address)
+    assert split_address(address) == (package + '/sub/mod.py', ['Thing'])
+
+    assert listing(address_tree(address)) == "- mod\n  - Thing\n    - method\n    - value"
+
+def test_not_an_address():
+    assert not is_address('pkg.sub.mod')
+    assert not is_address(r'C:\pkg\mod.py')
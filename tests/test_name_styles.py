@@ -0,0 +1,71 @@
+import pytest
+
+from pymatuning.listings import interface_tree
+from pymatuning.name_styles import NAMING_STYLES, KIND_NAME_TYPES, check_names
+
+SOURCE = """
+counter = 0
+MAX_SIZE = 10
+__version__ = '1'
+
+class good_class:
+    attr_name = 1
+    BadAttr = 2
+
+    def method_name(self):
+        pass
+
+    def BadMethod(self):
+        pass
+
+    @property
+    def prop(self):
+        pass
+
+class BadClass:
+    pass
+
+def function_name():
+    pass
+
+def BadFunction():
+    pass
+"""
+
+@pytest.fixture
+def i_tree(make_package):
+
+    package = make_package('pk', {'__init__.py' : SOURCE, 'sub_module.py' : "",
+                                  'BadModule.py' : ""})
+
+    return interface_tree(package, compact=True)
+
+@pytest.mark.parametrize('style_name', sorted(NAMING_STYLES))
+def test_verdicts_match_the_style_regexes(i_tree, style_name):
+
+    style = NAMING_STYLES[style_name]
+
+    expected = []
+    for node, _ in i_tree.walk():
+        name_type = KIND_NAME_TYPES[i_tree.kind(node)]
+        if style.get_regex(name_type).match(i_tree.label(node)) is None:
+            expected.append((i_tree.fqname(node), name_type))
+
+    assert [(i_tree.fqname(node), name_type)
+            for node, name_type in check_names(i_tree, style_name)] == expected
+
+def test_snake_case_violations(i_tree):
+
+    assert sorted(i_tree.fqname(node) for node, _ in check_names(i_tree, 'snake_case')) == [
+        'pk.BadClass', 'pk.BadFunction', 'pk.BadModule', 'pk.MAX_SIZE',
+        'pk.good_class.BadAttr', 'pk.good_class.BadMethod']
+
+def test_module_variables_use_the_variable_style(i_tree):
+
+    # lowercase module globals are variables, not constants
+    violations = {i_tree.fqname(node) : name_type
+                  for node, name_type in check_names(i_tree, 'UPPER_CASE')}
+
+    assert violations['pk.counter'] == 'variable'
+    assert 'pk.MAX_SIZE' not in violations
+    assert 'pk.__version__' not in violations
@@ -0,0 +1,59 @@
+import io
+import sys
+
+from pymatuning.listings import interface_tree
+from pymatuning.renderers.orgmode import listing, write_listing
+from pymatuning.tree import InterfaceTree, MODULE, CLASS, METHOD
+
+PACKAGE_FILES = {
+    '__init__.py' : "X = 1\n",
+    'mod.py' : "def f():\n    pass\n\nclass K:\n    def method(self):\n        pass\n",
+    'sub/__init__.py' : "",
+    'sub/deep.py' : "Y = 2\n",
+}
+
+def _written(tree, **kwargs):
+    stream = io.StringIO()
+    write_listing(tree, stream, **kwargs)
+    return stream.getvalue()
+
+def test_written_matches_listing(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    i_tree = interface_tree(package, compact=True)
+
+    assert listing(i_tree) == "\n".join([
+        "- pk",
+        "  - mod",
+        "    - f",
+        "    - K",
+        "      - method",
+        "  - sub",
+        "    - deep",
+        "      - Y",
+        "  - X",
+    ])
+
+    # the same lines, one per node, from a tree or its DiGraph
+    assert _written(i_tree) == listing(i_tree) + "\n"
+    assert _written(i_tree.to_networkx()) == listing(i_tree) + "\n"
+
+    assert _written(i_tree, n_indent_spaces=4, marker="- [ ]") == \
+        listing(i_tree, n_indent_spaces=4, marker="- [ ]") + "\n"
+
+def test_deep_tree_is_not_recursed():
+
+    # deeper than the recursion limit
+    depth = sys.getrecursionlimit() + 100
+
+    i_tree = InterfaceTree()
+    node = i_tree.add_node('pk', MODULE)
+    node = i_tree.add_node('K', CLASS, node)
+    for level in range(depth):
+        node = i_tree.add_node('m{}'.format(level), METHOD, node)
+
+    lines = _written(i_tree).splitlines()
+
+    assert len(lines) == depth + 2
+    assert lines[-1] == "  " * (depth + 1) + "- m{}".format(depth - 1)
+    assert listing(i_tree).splitlines() == lines
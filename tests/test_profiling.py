@@ -0,0 +1,44 @@
+import multiprocessing
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pymatuning import profiling
+from pymatuning.listings import files_definitions
+
+def _worker_state():
+    return profiling.active_profiler() is not None, tracemalloc.is_tracing()
+
+@pytest.fixture
+def profiler():
+
+    profiler = profiling.Profiler(trace_memory=True)
+    profiling.activate(profiler)
+
+    yield profiler
+
+    profiling.deactivate()
+
+def test_workers_do_not_profile(profiler):
+
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context,
+                             initializer=profiling.init_worker) as executor:
+        assert executor.submit(_worker_state).result() == (False, False)
+
+    # the parent still profiles
+    assert _worker_state() == (True, True)
+
+def test_worker_timings_are_recorded(profiler, tmp_path):
+
+    filepaths = []
+    for idx in range(4):
+        path = tmp_path / 'mod{}.py'.format(idx)
+        path.write_text("def f{}():\n    pass\n".format(idx))
+        filepaths.append(str(path))
+
+    defs = files_definitions(filepaths, jobs=2)
+
+    assert [mod_defs['functions'] for mod_defs in defs] == [['f0'], ['f1'], ['f2'], ['f3']]
+    assert any(event[1] == 'module' for event in profiler.events)
@@ -0,0 +1,108 @@
+import io
+
+import pytest
+from click.testing import CliRunner
+
+from pymatuning import renderers
+from pymatuning.cli import cli
+from pymatuning.listings import interface_tree
+from pymatuning.renderers import RendererSink, make_sink, parse_output_spec, render
+
+PACKAGE_FILES = {
+    '__init__.py' : "X = 1\n",
+    'mod.py' : """\
+        def f(a, b: int) -> int:
+            return a
+
+        class K:
+            async def method(self):
+                \"\"\"A docstring.\"\"\"
+        """,
+    'sub/__init__.py' : "",
+    'sub/deep.py' : "Y = 2\n",
+}
+
+# the render formats and the arguments of the command that writes the
+# same on its own
+FORMATS = {
+    'orgmode' : ['orgmode'],
+    'orgmode:checklist' : ['orgmode', '--marker', 'checklist'],
+    'json' : ['json'],
+    'ndjson' : ['json', '--format', 'ndjson'],
+}
+
+class _RecordingSink(RendererSink):
+
+    needs_fqnames = True
+
+    def __init__(self):
+        self.batches = []
+
+    def nodes(self, records):
+        self.batches.append(list(records))
+
+def _rendered(tree, format_names):
+
+    streams = [io.StringIO() for _ in format_names]
+    render(tree, [make_sink(format_name, stream)
+                  for format_name, stream in zip(format_names, streams)])
+
+    return [stream.getvalue() for stream in streams]
+
+@pytest.mark.parametrize('batch_size', [1024, 2])
+def test_fan_out_matches_each_format(make_package, monkeypatch, batch_size):
+
+    monkeypatch.setattr(renderers, 'RENDER_BATCH_SIZE', batch_size)
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+
+    assert _rendered(i_tree, list(FORMATS)) == \
+        [_rendered(i_tree, [format_name])[0] for format_name in FORMATS]
+
+def test_sinks_get_every_node(make_package, monkeypatch):
+
+    monkeypatch.setattr(renderers, 'RENDER_BATCH_SIZE', 4)
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+
+    sink = _RecordingSink()
+    render(i_tree, [sink])
+
+    assert [len(batch) for batch in sink.batches] == [4, 4, 1]
+    assert [(node, depth, label, fqname)
+            for batch in sink.batches for node, depth, label, fqname, _ in batch] == \
+        [(node, depth, i_tree.label(node), i_tree.fqname(node))
+         for node, depth in i_tree.walk()]
+
+def test_sink_needs_nodes():
+    with pytest.raises(TypeError):
+        RendererSink()
+
+def test_cli_render_matches_each_command(make_package, tmp_path):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    args = ['render', '--no-cache']
+    for idx, format_name in enumerate(FORMATS):
+        args += ['--format', '{}={}'.format(format_name, tmp_path / 'out{}'.format(idx))]
+
+    result = CliRunner().invoke(cli, args + [package])
+    assert result.exit_code == 0, result.output
+
+    for idx, command in enumerate(FORMATS.values()):
+
+        single = CliRunner().invoke(cli, command[:1] + ['--no-cache'] + command[1:] + [package])
+        assert single.exit_code == 0, single.output
+
+        assert (tmp_path / 'out{}'.format(idx)).read_text() == single.output
+
+def test_cli_render_needs_a_file_per_format(make_package):
+
+    result = CliRunner().invoke(cli, ['render', '--format', 'orgmode=-', '--format', 'json=-',
+                                      make_package('pk', PACKAGE_FILES)])
+
+    assert result.exit_code == 2
+    assert "Every format needs its own file" in result.output
+
+@pytest.mark.parametrize('spec', ['orgmode', 'orgmode=', 'yaml=out.yaml'])
+def test_bad_output_spec(spec):
+    with pytest.raises(ValueError):
+        parse_output_spec(spec)
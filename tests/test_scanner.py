@@ -0,0 +1,135 @@
+import ast
+import textwrap
+
+import pytest
+
+from pymatuning.listings import source_definitions
+from pymatuning.scanner import ScanError, skeleton_source
+
+# sources where a shallow scan could easily get the definitions wrong
+ADVERSARIAL_SOURCES = {
+    'fstrings' : '''
+        X = f"{1 + 2!r:>{10}} def not_a_function():"
+        Y = f'{{ ; }}' ; Z = f"""
+        class NotAClass:
+        {X}"""
+        def after(a=f"{X:{Y}}"):
+            return f"{a}"
+        ''',
+    'fstring_quotes' : '''
+        Y = f'{"}"}' ; Z = 1
+        def after(a=f"{Y:{Z}}"):
+            return f"{a}"
+        ''',
+    'nested_fstrings' : '''
+        W = 3
+        S = f"{f'{W:{W}}'}" f'{{literal}}' rf"\\{W}"
+        def g():
+            return S
+        ''',
+    'continuations' : '''
+        A = 1 + \\
+            2
+        def f(a,
+              b=(1,
+                 2), \\
+              *args, **kwargs) \\
+                -> int:
+            """Docstring with def inside:
+            def fake(): pass
+            """
+            return a
+        B = [x for x in
+             range(3)]; C = 4
+        ''',
+    'one_line_compound' : '''
+        class Empty: pass
+        class Point: x = 1; y = 2
+        def f(): return 1; z = 2
+        if True: V = 1
+        else: W = 2
+        for i in range(2): U = i
+        while False: pass
+        try: T = 1
+        except Exception: T = 2
+        with open(__file__) as fh: R = 1
+        class Body:
+            def method(self): return 1
+            value = 3; other = 4
+        ''',
+    'import_in_compound' : '''
+        if True: import os; V = 1
+        try: import json
+        except ImportError: json = None
+        ''',
+    'semicolons_in_strings' : '''
+        A = "a; def b(): pass"; B = ';'
+        class K: s = 'x;y'; t = """;
+        def fake(): ;"""
+        ''',
+    'decorators_and_async' : '''
+        import functools
+        @functools.lru_cache(
+            maxsize=None)
+        def cached(x): return x
+        class C:
+            @property
+            def p(self): return 1
+            @p.setter
+            def p(self, value): pass
+            @staticmethod
+            async def a(): await g()
+            @classmethod
+            def c(cls): ...
+        async def g(): pass
+        ''',
+    'comments_and_blank_lines' : '''
+        # class Commented:
+        def f():  # def g():
+
+            x = 1
+
+        # a comment at the top level
+            # an indented comment
+        def h(): pass
+        ''',
+    'brackets_across_lines' : '''
+        D = {
+            'class' : 1,
+            'def' : """
+        def fake(): pass
+        """,
+        }
+        T = (
+            1,
+        ); def_like = 2
+        ''',
+    'match_and_walrus' : '''
+        def f(x):
+            match x:
+                case {'a' : 1}: return 1
+                case _: return 0
+        if (n := 10) > 5: N = n
+        ''',
+}
+
+@pytest.mark.parametrize('name', sorted(ADVERSARIAL_SOURCES))
+def test_scan_matches_ast(name):
+
+    source = textwrap.dedent(ADVERSARIAL_SOURCES[name]).encode('utf-8')
+
+    assert source_definitions(source, engine='scan') == source_definitions(source, engine='ast')
+
+# the scanner leaves these to be parsed as a whole
+FALLBACK_SOURCES = ['fstring_quotes', 'import_in_compound']
+
+@pytest.mark.parametrize('name', sorted(ADVERSARIAL_SOURCES))
+def test_scan_skeleton(name):
+
+    source = textwrap.dedent(ADVERSARIAL_SOURCES[name]).encode('utf-8')
+
+    if name in FALLBACK_SOURCES:
+        with pytest.raises(ScanError):
+            skeleton_source(source)
+    else:
+        ast.parse(skeleton_source(source))
@@ -0,0 +1,106 @@
+from pathlib import Path
+
+import pytest
+from click.testing import CliRunner
+
+from pymatuning.cli import cli
+from pymatuning.shards import parse_shard, shard_of
+
+PACKAGE_FILES = dict(
+    {'__init__.py' : "X = 1\n",
+     'empty.py' : "",
+     'sub/__init__.py' : "",
+     'sub/deep.py' : """\
+         class Deep:
+             async def method(self, a: int) -> None:
+                 \"\"\"A docstring.\"\"\"
+
+             @property
+             def value(self):
+                 return 1
+         """},
+    **{'mod{}.py'.format(i) : "def f{0}(a, *args):\n    pass\n\nY{0} = {0}\n".format(i)
+       for i in range(6)})
+
+# the merge formats and the arguments of the single run that writes
+# the same
+FORMATS = {
+    'orgmode' : ['orgmode'],
+    'checklist' : ['orgmode', '--marker', 'checklist'],
+    'json' : ['json'],
+    'ndjson' : ['json', '--format', 'ndjson'],
+}
+
+def _invoke(args):
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    return result.output
+
+def _partials(package, tmp_path, n_shards):
+
+    paths = []
+    for shard in range(n_shards):
+        path = tmp_path / 'shard{}-{}.ndjson'.format(shard, n_shards)
+        _invoke(['partial', '--no-cache', '--shard', '{}/{}'.format(shard, n_shards),
+                 '-o', str(path), package])
+        paths.append(str(path))
+
+    return paths
+
+@pytest.mark.parametrize('n_shards', [1, 2, 3])
+def test_merge_matches_single_run(make_package, tmp_path, n_shards):
+
+    package = make_package('pk', PACKAGE_FILES)
+    paths = _partials(package, tmp_path, n_shards)
+
+    for fmt, single_args in FORMATS.items():
+
+        single = _invoke(single_args[:1] + ['--no-cache'] + single_args[1:] + [package])
+
+        # the order the partial trees are given in doesn't matter
+        assert _invoke(['merge', '--format', fmt] + paths) == single
+        assert _invoke(['merge', '--format', fmt] + paths[::-1]) == single
+
+def test_shards_split_the_modules(make_package, tmp_path):
+
+    package = make_package('pk', PACKAGE_FILES)
+    paths = _partials(package, tmp_path, 3)
+
+    # every parsed module is in exactly one of the shards
+    n_records = [len(Path(path).read_text().splitlines()) - 1 for path in paths]
+    assert sum(n_records) == len(PACKAGE_FILES)
+    assert n_records == [
+        sum(shard_of(mod_fqname, 3) == shard
+            for mod_fqname in ['pk', 'pk.empty', 'pk.sub', 'pk.sub.deep'] +
+            ['pk.mod{}'.format(i) for i in range(6)])
+        for shard in range(3)]
+
+def test_merge_needs_all_shards(make_package, tmp_path):
+
+    package = make_package('pk', PACKAGE_FILES)
+    paths = _partials(package, tmp_path, 3)
+
+    result = CliRunner().invoke(cli, ['merge'] + paths[:2])
+    assert result.exit_code == 1
+    assert "Need the partial trees of all 3 shards" in result.output
+
+    (tmp_path / 'other').mkdir()
+    other_paths = _partials(package, tmp_path / 'other', 2)
+
+    result = CliRunner().invoke(cli, ['merge', paths[0], other_paths[1]])
+    assert result.exit_code == 1
+    assert "not from the same run" in result.output
+
+def test_merge_rejects_other_files(tmp_path):
+
+    path = tmp_path / 'listing.org'
+    path.write_text("- pk\n")
+
+    result = CliRunner().invoke(cli, ['merge', str(path)])
+    assert result.exit_code == 1
+    assert "is not a partial interface tree" in result.output
+
+@pytest.mark.parametrize('spec', ['3/3', '-1/2', '1', 'a/b'])
+def test_bad_shard(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
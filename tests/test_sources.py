@@ -0,0 +1,51 @@
+from pymatuning.filters import TreeFilter
+from pymatuning.listings import discover_modules
+from pymatuning.sources import DirectorySource
+
+PACKAGE_FILES = {
+    '__init__.py' : "",
+    'kept/__init__.py' : "",
+    'kept/inner/__init__.py' : "",
+    'skipped/__init__.py' : "",
+    'skipped/inner/__init__.py' : "",
+    '_private/__init__.py' : "",
+    'data/notes.txt' : "",
+}
+
+class _CountingSource(DirectorySource):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.scanned = []
+
+    def _scandir(self, key):
+        self.scanned.append(key)
+        return super()._scandir(key)
+
+def _scanned(package, tree_filter):
+
+    with _CountingSource(io_threads=4, tree_filter=tree_filter) as source:
+        source.add_package([package], 'pk', selected=tree_filter.is_included('pk'))
+        source.listdir(package)
+        source.close()
+
+        return sorted(key[len(package):] for key in source.scanned)
+
+def test_prefetch_follows_filter(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    # the subdirectories of a directory are listed ahead when it is
+    tree_filter = TreeFilter(exclude=['pk.skipped'], public_only=True)
+    assert _scanned(package, tree_filter) == ['', '/data', '/kept']
+
+    tree_filter = TreeFilter(max_depth=0)
+    assert _scanned(package, tree_filter) == ['']
+
+def test_discovery_with_io_threads(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+    tree_filter = TreeFilter(exclude=['pk.skipped'])
+
+    assert discover_modules(package, tree_filter=tree_filter, io_threads=4) == \
+        discover_modules(package, tree_filter=tree_filter)
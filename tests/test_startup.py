@@ -0,0 +1,23 @@
+import os.path as osp
+import sys
+
+import pytest
+
+sys.path.insert(0, osp.join(osp.dirname(osp.dirname(osp.abspath(__file__))), 'benchmarks'))
+
+from bench_startup import DEFAULT_BUDGET_MS, bench_startup, forbidden_imports, time_import
+
+def test_no_heavy_imports_at_startup():
+
+    imports = time_import('pymatuning.cli')
+
+    assert 'pymatuning.cli' in [name for name, _, _, _ in imports]
+    assert forbidden_imports(imports) == []
+
+@pytest.mark.slow
+def test_startup_budget():
+
+    result = bench_startup(repeat=5, top=0)
+
+    assert result['forbidden'] == []
+    assert result['import_ms'] <= DEFAULT_BUDGET_MS
@@ -0,0 +1,77 @@
+import networkx as nx
+
+from pymatuning.listings import interface_tree
+from pymatuning.tree import InterfaceTree, as_interface_tree
+
+PACKAGE_FILES = {
+    '__init__.py' : "X = 1\n",
+    'mod.py' : """\
+        def f(a, b: int) -> int:
+            return a
+
+        class K:
+            attr = 1
+
+            def method(self):
+                pass
+
+            @property
+            def value(self):
+                return 1
+
+            @value.setter
+            def value(self, value):
+                pass
+        """,
+    'sub/__init__.py' : "",
+    'sub/deep.py' : "async def g(*args, **kwargs):\n    pass\n",
+}
+
+def _nodes(tree):
+    # everything about the nodes of an InterfaceTree, in order
+    return [(tree.name(node), tree.kind(node), tree.info(node), depth)
+            for node, depth in tree.walk()]
+
+def test_compact_matches_networkx(make_package):
+
+    package = make_package('pk', PACKAGE_FILES)
+
+    graph = interface_tree(package)
+    i_tree = interface_tree(package, compact=True)
+
+    converted = i_tree.to_networkx()
+
+    # the same nodes with the same attributes, added in the same order
+    assert list(converted.nodes(data=True)) == list(graph.nodes(data=True))
+    assert list(converted.edges()) == list(graph.edges())
+
+    assert graph.nodes[('pk.mod', 'K', 'value')]['kind'] == 'property'
+    assert [i_tree.fqname(node) for node in i_tree.children(i_tree.root)] == \
+        ['pk.mod', 'pk.sub', 'pk.X']
+
+def test_networkx_round_trip(make_package):
+
+    i_tree = interface_tree(make_package('pk', PACKAGE_FILES), compact=True)
+
+    round_tripped = InterfaceTree.from_networkx(i_tree.to_networkx())
+
+    assert _nodes(round_tripped) == _nodes(i_tree)
+    assert as_interface_tree(i_tree) is i_tree
+
+def test_kinds_guessed_without_attributes():
+
+    graph = nx.DiGraph()
+    graph.add_edge('pk', 'pk.mod')
+    graph.add_edge('pk.mod', ('pk.mod', 'f'))
+    graph.add_edge('pk.mod', ('pk.mod', 'K'))
+    graph.add_edge(('pk.mod', 'K'), ('pk.mod', 'K', 'method'))
+
+    i_tree = as_interface_tree(graph)
+
+    assert [(i_tree.fqname(node), i_tree.kind_name(node)) for node, _ in i_tree.walk()] == [
+        ('pk', 'module'),
+        ('pk.mod', 'module'),
+        ('pk.mod.f', 'function'),
+        ('pk.mod.K', 'class'),
+        ('pk.mod.K.method', 'method'),
+    ]
@@ -0,0 +1,64 @@
+import textwrap
+
+from click.testing import CliRunner
+
+from pymatuning.cli import cli
+
+def _update(package, listing_path):
+
+    result = CliRunner().invoke(cli, ['orgmode', '--no-cache', '--marker', 'checklist',
+                                      '--update', str(listing_path), package])
+    assert result.exit_code == 0, result.output
+
+    return listing_path.read_text()
+
+def test_update_keeps_checkboxes_and_notes(make_package, tmp_path):
+
+    package = make_package('pk', {
+        '__init__.py' : "",
+        'mod.py' : "def kept():\n    pass\n\ndef removed():\n    pass\n",
+    })
+
+    listing_path = tmp_path / 'pk.org'
+    listing_path.write_text(textwrap.dedent("""\
+        #+TITLE: pk
+        - [ ] pk
+          - [X] mod
+            - [X] kept
+              a note on kept
+            - [-] removed
+        """))
+
+    with open(package + '/mod.py', 'w') as wf:
+        wf.write("def kept():\n    pass\n\ndef added():\n    pass\n")
+
+    assert _update(package, listing_path) == textwrap.dedent("""\
+        #+TITLE: pk
+        - [ ] pk
+          - [X] mod
+            - [X] kept
+              a note on kept
+            - [ ] added
+            - [-] +removed+
+        """)
+
+    # bringing a node back restores its line, and nothing else changes
+    with open(package + '/mod.py', 'w') as wf:
+        wf.write("def kept():\n    pass\n\ndef removed():\n    pass\n\ndef added():\n    pass\n")
+
+    assert _update(package, listing_path) == textwrap.dedent("""\
+        #+TITLE: pk
+        - [ ] pk
+          - [X] mod
+            - [X] kept
+              a note on kept
+            - [-] removed
+            - [ ] added
+        """)
+
+def test_update_writes_new_listing(make_package, tmp_path):
+
+    package = make_package('pk', {'__init__.py' : "X = 1\n"})
+    listing_path = tmp_path / 'pk.org'
+
+    assert _update(package, listing_path) == "- [ ] pk\n  - [ ] X\n"
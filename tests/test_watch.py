@@ -0,0 +1,52 @@
+import os
+import time
+
+from pymatuning.cache import DefinitionCache
+from pymatuning.listings import file_definitions
+from pymatuning.renderers.orgmode import listing
+from pymatuning.watch import WatchedTree
+
+def _write(path, source):
+
+    with open(path, 'w') as wf:
+        wf.write(source)
+
+    # a new mtime even on coarse filesystems
+    mtime = time.time() + len(source)
+    os.utime(path, (mtime, mtime))
+
+def test_unchanged_definitions_from_cache(make_package, tmp_path):
+
+    source = "class A:\n    def method(self):\n        pass\n"
+    package = make_package('pk', {'__init__.py' : "", 'mod.py' : source})
+    mod_path = os.path.join(package, 'mod.py')
+
+    watched = WatchedTree(package)
+
+    # the cache gives back the definitions as they were stored as JSON
+    file_definitions(mod_path, cache=DefinitionCache(str(tmp_path / 'cache')))
+    watched.cache = DefinitionCache(str(tmp_path / 'cache'))
+
+    _write(mod_path, source)
+    assert not watched.update([mod_path])
+
+    _write(mod_path, source + "\ndef g():\n    pass\n")
+    assert watched.update([mod_path])
+
+def test_replaced_definitions_are_compacted(make_package):
+
+    package = make_package('pk', {'__init__.py' : "", 'mod.py' : "def f():\n    pass\n"})
+    mod_path = os.path.join(package, 'mod.py')
+
+    watched = WatchedTree(package)
+    size = len(watched.tree)
+
+    for idx in range(21):
+
+        source = "".join("def f{}():\n    pass\n".format(jdx) for jdx in range(idx % 3 + 1))
+        _write(mod_path, source)
+
+        assert watched.update([mod_path])
+        assert len(watched.tree) <= 2 * (size + 3)
+
+    assert listing(watched.tree) == "- pk\n  - mod\n    - f0\n    - f1\n    - f2"